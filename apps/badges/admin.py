@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from apps.badges.models.badge_models import DailyUserReputation
+from apps.badges.models.badge_models import DailyUserReputation, ReputationEvent
 
 from .models import Badge, UserBadge
 
@@ -16,3 +16,4 @@ class BadgeAdmin(admin.ModelAdmin):
 
 admin.site.register(Badge, BadgeAdmin)
 admin.site.register(DailyUserReputation)
+admin.site.register(ReputationEvent)
@@ -0,0 +1,47 @@
+# Generated by Django 4.2 on 2026-10-18 10:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('badges', '0002_remove_badge_points'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailyuserreputation',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+        migrations.CreateModel(
+            name='ReputationEvent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('delta', models.IntegerField()),
+                ('applied_delta', models.IntegerField(blank=True, null=True)),
+                ('reason', models.CharField(choices=[('opening_balance', 'Opening balance'), ('opening_daily', 'Opening daily gains'), ('vote', 'Vote'), ('answer_accepted', 'Answer accepted'), ('accepting_answer', 'Accepting an answer'), ('other', 'Other')], default='other', max_length=20)),
+                ('object_id', models.CharField(blank=True, max_length=36)),
+                ('content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reputation_events', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='reputationevent',
+            index=models.Index(fields=['user', 'created_at'], name='reputationevent__user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reputationevent',
+            index=models.Index(condition=models.Q(('applied_delta__isnull', True)), fields=['created_at'], name='reputationevent__pending_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2 on 2026-10-18 10:15
+
+from django.db import migrations
+from django.db.models import Q
+from django.utils import timezone
+
+
+def record_opening_balances(apps, schema_editor):
+    """
+    Records the reputation users earned before the ledger existed, so replaying the ledger keeps it. The
+    points gained today are recorded apart, as they also count towards today's cap and leaderboards.
+    """
+    User = apps.get_model("users", "User")
+    DailyUserReputation = apps.get_model("badges", "DailyUserReputation")
+    ReputationEvent = apps.get_model("badges", "ReputationEvent")
+
+    today = DailyUserReputation.objects.filter(date=timezone.localdate(), reputation__gt=0)
+    gains = dict(today.values_list("user_id", "reputation"))
+    users = User.objects.filter(~Q(reputation=1) | Q(pk__in=gains)).values_list("pk", "reputation")
+    events = []
+    for pk, reputation in users.iterator():
+        if balance := reputation - 1 - gains.get(pk, 0):
+            events.append(
+                ReputationEvent(user_id=pk, delta=balance, applied_delta=balance, reason="opening_balance")
+            )
+        if gained := gains.get(pk):
+            events.append(ReputationEvent(user_id=pk, delta=gained, applied_delta=gained, reason="opening_daily"))
+    ReputationEvent.objects.bulk_create(events, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("badges", "0003_reputationevent"),
+        ("users", "0005_user_reputation"),
+    ]
+
+    operations = [
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
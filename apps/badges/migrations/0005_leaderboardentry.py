@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 10:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('entities', '0003_department_is_active_faculty_is_active_and_more'),
+        ('badges', '0004_reputation_opening_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timeframe', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('all', 'All time')], max_length=10)),
+                ('period', models.DateField()),
+                ('reputation', models.IntegerField(default=0)),
+                ('faculty', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='entities.faculty')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['faculty', 'timeframe', 'period', '-reputation', '-id'], name='leaderboardentry__rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('faculty', 'timeframe', 'period', 'user'), name='leaderboardentry__1'),
+        ),
+    ]
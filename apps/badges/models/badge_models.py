@@ -1,7 +1,14 @@
+from datetime import date, timedelta
+
 from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
 from apps.common.models import BaseModel
+from apps.entities.models.faculty_models import Faculty
 
 
 class Badge(BaseModel):
@@ -39,7 +46,7 @@ class UserBadge(BaseModel):
 
 class DailyUserReputation(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="daily_reputations")
-    date = models.DateField(auto_now_add=True)
+    date = models.DateField(default=timezone.localdate)
     reputation = models.IntegerField(default=0)
 
     class Meta:
@@ -47,3 +54,114 @@ class DailyUserReputation(models.Model):
 
     def __str__(self):
         return f"{self.user} - {self.date} - {self.reputation} points"
+
+
+class ReputationEvent(BaseModel):
+    """
+    One entry of the append-only reputation ledger.
+
+    Changing reputation only inserts an event. Pending events are folded into `User.reputation` and the
+    daily rollups in batches by `User.aggregate_reputation`, which records the change actually applied
+    once the daily cap is enforced. Replaying the ledger rebuilds both from scratch.
+
+    Attributes:
+        user (ForeignKey): The user whose reputation changes.
+        delta (int): The requested change in points.
+        applied_delta (int): The change applied after the daily cap, or None while pending.
+        reason (str): Why the reputation changed.
+        content_type (ForeignKey): The content type of the object that caused the change, if any.
+        object_id (str): The ID of that object.
+        source (GenericForeignKey): The object that caused the change.
+    """
+
+    class Reason(models.TextChoices):
+        OPENING_BALANCE = "opening_balance", "Opening balance"
+        OPENING_DAILY = "opening_daily", "Opening daily gains"
+        VOTE = "vote", "Vote"
+        ANSWER_ACCEPTED = "answer_accepted", "Answer accepted"
+        ACCEPTING_ANSWER = "accepting_answer", "Accepting an answer"
+        OTHER = "other", "Other"
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="reputation_events")
+    delta = models.IntegerField()
+    applied_delta = models.IntegerField(null=True, blank=True)
+    reason = models.CharField(max_length=20, choices=Reason.choices, default=Reason.OTHER)
+    content_type = models.ForeignKey(ContentType, on_delete=models.SET_NULL, null=True, blank=True)
+    object_id = models.CharField(max_length=36, blank=True)
+    source = GenericForeignKey("content_type", "object_id")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("user", "created_at"), name="reputationevent__user_idx"),
+            models.Index(
+                fields=("created_at",), condition=Q(applied_delta__isnull=True), name="reputationevent__pending_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.reason} - {self.delta} points"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    A user's position on the reputation leaderboard of a faculty for one day, one week or all time.
+
+    Entries are kept up to date by `User.aggregate_reputation` as reputation changes, so reading a page of a
+    leaderboard or a user's rank is a range scan of the `leaderboardentry__rank_idx` index. Daily and weekly
+    entries are keyed by the first day of their period, so a new period starts with an empty leaderboard and
+    past periods are pruned by the `roll_over_leaderboards` command.
+
+    Attributes:
+        faculty (ForeignKey): The faculty of the leaderboard.
+        timeframe (str): The timeframe of the leaderboard.
+        period (date): The first day of the period, or `ALL_TIME_PERIOD` for the all-time leaderboard.
+        user (ForeignKey): The ranked user.
+        reputation (int): The reputation the user earned in the period.
+    """
+
+    ALL_TIME_PERIOD = date.min
+
+    class Timeframe(models.TextChoices):
+        DAILY = "daily", "Daily"
+        WEEKLY = "weekly", "Weekly"
+        ALL = "all", "All time"
+
+    faculty = models.ForeignKey(Faculty, on_delete=models.CASCADE, related_name="leaderboard_entries")
+    timeframe = models.CharField(max_length=10, choices=Timeframe.choices)
+    period = models.DateField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="leaderboard_entries")
+    reputation = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("faculty", "timeframe", "period", "user"), name="leaderboardentry__1")
+        ]
+        indexes = [
+            models.Index(
+                fields=("faculty", "timeframe", "period", "-reputation", "-id"), name="leaderboardentry__rank_idx"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.faculty} - {self.timeframe} - {self.reputation} points"
+
+    @classmethod
+    def get_period(cls, timeframe: str, day: date) -> date:
+        """
+        Returns the first day of the period of the given timeframe that contains the day.
+        """
+        if timeframe == cls.Timeframe.DAILY:
+            return day
+        if timeframe == cls.Timeframe.WEEKLY:
+            return day - timedelta(days=day.weekday())
+        return cls.ALL_TIME_PERIOD
+
+    def get_rank(self) -> int:
+        """
+        Returns the 1-based rank of the entry, counting the entries ahead of it in the leaderboard order.
+        """
+        leaderboard = LeaderboardEntry.objects.filter(
+            faculty_id=self.faculty_id, timeframe=self.timeframe, period=self.period
+        )
+        ahead = Q(reputation__gt=self.reputation) | Q(reputation=self.reputation, pk__gt=self.pk)
+        return leaderboard.filter(ahead).count() + 1
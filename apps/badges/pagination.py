@@ -0,0 +1,20 @@
+from apps.common.pagination import KeysetPagination
+
+
+class LeaderboardPagination(KeysetPagination):
+    """
+    Cursor pagination over a leaderboard that also numbers the entries of the page.
+
+    The rank of the first entry is looked up once, and the others follow from their position, so any page
+    costs two index range scans.
+    """
+
+    page_size = 10
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = super().paginate_queryset(queryset, request, view)
+        if page:
+            first_rank = page[0].get_rank()
+            for index, entry in enumerate(page):
+                entry.rank = first_rank + index
+        return page
@@ -0,0 +1,149 @@
+"""
+The badge rules, keyed by the domain event that can make them apply.
+
+An event is a model label and a metric that changed on one of its objects, e.g. `("forum.Post", "score")`.
+When it happens, the badge engine loads the objects with the trigger's relations and annotations and
+awards every badge whose rule is met to its recipient. See `apps.badges.utils.evaluate_badge_events`.
+"""
+
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Callable, Optional
+
+from django.db.models import Count
+
+from apps.forum.constants import (
+    FAMOUS_QUESTION_THRESHOLD,
+    FAVORITE_ANSWER,
+    FAVORITE_QUESTION,
+    GOOD_ANSWER,
+    GOOD_QUESTION_THRESHOLD,
+    GREAT_ANSWER,
+    GREAT_QUESTION_THRESHOLD,
+    GURU_ANSWER,
+    NICE_ANSWER,
+    NICE_QUESTION_THRESHOLD,
+    NOTABLE_QUESTION_THRESHOLD,
+    POPULAR_QUESTION_THRESHOLD,
+    SELF_LEARNER,
+    STELLAR_ANSWER,
+    STELLAR_QUESTION,
+)
+from apps.resources.constants import ResourceConstants
+
+
+@dataclass(frozen=True)
+class BadgeRule:
+    """
+    A badge awarded once a metric of an object reaches a threshold.
+
+    Attributes:
+        badge (str): The name of the badge.
+        threshold (int): The value the metric must reach.
+        condition (callable): An extra check on the object, if any.
+    """
+
+    badge: str
+    threshold: int
+    condition: Optional[Callable] = None
+
+    def is_met(self, value, subject) -> bool:
+        return value >= self.threshold and (self.condition is None or self.condition(subject))
+
+
+@dataclass(frozen=True)
+class BadgeTrigger:
+    """
+    The rules evaluated when a metric of a model changes, and how to load the objects for them.
+
+    Attributes:
+        metric (str): The attribute path of the metric on a loaded object, e.g. `post.score`.
+        recipient (str): The attribute path of the ID of the user who earns the badges.
+        rules (tuple): The `BadgeRule`s.
+        select_related (tuple): The relations the metric, recipient and conditions read.
+        annotations (callable): Returns the annotations the metric reads, if any.
+    """
+
+    metric: str
+    recipient: str
+    rules: tuple
+    select_related: tuple = ()
+    annotations: Callable = field(default=dict)
+
+    @property
+    def thresholds(self) -> tuple:
+        return tuple(sorted({rule.threshold for rule in self.rules}))
+
+    def get_metric(self, subject):
+        return attrgetter(self.metric)(subject)
+
+    def get_recipient(self, subject):
+        return attrgetter(self.recipient)(subject)
+
+
+def is_question(post) -> bool:
+    return hasattr(post, "question")
+
+
+def is_answer(post) -> bool:
+    return hasattr(post, "answer")
+
+
+def is_own_answer(post) -> bool:
+    return is_answer(post) and post.answer.question.post.user_id == post.user_id
+
+
+BADGE_TRIGGERS = {
+    ("forum.Post", "score"): BadgeTrigger(
+        metric="score",
+        recipient="user_id",
+        select_related=("question", "answer__question__post"),
+        rules=(
+            BadgeRule("Nice Question", NICE_QUESTION_THRESHOLD, is_question),
+            BadgeRule("Good Question", GOOD_QUESTION_THRESHOLD, is_question),
+            BadgeRule("Great Question", GREAT_QUESTION_THRESHOLD, is_question),
+            BadgeRule("Teacher", 1, is_answer),
+            BadgeRule("Self-Learner", SELF_LEARNER, is_own_answer),
+            BadgeRule("Nice Answer", NICE_ANSWER, is_answer),
+            BadgeRule("Good Answer", GOOD_ANSWER, is_answer),
+            BadgeRule("Great Answer", GREAT_ANSWER, is_answer),
+        ),
+    ),
+    ("forum.Post", "bookmarks"): BadgeTrigger(
+        metric="bookmark_count",
+        recipient="user_id",
+        select_related=("question", "answer"),
+        annotations=lambda: {"bookmark_count": Count("bookmarks")},
+        rules=(
+            BadgeRule("Favorite Question", FAVORITE_QUESTION, is_question),
+            BadgeRule("Stellar Question", STELLAR_QUESTION, is_question),
+            BadgeRule("Favorite Answer", FAVORITE_ANSWER, is_answer),
+            BadgeRule("Stellar Answer", STELLAR_ANSWER, is_answer),
+        ),
+    ),
+    ("forum.Question", "views"): BadgeTrigger(
+        metric="view_count",
+        recipient="post.user_id",
+        select_related=("post",),
+        rules=(
+            BadgeRule("Popular Question", POPULAR_QUESTION_THRESHOLD),
+            BadgeRule("Notable Question", NOTABLE_QUESTION_THRESHOLD),
+            BadgeRule("Famous Question", FAMOUS_QUESTION_THRESHOLD),
+        ),
+    ),
+    ("forum.Answer", "accepted"): BadgeTrigger(
+        metric="post.score",
+        recipient="post.user_id",
+        select_related=("post",),
+        rules=(BadgeRule("Guru", GURU_ANSWER, attrgetter("is_accepted")),),
+    ),
+    ("resources.Resource", "score"): BadgeTrigger(
+        metric="score",
+        recipient="user_id",
+        rules=(
+            BadgeRule("Nice Resource", ResourceConstants.NICE_RESOURCE_THRESHOLD),
+            BadgeRule("Good Resource", ResourceConstants.GOOD_RESOURCE_THRESHOLD),
+            BadgeRule("Great Resource", ResourceConstants.GREAT_RESOURCE_THRESHOLD),
+        ),
+    ),
+}
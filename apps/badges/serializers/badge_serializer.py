@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from apps.badges.models.badge_models import Badge
+from apps.badges.models.badge_models import Badge, LeaderboardEntry
 
 
 class BadgeSerializer(serializers.ModelSerializer):
@@ -15,3 +15,17 @@ class UserBadgeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Badge
         fields = ("badge", "created_at")
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(read_only=True)
+    fullname = serializers.CharField(source="user.get_fullname", read_only=True)
+    username = serializers.CharField(source="user.username", read_only=True)
+    avatar = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ("rank", "fullname", "username", "avatar", "reputation")
+
+    def get_avatar(self, entry):
+        return entry.user.avatar.url if entry.user.avatar else None
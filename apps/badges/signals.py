@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.badges.models.badge_models import Badge
+from apps.badges.utils import invalidate_badge_catalog
+
+
+@receiver(post_save, sender=Badge)
+@receiver(post_delete, sender=Badge)
+def invalidate_badge_catalog_on_change(sender, **kwargs):
+    invalidate_badge_catalog()
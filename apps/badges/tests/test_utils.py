@@ -0,0 +1,53 @@
+import pytest
+from django.core.management import call_command
+
+from apps.badges.models.badge_models import UserBadge
+from apps.badges.utils import evaluate_badge_events, get_badge_catalog
+from apps.forum.constants import GURU_ANSWER, NICE_ANSWER, POPULAR_QUESTION_THRESHOLD
+from apps.forum.models.qa_models import Answer, Post, Question
+from apps.forum.tests.factories import AnswerFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestBadgeEngine:
+    def test_batch_is_evaluated_with_constant_queries(self, django_assert_num_queries):
+        call_command("load_badges")
+        get_badge_catalog()
+        answers = AnswerFactory.create_batch(size=5)
+        Post.objects.filter(answer__in=answers).update(score=NICE_ANSWER)
+        events = [("forum.Post", "score", answer.post_id) for answer in answers]
+
+        with django_assert_num_queries(2):
+            evaluate_badge_events(events)
+        evaluate_badge_events(events)
+
+        badges = UserBadge.objects.values_list("badge__name", flat=True)
+        assert sorted(badges) == sorted(["Nice Answer", "Teacher"] * len(answers))
+
+    def test_guru_requires_accepted_answer(self):
+        call_command("load_badges")
+        accepted, other = AnswerFactory.create_batch(size=2)
+        Answer.objects.filter(pk=accepted.pk).update(is_accepted=True)
+        Post.objects.filter(answer__in=(accepted, other)).update(score=GURU_ANSWER)
+
+        evaluate_badge_events([("forum.Answer", "accepted", accepted.pk), ("forum.Answer", "accepted", other.pk)])
+
+        assert list(UserBadge.objects.filter(badge__name="Guru").values_list("user", flat=True)) == [
+            accepted.post.user_id
+        ]
+
+    def test_backfill_awards_missing_badges_once(self):
+        call_command("load_badges")
+        answers = AnswerFactory.create_batch(size=3)
+        Post.objects.filter(answer__in=answers).update(score=NICE_ANSWER)
+        Question.objects.filter(pk=answers[0].question_id).update(view_count=POPULAR_QUESTION_THRESHOLD)
+
+        call_command("backfill_badges", "--dry-run", "--chunk-size", "2")
+        assert not UserBadge.objects.exists()
+
+        call_command("backfill_badges", "--chunk-size", "2")
+        call_command("backfill_badges")
+
+        badges = UserBadge.objects.values_list("badge__name", flat=True)
+        assert sorted(badges) == sorted(["Nice Answer", "Teacher"] * len(answers) + ["Popular Question"])
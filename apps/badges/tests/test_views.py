@@ -0,0 +1,81 @@
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from apps.entities.models import Department, Faculty, Student
+from apps.factories import UserFactory
+from apps.users.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def students():
+    """
+    Creates three students of the same faculty who earn 30, 50 and 10 reputation points respectively.
+    """
+    faculty = Faculty.objects.create(name="FACULTY OF COMPUTING")
+    department = Department.objects.create(name="COMPUTER SCIENCE", faculty=faculty)
+    return [
+        Student.objects.create(
+            user=UserFactory.create(),
+            faculty=faculty,
+            department=department,
+            year_in_school=1,
+            admission_date=date.today(),
+            graduation_date=date.today(),
+        ).user
+        for _ in range(3)
+    ]
+
+
+class TestLeaderboardView:
+    def get_leaderboard(self, client, url, **params):
+        response = client.get(url, params)
+        assert response.status_code == status.HTTP_200_OK
+        entries = [(entry["rank"], entry["username"], entry["reputation"]) for entry in response.data["results"]]
+        return entries, response.data["next"]
+
+    def test_leaderboards_follow_reputation_changes(self, api_client, students, django_capture_on_commit_callbacks):
+        first, second, third = students
+        with django_capture_on_commit_callbacks(execute=True):
+            for user, points in ((first, 30), (second, 50), (third, 10)):
+                User.change_reputation(user.pk, points)
+        api_client.force_authenticate(first)
+        url = reverse("badges:leaderboard")
+
+        entries, next_url = self.get_leaderboard(api_client, url, timeframe="weekly", size=2)
+        assert entries == [(1, second.username, 50), (2, first.username, 30)]
+        entries, next_url = self.get_leaderboard(api_client, next_url)
+        assert entries == [(3, third.username, 10)]
+        assert next_url is None
+
+        entries, _ = self.get_leaderboard(api_client, url)
+        assert entries == [(1, second.username, 51), (2, first.username, 31), (3, third.username, 11)]
+
+        call_command("roll_over_leaderboards", "--rebuild")
+        assert self.get_leaderboard(api_client, url, timeframe="daily")[0] == [
+            (1, second.username, 50),
+            (2, first.username, 30),
+            (3, third.username, 10),
+        ]
+
+    def test_rank(self, api_client, students, django_capture_on_commit_callbacks):
+        first, second, _ = students
+        with django_capture_on_commit_callbacks(execute=True):
+            User.change_reputation(first.pk, 30)
+            User.change_reputation(second.pk, 50)
+        api_client.force_authenticate(first)
+        url = reverse("badges:leaderboard-rank")
+
+        response = api_client.get(url, {"timeframe": "daily"})
+        assert (response.data["rank"], response.data["reputation"]) == (2, 30)
+
+        response = api_client.get(url, {"timeframe": "daily", "username": second.username})
+        assert (response.data["rank"], response.data["reputation"]) == (1, 50)
+
+        response = api_client.get(url, {"timeframe": "daily", "username": UserFactory.create().username})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -1,10 +1,11 @@
 from django.urls import path
 
-from apps.badges.views.badge_views import LeaderboardView, UserBadgesView
+from apps.badges.views.badge_views import LeaderboardRankView, LeaderboardView, UserBadgesView
 
 app_name = "badges"
 
 urlpatterns = [
     path("leaderboard/", LeaderboardView.as_view(), name="leaderboard"),
+    path("leaderboard/rank/", LeaderboardRankView.as_view(), name="leaderboard-rank"),
     path("user/<str:username>/badges/", UserBadgesView.as_view(), name="user-badges"),
 ]
@@ -0,0 +1,203 @@
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.badges.models.badge_models import Badge, LeaderboardEntry, UserBadge
+from apps.badges.rules import BADGE_TRIGGERS
+from apps.common.utils import OnCommitBatch, run_in_background
+from apps.entities.models.admin_models import FacultyAdmin
+from apps.entities.models.student_models import Student
+from apps.entities.models.teacher_models import Teacher
+
+Timeframe = LeaderboardEntry.Timeframe
+
+BADGE_CATALOG_KEY = "badges:catalog"
+
+
+def get_user_faculty_ids(user_ids=None) -> dict:
+    """
+    Returns the faculty of each user who is a student, teacher or faculty admin.
+
+    Args:
+        user_ids (Iterable): Only look up these users. All users by default.
+
+    Returns:
+        dict: A mapping of user ID to faculty ID.
+    """
+    faculty_ids = {}
+    for model in (FacultyAdmin, Teacher, Student):
+        members = model.objects.all()
+        if user_ids is not None:
+            members = members.filter(user_id__in=user_ids)
+        faculty_ids.update(members.values_list("user_id", "faculty_id"))
+    return faculty_ids
+
+
+def update_leaderboards(daily_changes: dict, reputations: dict):
+    """
+    Applies reputation changes to the leaderboards of the users' faculties.
+
+    The daily and all-time entries are set to the new values and the weekly entries are moved by the change
+    of the day, all with one bulk update of the locked entries. Users without a faculty are skipped.
+
+    Args:
+        daily_changes (dict): A mapping of `(user_id, day)` to the `(previous, new)` reputation earned that day.
+        reputations (dict): A mapping of user ID to the user's current reputation.
+    """
+    faculty_ids = get_user_faculty_ids(reputations.keys() | {user_id for user_id, _ in daily_changes})
+    values, increments = {}, defaultdict(int)
+    for (user_id, day), (previous, new) in daily_changes.items():
+        if faculty_id := faculty_ids.get(user_id):
+            values[faculty_id, Timeframe.DAILY, day, user_id] = new
+            weekly = LeaderboardEntry.get_period(Timeframe.WEEKLY, day)
+            increments[faculty_id, Timeframe.WEEKLY, weekly, user_id] += new - previous
+    for user_id, reputation in reputations.items():
+        if faculty_id := faculty_ids.get(user_id):
+            values[faculty_id, Timeframe.ALL, LeaderboardEntry.ALL_TIME_PERIOD, user_id] = reputation
+
+    keys = values.keys() | increments.keys()
+    if not keys:
+        return
+
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(faculty_id=faculty_id, timeframe=timeframe, period=period, user_id=user_id)
+            for faculty_id, timeframe, period, user_id in keys
+        ],
+        ignore_conflicts=True,
+    )
+    entries = LeaderboardEntry.objects.select_for_update().filter(
+        user_id__in={key[3] for key in keys}, period__in={key[2] for key in keys}
+    )
+    entries = [entry for entry in entries.order_by("pk") if get_entry_key(entry) in keys]
+    for entry in entries:
+        key = get_entry_key(entry)
+        entry.reputation = values[key] if key in values else entry.reputation + increments[key]
+    LeaderboardEntry.objects.bulk_update(entries, ["reputation"])
+
+
+def get_entry_key(entry) -> tuple:
+    return entry.faculty_id, entry.timeframe, entry.period, entry.user_id
+
+
+def roll_over_leaderboards() -> int:
+    """
+    Deletes the daily and weekly entries of periods that ended. Reads only ever use the current period, so
+    this just keeps the table small.
+
+    Returns:
+        int: The number of entries deleted.
+    """
+    today = timezone.localdate()
+    count = 0
+    for timeframe in (Timeframe.DAILY, Timeframe.WEEKLY):
+        current = LeaderboardEntry.get_period(timeframe, today)
+        count += LeaderboardEntry.objects.filter(timeframe=timeframe, period__lt=current).delete()[0]
+    return count
+
+
+def get_leaderboard(faculty_id, timeframe: str):
+    """
+    Returns the current leaderboard of a faculty for a timeframe, best first.
+    """
+    return LeaderboardEntry.objects.filter(
+        faculty_id=faculty_id, timeframe=timeframe, period=LeaderboardEntry.get_period(timeframe, timezone.localdate())
+    ).order_by("-reputation", "-pk")
+
+
+def get_badge_catalog() -> dict:
+    """
+    Returns the ID of every badge by name. It is cached until a badge is saved or deleted.
+    """
+    catalog = cache.get(BADGE_CATALOG_KEY)
+    if catalog is None:
+        catalog = dict(Badge.objects.values_list("name", "pk"))
+        cache.set(BADGE_CATALOG_KEY, catalog, None)
+    return catalog
+
+
+def invalidate_badge_catalog():
+    cache.delete(BADGE_CATALOG_KEY)
+
+
+def get_badge_thresholds(model, metric: str) -> tuple:
+    """
+    Returns the values of a metric of a model at which a badge can be earned, lowest first.
+    """
+    trigger = BADGE_TRIGGERS.get((model._meta.label, metric))
+    return trigger.thresholds if trigger else ()
+
+
+def award_badges(awards) -> int:
+    """
+    Awards badges with a single insert that skips the badges users already have.
+
+    Args:
+        awards (Iterable): `(user ID, badge name)` pairs. Badges missing from the catalog are skipped.
+
+    Returns:
+        int: The number of awards attempted.
+    """
+    catalog = get_badge_catalog()
+    user_badges = [
+        UserBadge(user_id=user_id, badge_id=catalog[name]) for user_id, name in set(awards) if name in catalog
+    ]
+    UserBadge.objects.bulk_create(user_badges, ignore_conflicts=True)
+    return len(user_badges)
+
+
+def get_trigger_queryset(key: tuple, trigger):
+    """
+    Returns the objects of a trigger's model with the relations and annotations its rules read.
+    """
+    return apps.get_model(key[0]).objects.select_related(*trigger.select_related).annotate(**trigger.annotations())
+
+
+def get_badge_awards(trigger, subjects) -> set:
+    """
+    Checks the rules of a trigger against loaded objects.
+
+    Returns:
+        set: The `(user ID, badge name)` pairs earned.
+    """
+    awards = set()
+    for subject in subjects:
+        value = trigger.get_metric(subject)
+        recipient = trigger.get_recipient(subject)
+        awards.update((recipient, rule.badge) for rule in trigger.rules if rule.is_met(value, subject))
+    return awards
+
+
+def evaluate_badge_events(events):
+    """
+    Evaluates the badge rules of domain events and awards every badge that is met.
+
+    The objects of each trigger are loaded with one query, the rules are checked in memory and the awards
+    are written with one insert, so a batch costs the same few queries however many events it holds.
+
+    Args:
+        events (Iterable): `(model label, metric, object ID)` triples, see `BADGE_TRIGGERS`.
+    """
+    by_trigger = defaultdict(set)
+    for label, metric, pk in events:
+        by_trigger[label, metric].add(pk)
+
+    awards = set()
+    for key, pks in by_trigger.items():
+        if (trigger := BADGE_TRIGGERS.get(key)) is not None:
+            awards |= get_badge_awards(trigger, get_trigger_queryset(key, trigger).filter(pk__in=pks))
+    award_badges(awards)
+
+
+badge_events = OnCommitBatch(lambda events: run_in_background(evaluate_badge_events, events))
+
+
+def record_badge_event(model, metric: str, pk):
+    """
+    Records that a metric of an object changed. Its badge rules are evaluated in a background batch once
+    the current transaction commits, so the caller pays no badge queries.
+    """
+    if (model._meta.label, metric) in BADGE_TRIGGERS:
+        badge_events.add((model._meta.label, metric, pk))
@@ -1,79 +1,101 @@
-from datetime import timedelta
+from uuid import UUID
 
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Sum
-from django.utils import timezone
+from django.shortcuts import get_object_or_404
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.badges.models.badge_models import UserBadge
-from apps.badges.serializers.badge_serializer import UserBadgeSerializer
+from apps.badges.models.badge_models import LeaderboardEntry, UserBadge
+from apps.badges.pagination import LeaderboardPagination
+from apps.badges.serializers.badge_serializer import LeaderboardEntrySerializer, UserBadgeSerializer
+from apps.badges.utils import get_leaderboard, get_user_faculty_ids
 from apps.entities.models.faculty_models import Faculty
 
 User = get_user_model()
+Timeframe = LeaderboardEntry.Timeframe
 
 
-class LeaderboardView(APIView):
+class LeaderboardMixin:
+    """
+    Resolves the leaderboard a request asks for from its `faculty` and `timeframe` query parameters.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = LeaderboardEntrySerializer
+
+    def get_timeframe(self):
+        timeframe = self.request.query_params.get("timeframe", Timeframe.ALL)
+        return timeframe if timeframe in Timeframe.values else Timeframe.ALL
+
+    def get_faculty_id(self):
+        """
+        Returns the requested faculty, else the faculty of the requesting user, else the first faculty.
+        """
+        if faculty_id := self.request.query_params.get("faculty"):
+            try:
+                return UUID(faculty_id)
+            except ValueError:
+                raise ValidationError({"faculty": "Must be a valid UUID."})
+
+        user_id = self.request.user.pk
+        if faculty_id := get_user_faculty_ids([user_id]).get(user_id):
+            return faculty_id
+        return Faculty.objects.order_by("name").values_list("pk", flat=True).first()
+
+    def get_queryset(self):
+        return get_leaderboard(self.get_faculty_id(), self.get_timeframe()).select_related("user")
+
+
+class LeaderboardView(LeaderboardMixin, generics.ListAPIView):
     """
     API view for retrieving the leaderboard of users based on reputation.
 
-    The leaderboard can be filtered by timeframe, such as daily, weekly, or all-time.
-    By default, the leaderboard shows the top 10 users based on reputation.
+    Leaderboards are kept per faculty and timeframe as reputation changes, so a page is read with a single
+    indexed range scan. Pages hold 10 users by default and are followed with the returned cursors.
 
     Usage:
         GET /leaderboard/?timeframe=daily
-        GET /leaderboard/?timeframe=weekly
-        GET /leaderboard/?timeframe=all
+        GET /leaderboard/?timeframe=weekly&faculty=<faculty id>&size=50
+        GET /leaderboard/?timeframe=all&cursor=<cursor>
 
     Parameters:
-        - timeframe (str): The timeframe to filter the leaderboard. Default is 'all-time'.
+        - timeframe (str): `daily`, `weekly` or `all`. Default is 'all'.
+        - faculty (str): The ID of the faculty. Defaults to the faculty of the requesting user.
 
     Returns:
         A JSON response.
     """
 
-    permission_classes = (IsAuthenticated,)
+    pagination_class = LeaderboardPagination
 
-    def get(self, request):
-        timeframe = request.query_params.get("timeframe", "all")  # Default to 'all-time'
-        today = timezone.localdate()
-        start_of_week = today - timedelta(days=today.weekday())  # Monday
-
-        # In the future when we have multiple faculties, this should be dynamic
-        faculty = Faculty.objects.filter(name="Faculty of Computing").first()
-        users = User.objects.filter(
-            Q(student__faculty=faculty) | Q(teacher__faculty=faculty) | Q(faculty_admin__faculty=faculty)
-        )
-
-        if timeframe == "daily":
-            date_filter = today
-        elif timeframe == "weekly":
-            date_filter = start_of_week
-        else:
-            date_filter = None  # For all-time, no date filtering
-
-        if date_filter:
-            users = (
-                users.filter(daily_reputations__date__gte=date_filter)
-                .annotate(total_reputation=Sum("daily_reputations__reputation"))
-                .order_by("-total_reputation")
-            )
+
+class LeaderboardRankView(LeaderboardMixin, generics.RetrieveAPIView):
+    """
+    API view for retrieving the rank of a user on a leaderboard.
+
+    Usage:
+        GET /leaderboard/rank/?timeframe=weekly
+        GET /leaderboard/rank/?timeframe=all&username=<username>
+
+    Parameters:
+        - timeframe (str): `daily`, `weekly` or `all`. Default is 'all'.
+        - faculty (str): The ID of the faculty. Defaults to the faculty of the requesting user.
+        - username (str): The user to rank. Defaults to the requesting user.
+
+    Raises:
+        - 404: If the user is not on the leaderboard.
+    """
+
+    def get_object(self):
+        if username := self.request.query_params.get("username"):
+            entry = get_object_or_404(self.get_queryset(), user__username=username)
         else:
-            users = users.order_by("-reputation")
-
-        data = [
-            {
-                "rank": rank + 1,
-                "fullname": user.get_fullname,
-                "username": user.username,
-                "avatar": user.avatar.url if user.avatar else None,
-                "reputation": user.total_reputation if date_filter else user.reputation,
-            }
-            for rank, user in enumerate(users[:10])  # top 10 users
-        ]
-
-        return Response(data)
+            entry = get_object_or_404(self.get_queryset(), user=self.request.user)
+        entry.rank = entry.get_rank()
+        return entry
 
 
 class UserBadgesView(APIView):
@@ -0,0 +1,45 @@
+import asyncio
+from contextlib import suppress
+
+
+class DisconnectMiddleware:
+    """
+    Cancels the handling of an HTTP request once its client disconnects.
+
+    Django 4.2 stops reading from the client once the request body is received, so a streamed response
+    runs until its content ends even when nobody reads it anymore. This middleware keeps listening for
+    `http.disconnect` and then cancels the request, which closes the response content, e.g. to stop a
+    text generation or a notification stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        body_received = asyncio.Event()
+
+        async def receive_request():
+            message = await receive()
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                body_received.set()
+            return message
+
+        async def listen_for_disconnect():
+            await body_received.wait()
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        handler = asyncio.create_task(self.app(scope, receive_request, send))
+        listener = asyncio.create_task(listen_for_disconnect())
+        try:
+            await asyncio.wait((handler, listener), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (handler, listener):
+                task.cancel()
+            with suppress(asyncio.CancelledError):
+                await listener
+        with suppress(asyncio.CancelledError):
+            return await handler
@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = """
+        Applies pending reputation ledger events to the users' reputation and daily rollups. Changes are
+        normally applied right after they are recorded; run it to catch up after a crash. With `--replay` the
+        reputation is rebuilt from the whole ledger instead. Sample Usage: `python manage.py aggregate_reputation`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--replay", action="store_true", help="Rebuild the reputation from the whole ledger.")
+        parser.add_argument("--users", type=int, nargs="+", help="Only apply the events of these user IDs.")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Number of users replayed at once.")
+
+    def handle(self, *args, **options):
+        if options["replay"]:
+            count = self.replay(options["users"], options["chunk_size"])
+        else:
+            count = 0
+            while applied := User.aggregate_reputation(options["users"]):
+                count += applied
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully applied {count} reputation events"))
+
+    def replay(self, user_ids, chunk_size):
+        users = User.objects.order_by("pk").values_list("pk", flat=True)
+        if user_ids:
+            users = users.filter(pk__in=user_ids)
+
+        count, last_pk = 0, None
+        while True:
+            chunk = users.filter(pk__gt=last_pk) if last_pk else users
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                return count
+            count += User.replay_reputation(chunk)
+            last_pk = chunk[-1]
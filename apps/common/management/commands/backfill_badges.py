@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.badges.models.badge_models import UserBadge
+from apps.badges.rules import BADGE_TRIGGERS
+from apps.badges.utils import get_badge_awards, get_badge_catalog, get_trigger_queryset
+
+
+class Command(BaseCommand):
+    help = """
+        Awards every badge earned by existing content, e.g. after a threshold changed or a badge was added with
+        `load_badges`. Each rule trigger is scanned in primary key chunks, selecting in SQL only the objects
+        that reach its lowest threshold, and the missing badges of a chunk are inserted at once. Running it
+        again awards nothing new. Every chunk prints a checkpoint that `--after` resumes from.
+        Sample Usage: `python manage.py backfill_badges --trigger forum.Post:score --dry-run`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Count the missing badges without awarding them.")
+        parser.add_argument(
+            "--trigger",
+            nargs="+",
+            default=[f"{label}:{metric}" for label, metric in BADGE_TRIGGERS],
+            help="Only evaluate these triggers, e.g. `forum.Question:views`. All triggers by default.",
+        )
+        parser.add_argument("--after", help="Resume a single trigger after this primary key.")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Number of objects evaluated at once.")
+
+    def handle(self, *args, **options):
+        keys = [tuple(trigger.split(":", 1)) for trigger in options["trigger"]]
+        if unknown := [":".join(key) for key in keys if key not in BADGE_TRIGGERS]:
+            raise CommandError(f"Unknown triggers: {', '.join(unknown)}")
+        if options["after"] and len(keys) > 1:
+            raise CommandError("--after resumes a single trigger.")
+
+        count = sum(self.backfill(key, options["after"], options["chunk_size"], options["dry_run"]) for key in keys)
+
+        verb = "Would award" if options["dry_run"] else "Successfully awarded"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} badges"))
+
+    def backfill(self, key, last_pk, chunk_size, dry_run):
+        trigger = BADGE_TRIGGERS[key]
+        reached = {f"{trigger.metric.replace('.', '__')}__gte": trigger.thresholds[0]}
+        candidates = get_trigger_queryset(key, trigger).filter(**reached).order_by("pk")
+
+        count = 0
+        while True:
+            chunk = candidates.filter(pk__gt=last_pk) if last_pk else candidates
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                return count
+
+            missing = self.get_missing_badges(get_badge_awards(trigger, chunk))
+            if not dry_run:
+                UserBadge.objects.bulk_create(missing, ignore_conflicts=True)
+            count += len(missing)
+            last_pk = chunk[-1].pk
+            self.stdout.write(f"{':'.join(key)} after {last_pk}: {len(missing)} badges")
+
+    def get_missing_badges(self, awards):
+        catalog = get_badge_catalog()
+        awards = {(user_id, catalog[name]) for user_id, name in awards if name in catalog}
+        if not awards:
+            return []
+
+        existing = UserBadge.objects.filter(
+            user_id__in={user_id for user_id, _ in awards}, badge_id__in={badge_id for _, badge_id in awards}
+        ).values_list("user_id", "badge_id")
+        return [UserBadge(user_id=user_id, badge_id=badge_id) for user_id, badge_id in awards - set(existing)]
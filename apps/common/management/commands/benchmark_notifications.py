@@ -0,0 +1,52 @@
+from time import perf_counter
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+
+from apps.forum.models.qa_models import Question
+from apps.notifications.models.notification_models import Notification, Subscription
+from apps.notifications.utils import fan_out_notification, notify_user
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = """
+        Measures how fast a notification is fanned out to the subscribers of one object. Creates temporary
+        users subscribed to a made-up question, and deletes them afterwards. `--baseline` also times creating
+        the notifications one at a time. Sample Usage: `python manage.py benchmark_notifications --baseline`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscribers", type=int, default=10_000, help="Number of subscribers notified.")
+        parser.add_argument("--baseline", action="store_true", help="Also time one insert per notification.")
+
+    def handle(self, *args, **options):
+        content_type = ContentType.objects.get_for_model(Question)
+        object_id = uuid4()
+        run_id = object_id.hex[:8]
+        users = User.objects.bulk_create(
+            [User(username=f"benchmark-{run_id}-{index}") for index in range(options["subscribers"])]
+        )
+        Subscription.objects.bulk_create(
+            [Subscription(user=user, target_content_type=content_type, target_object_id=object_id) for user in users]
+        )
+
+        try:
+            started = perf_counter()
+            count = fan_out_notification(content_type.pk, object_id, {"title": "Benchmark", "message": "Benchmark"})
+            self.report("bulk", count, perf_counter() - started)
+
+            if options["baseline"]:
+                Notification.objects.filter(target_object_id=object_id).delete()
+                started = perf_counter()
+                for user in users:
+                    notify_user(user, "Benchmark", "Benchmark")
+                self.report("per-row", len(users), perf_counter() - started)
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def report(self, label, count, elapsed):
+        self.stdout.write(f"{label}: {count} notifications in {elapsed:.2f}s ({count / elapsed:.0f} notifications/s)")
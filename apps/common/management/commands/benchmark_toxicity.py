@@ -0,0 +1,55 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from apps.services.registry import model_registry
+from apps.services.utils import TOXIC_LABEL, check_toxicity_many, chunk_text
+
+THRESHOLD = 0.5
+WORDS = "the answer explains how a binary search tree keeps its keys ordered so lookups stay fast".split()
+
+
+class Command(BaseCommand):
+    help = """
+        Measures toxicity checks per second when many requests check a title and a body at once, one chunk
+        per model call against batched windows merged across requests. Both use the already loaded model, so
+        the old per-call model load is not included. Sample Usage: `python manage.py benchmark_toxicity`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=64, help="Number of requests checked.")
+        parser.add_argument("--threads", type=int, default=8, help="Number of concurrent requests.")
+        parser.add_argument("--length", type=int, default=2000, help="Number of characters of each body.")
+
+    def handle(self, *args, **options):
+        classifier = model_registry.get("toxicity")
+        requests = [[self.make_text(80), self.make_text(options["length"])] for _ in range(options["requests"])]
+
+        def check_in_loop(texts):
+            return [
+                any(
+                    result["label"] == TOXIC_LABEL and result["score"] >= THRESHOLD
+                    for chunk in chunk_text(text)
+                    for result in classifier(chunk)
+                )
+                for text in texts
+            ]
+
+        with override_settings(USE_AI_MODELS=True):
+            for label, check in (("loop", check_in_loop), ("batched", check_toxicity_many)):
+                started = perf_counter()
+                with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+                    list(executor.map(check, requests))
+                elapsed = perf_counter() - started
+                self.stdout.write(
+                    f"{label}: {len(requests)} requests in {elapsed:.2f}s ({len(requests) / elapsed:.1f} requests/s)"
+                )
+
+    def make_text(self, length):
+        words = []
+        while sum(len(word) + 1 for word in words) < length:
+            words.append(random.choice(WORDS))
+        return " ".join(words)
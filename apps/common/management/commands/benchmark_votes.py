@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import override_settings
+
+from apps.common.utils import fold_counters
+from apps.content_actions.models.vote_models import Vote
+from apps.content_actions.utils import apply_vote
+from apps.forum.models.qa_models import Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = """
+        Measures vote throughput when many users vote on the same post at once, with and without sharded
+        counters. Creates temporary users and a post, and deletes them afterwards. Only meaningful on
+        PostgreSQL; SQLite serializes every write. Sample Usage: `python manage.py benchmark_votes --threads 16`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Number of concurrent voters.")
+        parser.add_argument("--votes", type=int, default=50, help="Number of votes cast by each thread.")
+        parser.add_argument("--shards", type=int, nargs="+", default=[0, 8], help="Shard counts to compare.")
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite":
+            self.stdout.write(self.style.WARNING("SQLite serializes writes, so shards cannot improve throughput."))
+
+        for shards in options["shards"]:
+            with override_settings(COUNTER_SHARDS=shards):
+                elapsed, vote_count = self.run(options["threads"], options["votes"])
+            votes = options["threads"] * options["votes"]
+            self.stdout.write(
+                f"shards={shards}: {votes} votes in {elapsed:.2f}s ({votes / elapsed:.0f} votes/s), "
+                f"vote_count={vote_count}"
+            )
+
+    def run(self, threads, votes):
+        author = User.objects.create(username="benchmark-author")
+        voters = User.objects.bulk_create(
+            [User(username=f"benchmark-voter-{index}") for index in range(threads * votes)]
+        )
+        post = Post.objects.create(user=author, body="Benchmark post")
+
+        def vote(chunk):
+            try:
+                for voter in chunk:
+                    apply_vote(voter, post, Vote.UPVOTE)
+            finally:
+                connections.close_all()
+
+        try:
+            started = perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(executor.map(vote, [voters[index::threads] for index in range(threads)]))
+            elapsed = perf_counter() - started
+
+            fold_counters(Post)
+            fold_counters(User)
+            post.refresh_from_db()
+            return elapsed, post.vote_count
+        finally:
+            User.objects.filter(pk__in=[author.pk, *(voter.pk for voter in voters)]).delete()
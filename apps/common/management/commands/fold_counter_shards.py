@@ -0,0 +1,25 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.utils import fold_counters
+
+
+class Command(BaseCommand):
+    help = """
+        Folds the increments held in counter shards into the counter fields. Run it periodically, e.g. every
+        minute from cron, when `COUNTER_SHARDS` is set. Sample Usage: `python manage.py fold_counter_shards`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", help="Only fold the counters of this model, e.g. `forum.Post`.")
+
+    def handle(self, *args, **options):
+        model = None
+        if options["model"]:
+            try:
+                model = apps.get_model(options["model"])
+            except (LookupError, ValueError):
+                raise CommandError(f'Model "{options["model"]}" does not exist')
+
+        count = fold_counters(model)
+        self.stdout.write(self.style.SUCCESS(f"Successfully folded {count} counters"))
@@ -0,0 +1,44 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.content_actions.models.view_models import ViewTracker
+from apps.content_actions.utils import add_viewers
+
+
+class Command(BaseCommand):
+    help = """
+        Folds ViewTracker rows into the compact viewer sets. View counts are left untouched, since the rows
+        were already counted. Sample Usage: `python manage.py fold_view_trackers --delete`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Number of rows folded at once.")
+        parser.add_argument("--delete", action="store_true", help="Delete the rows once they are folded.")
+
+    def handle(self, *args, **options):
+        rows = ViewTracker.objects.order_by("pk").values_list("pk", "content_type_id", "object_id", "user_id")
+
+        count, last_pk = 0, None
+        while True:
+            chunk = rows.filter(pk__gt=last_pk) if last_pk else rows
+            chunk = list(chunk[: options["chunk_size"]])
+            if not chunk:
+                break
+            count += self.fold(chunk, options["delete"])
+            last_pk = chunk[-1][0]
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully folded {count} views"))
+
+    def fold(self, rows, delete):
+        by_content_type = defaultdict(lambda: defaultdict(set))
+        for _, content_type_id, object_id, user_id in rows:
+            by_content_type[content_type_id][object_id].add(user_id)
+
+        with transaction.atomic():
+            for content_type_id, viewers in by_content_type.items():
+                add_viewers(content_type_id, viewers)
+            if delete:
+                ViewTracker.objects.filter(pk__in=[row[0] for row in rows]).delete()
+        return len(rows)
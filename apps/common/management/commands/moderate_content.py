@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.services.moderation import moderate_pending
+
+
+class Command(BaseCommand):
+    help = """
+        Publishes or flags the posts, comments and resources still pending moderation, e.g. those of a
+        process that stopped before its background worker ran. Run it periodically from cron when
+        `MODERATION_MODE` is `async`.
+        Sample Usage: `python manage.py moderate_content`
+        """
+
+    def handle(self, *args, **options):
+        count = moderate_pending()
+        self.stdout.write(self.style.SUCCESS(f"Successfully moderated {count} pending objects"))
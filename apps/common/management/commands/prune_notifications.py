@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from apps.notifications.retention import archive_notifications, delete_expired_archives, drop_archive_partitions
+
+
+class Command(BaseCommand):
+    help = """
+        Moves the read notifications older than `NOTIFICATION_RETENTION_DAYS` to the archive, or deletes them
+        when `NOTIFICATION_ARCHIVE_RETENTION_DAYS` is 0, and expires old archives. Works in short chunked
+        transactions, so it can run while the site is live, e.g. nightly from cron.
+        Sample Usage: `python manage.py prune_notifications --chunk-size 500 --pause 0.1`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Number of rows moved per transaction.")
+        parser.add_argument("--pause", type=float, default=0, help="Seconds to wait between chunks.")
+
+    def handle(self, *args, **options):
+        count = archive_notifications(options["chunk_size"], options["pause"])
+        partitions = drop_archive_partitions()
+        expired = delete_expired_archives(options["chunk_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Successfully pruned {count} notifications and expired {expired} archived notifications "
+                f"and {partitions} archive partitions"
+            )
+        )
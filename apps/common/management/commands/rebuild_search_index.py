@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from apps.search.backends import get_search_backend
+from apps.search.models.search_models import SearchDocument
+from apps.search.utils import INDEXED_MODELS, index_instance
+
+
+class Command(BaseCommand):
+    help = """
+        Rebuilds the full-text search index from every question and resource.
+        Sample Usage: `python manage.py rebuild_search_index --chunk-size 500`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Number of objects loaded per query.")
+        parser.add_argument("--clear", action="store_true", help="Delete every search document first.")
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.setup()
+        if options["clear"]:
+            SearchDocument.objects.all().delete()
+
+        for name, model in INDEXED_MODELS.items():
+            queryset = model.objects.visible_to(None).prefetch_related("tags")
+            if name == "question":
+                queryset = queryset.select_related("post")
+
+            count = 0
+            for instance in queryset.iterator(chunk_size=options["chunk_size"]):
+                index_instance(instance)
+                count += 1
+            self.stdout.write(f"Indexed {count} {model._meta.verbose_name_plural}")
+
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS("Successfully rebuilt the search index"))
@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from apps.notifications.utils import reconcile_unread_counts
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = """
+        Recounts the unread notifications of every user and caches the exact values, correcting counts that
+        drifted, e.g. after notifications were edited outside the API. Run it periodically from cron.
+        Sample Usage: `python manage.py reconcile_unread_counts --chunk-size 500`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Number of users recounted at once.")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("pk").values_list("pk", flat=True)
+        count, last_pk = 0, None
+        while user_ids := list((users.filter(pk__gt=last_pk) if last_pk else users)[: options["chunk_size"]]):
+            count += reconcile_unread_counts(user_ids)
+            last_pk = user_ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully reconciled the unread counts of {count} users"))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.forum.models.qa_models import Question
+from apps.forum.utils import rebuild_related_questions, refresh_popular_questions
+
+
+class Command(BaseCommand):
+    help = """
+        Rebuilds the related-questions index and refreshes the cached popular questions. Run it periodically,
+        e.g. from cron, to correct the drift of incremental index updates.
+        Sample Usage: `python manage.py refresh_question_rankings --chunk-size 200`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=200, help="Number of questions rebuilt at once.")
+        parser.add_argument("--popular-only", action="store_true", help="Only refresh the popular questions.")
+
+    def handle(self, *args, **options):
+        refresh_popular_questions()
+        if options["popular_only"]:
+            self.stdout.write(self.style.SUCCESS("Successfully refreshed the popular questions"))
+            return
+
+        chunk, count = [], 0
+        for question_id in Question.objects.order_by("pk").values_list("pk", flat=True).iterator():
+            chunk.append(question_id)
+            if len(chunk) == options["chunk_size"]:
+                rebuild_related_questions(chunk)
+                count, chunk = count + len(chunk), []
+        if chunk:
+            rebuild_related_questions(chunk)
+            count += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"Successfully rebuilt the related questions of {count} questions"))
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.badges.models.badge_models import DailyUserReputation, LeaderboardEntry
+from apps.badges.utils import get_user_faculty_ids, roll_over_leaderboards
+from apps.common.utils import fold_counters
+
+User = get_user_model()
+Timeframe = LeaderboardEntry.Timeframe
+
+
+class Command(BaseCommand):
+    help = """
+        Deletes the leaderboard entries of past days and weeks. Run it once a day after midnight. With
+        `--rebuild` every leaderboard is recomputed from the users' reputation and daily rollups instead, e.g.
+        to fill them for the first time. Sample Usage: `python manage.py roll_over_leaderboards`
+        """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="Recompute every leaderboard from scratch.")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            count = self.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"Successfully rebuilt {count} leaderboard entries"))
+        else:
+            count = roll_over_leaderboards()
+            self.stdout.write(self.style.SUCCESS(f"Successfully deleted {count} leaderboard entries"))
+
+    @transaction.atomic
+    def rebuild(self):
+        fold_counters(User)
+        faculty_ids = get_user_faculty_ids()
+        today = timezone.localdate()
+        week = LeaderboardEntry.get_period(Timeframe.WEEKLY, today)
+
+        daily_reputations = DailyUserReputation.objects.filter(date__gte=week)
+        reputations = {
+            (Timeframe.ALL, LeaderboardEntry.ALL_TIME_PERIOD): User.objects.values_list("pk", "reputation"),
+            (Timeframe.DAILY, today): daily_reputations.filter(date=today).values_list("user_id", "reputation"),
+            (Timeframe.WEEKLY, week): daily_reputations.values("user_id")
+            .annotate(total=Sum("reputation"))
+            .values_list("user_id", "total"),
+        }
+
+        LeaderboardEntry.objects.all().delete()
+        entries = (
+            LeaderboardEntry(
+                faculty_id=faculty_ids[user_id],
+                timeframe=timeframe,
+                period=period,
+                user_id=user_id,
+                reputation=reputation,
+            )
+            for (timeframe, period), rows in reputations.items()
+            for user_id, reputation in rows.iterator()
+            if user_id in faculty_ids
+        )
+        return len(LeaderboardEntry.objects.bulk_create(entries, batch_size=2000))
@@ -1,6 +1,7 @@
 import uuid
 
 from django.db import models
+from django.db.models import Q
 
 
 class BaseModel(models.Model):
@@ -15,3 +16,77 @@ class BaseModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class ModeratedModel(models.Model):
+    """
+    Base model for user content that is checked for toxic content before it is published.
+
+    With `MODERATION_MODE` set to `async`, new and edited content is saved as pending and published or
+    flagged by a background worker. Otherwise it is checked before it is saved and published right away.
+
+    Attributes:
+        moderation_status (str): Whether the content is pending, published or flagged as toxic.
+    """
+
+    class ModerationStatus(models.TextChoices):
+        PENDING = "pending"
+        PUBLISHED = "published"
+        FLAGGED = "flagged"
+
+    moderation_status = models.CharField(
+        max_length=10, choices=ModerationStatus.choices, default=ModerationStatus.PUBLISHED
+    )
+
+    class Meta:
+        abstract = True
+
+
+class ModeratedQuerySet(models.QuerySet):
+    """
+    A queryset of moderated content.
+
+    Attributes:
+        moderation_path (str): The lookup prefix of the moderated object, e.g. `post__` for a question.
+    """
+
+    moderation_path = ""
+
+    def visible_to(self, user):
+        """
+        Keeps the published content, and the content of `user` whatever its moderation status.
+        """
+        visible = Q(**{f"{self.moderation_path}moderation_status": ModeratedModel.ModerationStatus.PUBLISHED})
+        if user is not None and user.is_authenticated:
+            visible |= Q(**{f"{self.moderation_path}user": user})
+        return self.filter(visible)
+
+
+class CounterShard(BaseModel):
+    """
+    One of the rows the increments of a sharded counter are spread over.
+
+    A counter's value is the model field plus the sum of its shards, until the shards are folded back
+    into the field.
+
+    Attributes:
+        content_type (ContentType): The model of the counted object.
+        object_id (str): The ID of the counted object.
+        field (str): The name of the counter field, e.g. `vote_count`.
+        shard (int): The index of the shard, below `COUNTER_SHARDS`.
+        value (int): The increments not folded into the field yet.
+    """
+
+    content_type = models.ForeignKey("contenttypes.ContentType", on_delete=models.CASCADE)
+    object_id = models.CharField(max_length=36)
+    field = models.CharField(max_length=50)
+    shard = models.PositiveSmallIntegerField()
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("content_type", "object_id", "field", "shard"), name="countershard__1")
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} {self.object_id} {self.field}[{self.shard}] = {self.value}"
@@ -1,17 +1,355 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+from decimal import Decimal
+from hashlib import md5
+from uuid import UUID
+
 from django.conf import settings
-from rest_framework.pagination import PageNumberPagination
+from django.core.cache import cache
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+COUNT_GENERATION_KEY = "pagination:count-generation:{table}"
+COUNT_KEY = "pagination:count:{digest}"
+
+
+def invalidate_counts(*models):
+    """
+    Invalidates every cached page count that reads from the tables of the given models.
+
+    Args:
+        *models: Model classes or their many-to-many through models.
+    """
+    for model in models:
+        key = COUNT_GENERATION_KEY.format(table=model._meta.db_table)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_count_cache_key(queryset: QuerySet) -> str:
+    """
+    Builds a cache key from the count query and the generation of every table it reads, so the key
+    changes as soon as a row is created or deleted in any of them.
+    """
+    tables = sorted({queryset.model._meta.db_table, *(join.table_name for join in queryset.query.alias_map.values())})
+    generations = cache.get_many([COUNT_GENERATION_KEY.format(table=table) for table in tables])
+    sql, params = queryset.query.sql_with_params()
+    digest = md5(f"{sql}|{params}|{sorted(generations.items())}".encode(), usedforsecurity=False).hexdigest()
+    return COUNT_KEY.format(digest=digest)
+
+
+def estimate_count(queryset: QuerySet) -> int | None:
+    """
+    Returns the planner's row estimate for an unfiltered queryset over a large table.
+
+    Only PostgreSQL keeps the statistics this relies on. Filtered or distinct querysets, other databases
+    and tables smaller than `PAGINATION_ESTIMATE_THRESHOLD` return None and are counted exactly.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql" or queryset.query.where or queryset.query.distinct:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+
+    if row is None or row[0] < settings.PAGINATION_ESTIMATE_THRESHOLD:
+        return None
+    return row[0]
+
+
+class CachedCountPaginator(DjangoPaginator):
+    """
+    A paginator that caches the total count per filter for `PAGINATION_COUNT_TIMEOUT` seconds and
+    estimates it from planner statistics for large unfiltered tables.
+
+    Attributes:
+        count_is_approximate (bool): True if `count` is a planner estimate.
+    """
+
+    count_is_approximate = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+
+        if (estimate := estimate_count(self.object_list)) is not None:
+            self.count_is_approximate = True
+            return estimate
+
+        key = get_count_cache_key(self.object_list)
+        count = cache.get(key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, settings.PAGINATION_COUNT_TIMEOUT)
+        return count
 
 
 class DynamicPageSizePagination(PageNumberPagination):
     """
     A custom pagination class that allows dynamic page size based on the request query parameter.
 
+    Totals come from `CachedCountPaginator`, and `count_is_approximate` tells clients when `count` is an
+    estimate.
+
     Attributes:
         page_size_query_param (str): The name of the query parameter used to specify the page size.
         page_size (int): The default page size to use if the query parameter is not provided.
         max_page_size (int): The maximum allowed page size.
     """
 
+    django_paginator_class = CachedCountPaginator
     page_size_query_param = "size"
     page_size = getattr(settings, "PAGE_SIZE")
     max_page_size = getattr(settings, "MAX_PAGE_SIZE")
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data["count_is_approximate"] = self.page.paginator.count_is_approximate
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_approximate"] = {"type": "boolean", "example": False}
+        return response_schema
+
+
+class KeysetPagination(BasePagination):
+    """
+    A cursor based pagination class that seeks to the next page with a `WHERE` clause on the ordering keys
+    instead of an `OFFSET`, so fetching a page costs the same at any depth and no `COUNT(*)` is run.
+
+    The ordering applied to the queryset (e.g. by `OrderingFilter`) is used as the key, with the primary
+    key appended as a tie breaker, so `created_at`, `view_count` or `post__vote_count` orderings all page
+    stably. Ordering keys must be non-nullable model fields.
+
+    Cursors are opaque, url-safe tokens that encode the ordering they were issued for and the key of the
+    row they point at. A cursor issued for one ordering is rejected for another.
+
+    Attributes:
+        cursor_query_param (str): The name of the query parameter that holds the cursor.
+        page_size_query_param (str): The name of the query parameter used to specify the page size.
+        page_size (int): The default page size to use if the query parameter is not provided.
+        max_page_size (int): The maximum allowed page size.
+        default_ordering (tuple): The ordering used when the queryset is not ordered.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "size"
+    page_size = getattr(settings, "PAGE_SIZE")
+    max_page_size = getattr(settings, "MAX_PAGE_SIZE")
+    default_ordering = ("-created_at",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor["reverse"])
+
+        ordering = [self._invert(field) for field in self.ordering] if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self._seek(ordering, cursor["values"]))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, queryset):
+        """
+        Returns the ordering keys of the queryset, always ending with the primary key.
+        """
+        ordering = list(queryset.query.order_by or self.default_ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ValueError("Keyset pagination only supports ordering by field names.")
+
+        ordering = [field for field in ordering if field.lstrip("-") not in ("pk", "id")]
+        descending = bool(ordering) and ordering[-1].startswith("-")
+        return [*ordering, "-pk" if descending else "pk"]
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        payload = {
+            "o": self.ordering,
+            "v": [self._serialize(self._get_value(instance, field)) for field in self.ordering],
+            "r": int(reverse),
+        }
+        token = urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(token.encode()).decode())
+            ordering, values, reverse = payload["o"], payload["v"], bool(payload["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if ordering != self.ordering or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return {"values": values, "reverse": reverse}
+
+    def _seek(self, ordering, values):
+        """
+        Builds the row-value comparison `(k1, k2, ...) > (v1, v2, ...)` honouring each key's direction.
+        """
+        condition = Q()
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal = {ordering[i].lstrip("-"): values[i] for i in range(index)}
+            condition |= Q(**equal, **{f"{name}__{lookup}": values[index]})
+        return condition
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _get_value(instance, field):
+        value = instance
+        for attr in field.lstrip("-").split("__"):
+            value = getattr(value, attr)
+        return value
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (UUID, Decimal)):
+            return str(value)
+        return value
+
+
+class FeedPagination(DynamicPageSizePagination):
+    """
+    Page number pagination that switches to keyset pagination on request.
+
+    Clients opt in to cursor pages with `?pagination=cursor` and keep following the returned `next` and
+    `previous` links, which carry a `cursor` parameter. Views that should always use cursors can set
+    `pagination_class = KeysetPagination` instead.
+    """
+
+    pagination_query_param = "pagination"
+    cursor_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_class()
+            self.display_page_controls = False
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.pagination_query_param) == "cursor"
+            or self.cursor_class.cursor_query_param in request.query_params
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.pagination_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` to page with cursors instead of page numbers.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            {
+                "name": self.cursor_class.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+        ]
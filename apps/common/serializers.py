@@ -0,0 +1,40 @@
+from django.db import models
+from rest_framework import serializers
+
+from apps.common.utils import get_current_counter
+
+
+class PrimingListSerializer(serializers.ListSerializer):
+    """
+    A list serializer that hands every instance to the child serializer before rendering any of them.
+
+    Child serializers implement `prime(instances)` to batch-load data that would otherwise be fetched
+    once per object, e.g. the current user's votes or bookmarks.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        instances = list(iterable)
+        prime = getattr(self.child, "prime", None)
+        if prime is not None:
+            prime(instances)
+        return [self.child.to_representation(item) for item in instances]
+
+
+class CounterField(serializers.IntegerField):
+    """
+    A read-only counter field, e.g. `vote_count`, that includes the increments still held in counter shards.
+
+    Serializers with counter fields load the increments of a whole list at once by calling
+    `prime_counters(instances, *fields)` from their `prime`. A single object loads its own.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        *path, field = self.source_attrs
+        for attr in path:
+            instance = getattr(instance, attr)
+        return get_current_counter(instance, field)
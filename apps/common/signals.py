@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from apps.common.pagination import invalidate_counts
+
+
+def invalidate_counts_on_create(sender, created, **kwargs):
+    if created:
+        invalidate_counts(sender)
+
+
+def invalidate_counts_on_delete(sender, **kwargs):
+    invalidate_counts(sender)
+
+
+def invalidate_counts_on_m2m_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_counts(sender)
+
+
+def connect_count_invalidation():
+    """
+    Connects the receivers that invalidate cached page counts for `PAGINATION_CACHED_COUNT_MODELS`.
+    """
+    for label in settings.PAGINATION_CACHED_COUNT_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(invalidate_counts_on_create, sender=model, dispatch_uid=f"count_create_{label}")
+        post_delete.connect(invalidate_counts_on_delete, sender=model, dispatch_uid=f"count_delete_{label}")
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(
+                invalidate_counts_on_m2m_change,
+                sender=field.remote_field.through,
+                dispatch_uid=f"count_m2m_{label}_{field.name}",
+            )
@@ -0,0 +1,258 @@
+import logging
+import random
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from threading import local
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Greatest
+
+from apps.common.models import CounterShard
+
+logger = logging.getLogger(__name__)
+
+
+class OnCommitBatch:
+    """
+    Collects items during a transaction and hands them to a callback once the transaction commits.
+
+    Items are de-duplicated, so touching the same object several times in one transaction processes it
+    once. Items added in a transaction that is rolled back are processed with the next commit on the same
+    thread, so callbacks must reconcile against the database rather than trust the items blindly.
+
+    Args:
+        callback (callable): Called with the set of pending items.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._local = local()
+
+    @property
+    def pending(self) -> set:
+        if not hasattr(self._local, "items"):
+            self._local.items = set()
+        return self._local.items
+
+    def add(self, item):
+        self.pending.add(item)
+        transaction.on_commit(self.flush)
+
+    def flush(self):
+        items = set(self.pending)
+        self.pending.clear()
+        if items:
+            self.callback(items)
+
+
+@lru_cache(maxsize=None)
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=settings.BACKGROUND_TASK_WORKERS, thread_name_prefix="background-task")
+
+
+def _run_task(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", func.__qualname__)
+    finally:
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Runs a function on the process-wide background thread pool, so the calling request does not wait
+    for it. Failures are logged rather than raised.
+
+    With `BACKGROUND_TASKS_EAGER` the function runs immediately on the calling thread instead, which keeps
+    tests deterministic.
+    """
+    if settings.BACKGROUND_TASKS_EAGER:
+        func(*args, **kwargs)
+        return
+    get_executor().submit(_run_task, func, args, kwargs)
+
+
+def _counter_expression(model, field, amount):
+    """
+    Returns `field + amount`, floored at the model's `COUNTER_FLOORS` value for the field if it has one.
+    """
+    expression = F(field) + amount
+    if (floor := getattr(model, "COUNTER_FLOORS", {}).get(field)) is not None:
+        expression = Greatest(expression, Value(floor))
+    return expression
+
+
+def increment_counters(model, pk, increments: dict):
+    """
+    Adds to counter fields of an object, e.g. `{"vote_count": 1, "score": 1}`.
+
+    Without sharding this is a single `UPDATE` of the object's row. With `COUNTER_SHARDS` set, the
+    increments go to one of that many `CounterShard` rows picked at random instead, so concurrent writers
+    rarely wait on the same row lock. Sharded increments reach the field when `fold_counters` runs, and
+    floors in the model's `COUNTER_FLOORS` are only applied then.
+
+    Args:
+        model (type): The model of the object.
+        pk: The ID of the object.
+        increments (dict): A mapping of counter field to the amount to add.
+    """
+    increments = {field: amount for field, amount in increments.items() if amount}
+    if not increments:
+        return
+
+    if not settings.COUNTER_SHARDS:
+        changes = {field: _counter_expression(model, field, amount) for field, amount in increments.items()}
+        model.objects.filter(pk=pk).update(**changes)
+        return
+
+    content_type = ContentType.objects.get_for_model(model)
+    shard = random.randrange(settings.COUNTER_SHARDS)
+    for field, amount in increments.items():
+        key = {"content_type": content_type, "object_id": str(pk), "field": field, "shard": shard}
+        if CounterShard.objects.filter(**key).update(value=F("value") + amount):
+            continue
+        try:
+            with transaction.atomic():
+                CounterShard.objects.create(**key, value=amount)
+        except IntegrityError:
+            CounterShard.objects.filter(**key).update(value=F("value") + amount)
+
+
+def get_counters(model, pk, *fields) -> dict:
+    """
+    Returns the current values of counter fields of an object, including increments still in shards.
+
+    This is the accessor to use when an exact value matters. The model fields themselves lag behind by the
+    increments that were not folded yet, which is fine for display.
+    """
+    pk = model._meta.pk.to_python(pk)
+    values = get_many_counters(model, [pk], *fields)
+    if pk not in values:
+        raise model.DoesNotExist(f"{model._meta.object_name} matching query does not exist.")
+    return values[pk]
+
+
+def get_many_counters(model, pks, *fields) -> dict:
+    """
+    Returns the current values of counter fields of several objects, like `get_counters`, in two queries.
+
+    Returns:
+        dict: A mapping of object ID to a mapping of field to value. Missing objects are left out.
+    """
+    values = {row.pop("pk"): row for row in model.objects.filter(pk__in=pks).values("pk", *fields)}
+    for pk, totals in _get_pending_counters(model, values, fields).items():
+        for field, total in totals.items():
+            values[pk][field] += total
+    return values
+
+
+def _get_pending_counters(model, pks, fields) -> dict:
+    """
+    Returns the increments of counter fields still held in shards, as a mapping of object ID to a mapping of
+    field to the sum of its shards. Objects without such increments are left out.
+    """
+    pending = defaultdict(dict)
+    if not settings.COUNTER_SHARDS or not pks:
+        return pending
+    rows = (
+        CounterShard.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+            object_id__in=[str(pk) for pk in pks],
+            field__in=fields,
+        )
+        .values("object_id", "field")
+        .annotate(total=Sum("value"))
+    )
+    pk_field = model._meta.pk
+    for row in rows:
+        pending[pk_field.to_python(row["object_id"])][row["field"]] = row["total"]
+    return pending
+
+
+def prime_counters(instances, *fields):
+    """
+    Loads the increments still held in shards for counter fields of objects of one model, in one query, so
+    `CounterField`s serialize their current values. The increments are kept apart from the model fields,
+    which keep their stored values, so that saving a primed object does not fold its shards a second time.
+
+    Args:
+        instances (list): The objects. Objects that were already primed are skipped.
+        *fields: The counter fields.
+    """
+    instances = [instance for instance in instances if not hasattr(instance, "_pending_counters")]
+    if not instances:
+        return
+    pending = _get_pending_counters(type(instances[0]), [instance.pk for instance in instances], fields)
+    for instance in instances:
+        instance._pending_counters = pending.get(instance.pk, {})
+
+
+def get_current_counter(instance, field) -> int:
+    """
+    Returns the value of a counter field of an object including the increments still held in shards. Objects
+    that were not primed with `prime_counters` are loaded with a query of their own.
+    """
+    prime_counters([instance], field)
+    return getattr(instance, field) + instance._pending_counters.get(field, 0)
+
+
+def fold_counters(model=None) -> int:
+    """
+    Moves the increments held in counter shards into the counter fields.
+
+    The shards of each counter are locked while their sum is added to the field and they are reset, so
+    increments made meanwhile wait for the fold instead of being lost.
+
+    Args:
+        model (type): Only fold the counters of this model. All counters by default.
+
+    Returns:
+        int: The number of counters folded.
+    """
+    shards = CounterShard.objects.exclude(value=0)
+    if model is not None:
+        shards = shards.filter(content_type=ContentType.objects.get_for_model(model))
+    counters = list(shards.values_list("content_type_id", "object_id", "field").distinct())
+
+    by_object = defaultdict(set)
+    for content_type_id, object_id, field in counters:
+        by_object[content_type_id, object_id].add(field)
+
+    for (content_type_id, object_id), fields in by_object.items():
+        counter_model = ContentType.objects.get_for_id(content_type_id).model_class()
+        with transaction.atomic():
+            locked = list(
+                CounterShard.objects.select_for_update().filter(
+                    content_type_id=content_type_id, object_id=object_id, field__in=fields
+                )
+            )
+            totals = defaultdict(int)
+            for shard in locked:
+                totals[shard.field] += shard.value
+            changes = {
+                field: _counter_expression(counter_model, field, total) for field, total in totals.items() if total
+            }
+            if changes:
+                counter_model.objects.filter(pk=object_id).update(**changes)
+            CounterShard.objects.filter(pk__in=[shard.pk for shard in locked]).update(value=0)
+    return len(counters)
+
+
+def reset_counters(model, pks, **values):
+    """
+    Sets counter fields of objects to the given values, discarding increments still held in shards.
+
+    Args:
+        model (type): The model of the objects.
+        pks (list): The IDs of the objects.
+        **values: A mapping of counter field to its new value.
+    """
+    CounterShard.objects.filter(
+        content_type=ContentType.objects.get_for_model(model), object_id__in=[str(pk) for pk in pks], field__in=values
+    ).delete()
+    model.objects.filter(pk__in=pks).update(**values)
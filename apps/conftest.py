@@ -1,9 +1,20 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 from apps.factories import UserFactory
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Fixture to start every test with an empty cache, since the database is rolled back between tests.
+    """
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def api_client() -> APIClient:
     """
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_actions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['content_type', 'object_id', 'created_at', 'id'], name='comment__target_created_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-18 09:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('content_actions', '0002_comment_comment__target_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewerSet',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('object_id', models.UUIDField()),
+                ('data', models.BinaryField(default=b'')),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('is_approximate', models.BooleanField(default=False)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='viewerset',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='viewerset__1'),
+        ),
+    ]
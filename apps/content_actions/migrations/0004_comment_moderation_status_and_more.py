@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-18 10:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content_actions', '0003_viewerset_viewerset_viewerset__1'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='moderation_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('published', 'Published'), ('flagged', 'Flagged')], default='published', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('moderation_status', 'pending')), fields=['created_at'], name='comment__pending_idx'),
+        ),
+    ]
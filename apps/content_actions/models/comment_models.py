@@ -4,11 +4,11 @@ from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
-from apps.common.models import BaseModel
+from apps.common.models import BaseModel, ModeratedModel, ModeratedQuerySet
 from apps.content_actions.models.vote_models import Vote
 
 
-class Comment(BaseModel):
+class Comment(BaseModel, ModeratedModel):
     """
     Represents a comment made by a user on a forum post. This can be on either a question or an answer.
 
@@ -28,5 +28,17 @@ class Comment(BaseModel):
     vote_count = models.IntegerField(default=0)
     votes = GenericRelation(Vote, related_query_name="comment")
 
+    objects = ModeratedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("content_type", "object_id", "created_at", "id"), name="comment__target_created_idx"),
+            models.Index(
+                fields=("created_at",),
+                condition=models.Q(moderation_status=ModeratedModel.ModerationStatus.PENDING),
+                name="comment__pending_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Comment by {self.user}"
@@ -1,3 +1,9 @@
+import math
+import sys
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
@@ -5,11 +11,16 @@ from django.db import models
 
 from apps.common.models import BaseModel
 
+MAX_SHORT_VIEWER_ID = 2**32 - 1
+
 
 class ViewTracker(BaseModel):
     """
     Represents a view made by a user.
 
+    Views are now recorded in `ViewerSet`. The rows left here can be folded into it with the
+    `fold_view_trackers` command.
+
     Attributes:
         user (ForeignKey): The user who made the view.
         content_type (ForeignKey): The content type of the viewed object.
@@ -28,3 +39,133 @@ class ViewTracker(BaseModel):
 
     def __str__(self):
         return f"{self.user} viewed {self.content_type.model} -> {self.object_id}"
+
+
+class HyperLogLog:
+    """
+    A HyperLogLog sketch that estimates the number of distinct integers added to it in a fixed
+    `2 ** precision` bytes, with a standard error of about `1.04 / sqrt(2 ** precision)`.
+
+    Attributes:
+        registers (bytearray): The sketch, one byte per register.
+    """
+
+    precision = 10
+
+    def __init__(self, registers=None):
+        self.registers = bytearray(registers or bytes(1 << self.precision))
+
+    def add(self, value: int):
+        hashed = int.from_bytes(blake2b(value.to_bytes(8, "little"), digest_size=8).digest(), "big")
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def __len__(self):
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0**-register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+
+def decode_viewers(data: bytes) -> array:
+    """
+    Decodes a sorted array of viewer IDs. The first byte is the array type code, the rest the
+    little-endian items.
+    """
+    if not data:
+        return array("I")
+
+    viewers = array(chr(data[0]))
+    viewers.frombytes(bytes(data[1:]))
+    if sys.byteorder == "big":
+        viewers.byteswap()
+    return viewers
+
+
+def encode_viewers(viewers: array) -> bytes:
+    if sys.byteorder == "big":
+        viewers = array(viewers.typecode, viewers)
+        viewers.byteswap()
+    return viewers.typecode.encode() + viewers.tobytes()
+
+
+class ViewerSet(BaseModel):
+    """
+    The users who viewed an object, stored compactly in a single row.
+
+    Viewer IDs are kept as a sorted array of 4-byte integers (8-byte once an ID needs it), so membership
+    is a binary search and the size is the array length. Once a set holds more than
+    `VIEWER_SET_APPROXIMATE_AFTER` viewers it is converted to a fixed-size `HyperLogLog` sketch, after
+    which the size is an estimate and membership can no longer be answered.
+
+    Attributes:
+        content_type (ForeignKey): The content type of the viewed object.
+        object_id (UUIDField): The ID of the viewed object.
+        content_object (GenericForeignKey): The viewed object.
+        data (bytes): The encoded viewer IDs, or the sketch registers if `is_approximate`.
+        size (int): The number of viewers, estimated if `is_approximate`.
+        is_approximate (bool): True if the set was converted to a sketch.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.UUIDField()
+    content_object = GenericForeignKey("content_type", "object_id")
+    data = models.BinaryField(default=b"")
+    size = models.PositiveIntegerField(default=0)
+    is_approximate = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=("content_type", "object_id"), name="viewerset__1")]
+
+    def __str__(self):
+        return f"{self.size} viewers of {self.content_type.model} -> {self.object_id}"
+
+    def __contains__(self, user_id):
+        if self.is_approximate:
+            raise ValueError("Approximate viewer sets cannot answer membership.")
+        viewers = decode_viewers(self.data)
+        index = bisect_left(viewers, user_id)
+        return index < len(viewers) and viewers[index] == user_id
+
+    def add(self, user_ids) -> int:
+        """
+        Adds viewers to the set. The caller saves it.
+
+        Args:
+            user_ids (Iterable): The IDs of the viewers.
+
+        Returns:
+            int: How much the size of the set grew.
+        """
+        previous_size = self.size
+        if self.is_approximate:
+            sketch = HyperLogLog(self.data)
+            for user_id in user_ids:
+                sketch.add(user_id)
+            self.data, self.size = bytes(sketch.registers), max(len(sketch), previous_size)
+            return self.size - previous_size
+
+        viewers = decode_viewers(self.data)
+        for user_id in sorted(set(user_ids)):
+            index = bisect_left(viewers, user_id)
+            if index < len(viewers) and viewers[index] == user_id:
+                continue
+            if user_id > MAX_SHORT_VIEWER_ID and viewers.typecode == "I":
+                viewers = array("Q", viewers)
+            viewers.insert(index, user_id)
+
+        self.size = len(viewers)
+        if settings.VIEWER_SET_APPROXIMATE_AFTER and self.size > settings.VIEWER_SET_APPROXIMATE_AFTER:
+            sketch = HyperLogLog()
+            for user_id in viewers:
+                sketch.add(user_id)
+            self.data, self.is_approximate = bytes(sketch.registers), True
+        else:
+            self.data = encode_viewers(viewers)
+        return self.size - previous_size
@@ -2,12 +2,14 @@ from django.contrib.contenttypes.models import ContentType
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from apps.common.serializers import CounterField, PrimingListSerializer
+from apps.common.utils import prime_counters
 from apps.content_actions.constants import MODEL_MAPPING
 from apps.content_actions.models.comment_models import Comment
-from apps.services.utils import check_toxicity
+from apps.services.serializers.moderation_serializers import ToxicityCheckMixin
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(ToxicityCheckMixin, serializers.ModelSerializer):
     """
     Serializer for the Comment model.
 
@@ -17,6 +19,8 @@ class CommentSerializer(serializers.ModelSerializer):
 
     commented_by = serializers.SerializerMethodField()
     commenter_avatar = serializers.SerializerMethodField()
+    vote_count = CounterField()
+    toxicity_fields = {"text": "The comment contains toxic content."}
 
     class Meta:
         model = Comment
@@ -29,10 +33,23 @@ class CommentSerializer(serializers.ModelSerializer):
             "vote_count",
             "commented_by",
             "commenter_avatar",
+            "moderation_status",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("user", "content_type", "object_id", "content_object", "vote_count", "commented_by")
+        read_only_fields = (
+            "user",
+            "content_type",
+            "object_id",
+            "content_object",
+            "vote_count",
+            "commented_by",
+            "moderation_status",
+        )
+        list_serializer_class = PrimingListSerializer
+
+    def prime(self, instances):
+        prime_counters(instances, "vote_count")
 
     def get_commented_by(self, obj) -> str:
         return obj.user.username
@@ -44,11 +61,6 @@ class CommentSerializer(serializers.ModelSerializer):
         except (AttributeError, ValueError):
             return ""
 
-    def validate_text(self, value):
-        if check_toxicity(value):
-            raise serializers.ValidationError("The comment contains toxic content.")
-        return value
-
     def validate(self, data):
         user = self.context["request"].user
         object_id = self.context["view"].kwargs["object_id"]
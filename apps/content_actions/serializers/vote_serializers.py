@@ -4,6 +4,7 @@ from rest_framework.exceptions import ValidationError
 
 from apps.content_actions.constants import MODEL_MAPPING
 from apps.content_actions.models.vote_models import Vote
+from apps.content_actions.utils import apply_vote
 
 
 class VoteSerializer(serializers.ModelSerializer):
@@ -35,58 +36,10 @@ class VoteSerializer(serializers.ModelSerializer):
         if vote_type not in (Vote.UPVOTE, Vote.DOWNVOTE):
             raise ValidationError("Invalid vote_type")
 
-        existing_vote = Vote.objects.filter(user=user, content_type=content_type, object_id=object_id).first()
-        data["existing_vote"] = existing_vote
+        data["target"] = instance
 
         return data
 
-    def update_vote_count(self, vote_type, instance, change):
-        model_instance = instance.content_object
-        user = model_instance.user
-
-        if vote_type == Vote.UPVOTE:
-            model_instance.vote_count += change
-            if instance.vote_type == Vote.DOWNVOTE:
-                user.add_reputation(12)
-            else:
-                user.add_reputation(10)
-        elif vote_type == Vote.DOWNVOTE:
-            model_instance.vote_count -= change
-            if instance.vote_type == Vote.UPVOTE:
-                user.subtract_reputation(12)
-            else:
-                user.subtract_reputation(2)
-
-        model_instance.save()
-        model_instance.update_score()
-        model_instance.evaluate_score_badges()
-
     def create(self, validated_data):
-        vote_type = validated_data["vote_type"]
-        existing_vote = validated_data.pop("existing_vote", None)
-
         # TODO The vote deletion logic should be refactored to a separate endpoint.
-        if existing_vote and existing_vote.vote_type == vote_type:
-            model_instance = existing_vote.content_object
-            user = model_instance.user
-            if vote_type == Vote.UPVOTE:
-                model_instance.vote_count += -1
-                user.subtract_reputation(10)
-
-            if vote_type == Vote.DOWNVOTE:
-                model_instance.vote_count += 1
-                user.add_reputation(2)
-
-            model_instance.save()
-            existing_vote.delete()
-            return existing_vote
-
-        if existing_vote:
-            self.update_vote_count(vote_type, existing_vote, 2)
-            existing_vote.vote_type = vote_type
-            existing_vote.save()
-            return existing_vote
-
-        instance = super().create(validated_data)
-        self.update_vote_count(vote_type, instance, 1)
-        return instance
+        return apply_vote(validated_data["user"], validated_data["target"], validated_data["vote_type"])
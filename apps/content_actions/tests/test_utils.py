@@ -0,0 +1,247 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.common.models import CounterShard
+from apps.common.utils import get_counters
+from apps.content_actions.models.view_models import HyperLogLog, ViewerSet, ViewTracker
+from apps.content_actions.models.vote_models import Vote
+from apps.content_actions.utils import (
+    ViewBuffer,
+    ViewerState,
+    apply_vote,
+    get_viewer_count,
+    get_viewer_state,
+    has_viewed,
+)
+from apps.factories import UserFactory
+from apps.forum.constants import NICE_QUESTION_THRESHOLD, POPULAR_QUESTION_THRESHOLD
+from apps.forum.models.qa_models import Post, Question
+from apps.forum.serializers.post_serializers import PostSerializer
+from apps.forum.tests.factories import BookmarkFactory, PostFactory, QuestionFactory, VoteFactory
+from apps.notifications.tests.factories import SubscriptionFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestViewerState:
+    def test_prime_resolves_votes_and_bookmarks(self, user, django_assert_num_queries):
+        posts = PostFactory.create_batch(size=3)
+        VoteFactory.create(user=user, content_object=posts[0], vote_type=Vote.UPVOTE)
+        VoteFactory.create(user=user, content_object=posts[1], vote_type=Vote.DOWNVOTE)
+        BookmarkFactory.create(user=user, content_object=posts[2])
+        viewer_state = ViewerState(user)
+
+        with django_assert_num_queries(2):
+            viewer_state.prime_votes(posts)
+            viewer_state.prime_bookmarks(posts)
+
+        with django_assert_num_queries(0):
+            assert [viewer_state.get_vote(post) for post in posts] == [Vote.UPVOTE, Vote.DOWNVOTE, ""]
+            assert [viewer_state.is_bookmarked(post) for post in posts] == [False, False, True]
+
+    def test_prime_resolves_subscriptions(self, user, django_assert_num_queries):
+        questions = QuestionFactory.create_batch(size=2)
+        subscription = SubscriptionFactory.create(user=user, target=questions[0])
+        viewer_state = ViewerState(user)
+
+        with django_assert_num_queries(1):
+            viewer_state.prime_subscriptions(questions)
+
+        with django_assert_num_queries(0):
+            assert viewer_state.get_subscription_id(questions[0]) == subscription.id
+            assert viewer_state.get_subscription_id(questions[1]) == ""
+
+    def test_unprimed_lookup_loads_single_object(self, user, django_assert_num_queries):
+        post = PostFactory.create()
+        VoteFactory.create(user=user, content_object=post)
+        viewer_state = ViewerState(user)
+
+        with django_assert_num_queries(1):
+            assert viewer_state.get_vote(post) == Vote.UPVOTE
+            assert viewer_state.get_vote(post) == Vote.UPVOTE
+
+    def test_get_viewer_state_requires_authenticated_user(self, rf, user):
+        request = rf.get("/")
+        request.user = user
+        context = {"request": request}
+
+        assert get_viewer_state(context) is get_viewer_state(context)
+        assert get_viewer_state({}) is None
+
+
+class TestViewBuffer:
+    def test_flush_counts_each_user_once(self, user):
+        questions = QuestionFactory.create_batch(size=2)
+        other_user = UserFactory.create()
+        buffer = ViewBuffer()
+        buffer.record(user, questions[1])
+        buffer.flush()
+        for viewer, question in [(user, questions[0]), (user, questions[0]), (other_user, questions[0])]:
+            buffer.record(viewer, question)
+        buffer.record(user, questions[1])
+        buffer.record(other_user, questions[1])
+
+        with CaptureQueriesContext(connection) as context:
+            buffer.flush()
+
+        view_count_updates = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith(f'UPDATE "{Question._meta.db_table}"')
+        ]
+        assert len(view_count_updates) == 1
+        assert len(buffer) == 0
+        assert dict(Question.objects.values_list("pk", "view_count")) == {questions[0].pk: 2, questions[1].pk: 2}
+        assert all(has_viewed(viewer, question) for question in questions for viewer in (user, other_user))
+        assert [get_viewer_count(question) for question in questions] == [2, 2]
+
+    def test_views_flushed_by_several_workers_are_counted_once(self, user):
+        question = QuestionFactory.create()
+        workers = [ViewBuffer(), ViewBuffer()]
+        for buffer in workers:
+            buffer.record(user, question)
+
+        for buffer in workers:
+            buffer.flush()
+
+        question.refresh_from_db()
+        assert question.view_count == 1
+
+    def test_pending_views_are_flushed_after_the_interval(self, user, settings, mocker):
+        settings.BACKGROUND_TASKS_EAGER = False
+        settings.VIEW_BUFFER_FLUSH_INTERVAL = 0.1
+        run_in_background = mocker.patch("apps.content_actions.utils.run_in_background")
+        question = QuestionFactory.create()
+        buffer = ViewBuffer()
+        buffer.record(user, question)
+        timer = buffer._timer
+
+        timer.join(timeout=5)
+
+        run_in_background.assert_called_once_with(buffer.flush)
+        buffer.flush()
+        assert buffer._timer is None
+
+    def test_flush_checks_badges_only_when_threshold_is_crossed(self, mocker):
+        crossing, above = QuestionFactory.create_batch(size=2)
+        Question.objects.filter(pk=crossing.pk).update(view_count=POPULAR_QUESTION_THRESHOLD - 1)
+        Question.objects.filter(pk=above.pk).update(view_count=POPULAR_QUESTION_THRESHOLD + 1)
+        evaluate_badge_events = mocker.patch("apps.content_actions.utils.evaluate_badge_events")
+        buffer = ViewBuffer()
+        buffer.record(UserFactory.create(), crossing)
+        buffer.record(UserFactory.create(), above)
+
+        buffer.flush()
+
+        assert list(evaluate_badge_events.call_args.args[0]) == [("forum.Question", "views", crossing.pk)]
+
+
+class TestViewerSet:
+    def test_membership_and_size(self):
+        viewer_set = ViewerSet()
+
+        growth = [viewer_set.add([7, 3, 2**40, 3]), viewer_set.add([3, 5])]
+
+        assert growth == [3, 1]
+        assert [user_id in viewer_set for user_id in (3, 4, 5, 7, 2**40)] == [True, False, True, True, True]
+        assert viewer_set.size == sum(growth)
+
+    def test_large_set_becomes_approximate(self, settings):
+        settings.VIEWER_SET_APPROXIMATE_AFTER = 100
+        viewer_set = ViewerSet()
+        viewer_set.add(range(1, 5001))
+
+        assert viewer_set.is_approximate
+        assert len(viewer_set.data) == len(HyperLogLog().registers)
+        assert abs(viewer_set.size - 5000) < 5000 * 0.1
+
+    def test_fold_view_trackers(self, user):
+        question = QuestionFactory.create()
+        ViewTracker.objects.create(user=user, content_object=question)
+        ViewTracker.objects.create(user=UserFactory.create(), content_object=question)
+
+        views = ViewTracker.objects.count()
+
+        call_command("fold_view_trackers", "--delete", "--chunk-size", "1")
+
+        assert has_viewed(user, question)
+        assert get_viewer_count(question) == views
+        assert not ViewTracker.objects.exists()
+
+
+class TestApplyVote:
+    def test_vote_transitions(self, user, django_capture_on_commit_callbacks):
+        post = PostFactory.create()
+        author = post.user
+
+        states = []
+        for vote_type in (Vote.UPVOTE, Vote.DOWNVOTE, Vote.DOWNVOTE, Vote.UPVOTE):
+            with django_capture_on_commit_callbacks(execute=True):
+                apply_vote(user, post, vote_type)
+            post.refresh_from_db()
+            author.refresh_from_db()
+            states.append((post.vote_count, post.score, author.reputation))
+
+        assert states == [(1, 1, 11), (-1, -1, 1), (0, 0, 3), (1, 1, 13)]
+        assert list(Vote.objects.values_list("vote_type", flat=True)) == [Vote.UPVOTE]
+
+    def test_vote_on_hot_post_does_not_recount(self, user, django_assert_max_num_queries):
+        post = PostFactory.create()
+        VoteFactory.create_batch(size=20, content_object=post)
+
+        with CaptureQueriesContext(connection) as context:
+            apply_vote(user, post, Vote.UPVOTE)
+
+        assert not [query for query in context.captured_queries if "COUNT" in query["sql"]]
+        voter = UserFactory.create()
+        with django_assert_max_num_queries(len(context.captured_queries)):
+            apply_vote(voter, post, Vote.UPVOTE)
+
+    def test_score_badges_are_evaluated_only_when_threshold_is_reached(
+        self, user, mocker, django_capture_on_commit_callbacks
+    ):
+        post = PostFactory.create()
+        Post.objects.filter(pk=post.pk).update(score=NICE_QUESTION_THRESHOLD - 1)
+        evaluate_badge_events = mocker.patch("apps.badges.utils.evaluate_badge_events")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            apply_vote(user, post, Vote.UPVOTE)
+            apply_vote(UserFactory.create(), post, Vote.UPVOTE)
+
+        evaluate_badge_events.assert_called_once()
+        assert ("forum.Post", "score", post.pk) in evaluate_badge_events.call_args.args[0]
+
+    def test_sharded_votes_are_folded(self, user, settings):
+        settings.COUNTER_SHARDS = 4
+        post = PostFactory.create()
+        author = post.user
+
+        apply_vote(user, post, Vote.DOWNVOTE)
+        apply_vote(UserFactory.create(), post, Vote.DOWNVOTE)
+        post.refresh_from_db()
+
+        assert (post.vote_count, post.score) == (0, 0)
+        assert get_counters(Post, post.pk, "vote_count", "score") == {"vote_count": -2, "score": -2}
+
+        call_command("fold_counter_shards")
+        post.refresh_from_db()
+        author.refresh_from_db()
+
+        assert (post.vote_count, post.score) == (-2, -2)
+        assert author.reputation == author.COUNTER_FLOORS["reputation"]
+        assert not CounterShard.objects.exclude(value=0).exists()
+
+    def test_serializers_include_unfolded_shards(self, user, settings):
+        settings.COUNTER_SHARDS = 4
+        posts = PostFactory.create_batch(size=2)
+        apply_vote(user, posts[0], Vote.UPVOTE)
+
+        data = PostSerializer(Post.objects.filter(pk__in=[post.pk for post in posts]), many=True).data
+
+        assert {item["id"]: (item["vote_count"], item["score"]) for item in data} == {
+            str(posts[0].pk): (1, 1),
+            str(posts[1].pk): (0, 0),
+        }
+        assert PostSerializer(Post.objects.get(pk=posts[0].pk)).data["vote_count"] == 1
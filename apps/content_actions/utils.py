@@ -0,0 +1,378 @@
+import atexit
+from collections import defaultdict
+from threading import Lock, Timer
+from time import monotonic
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from apps.badges.models.badge_models import ReputationEvent
+from apps.badges.utils import evaluate_badge_events, get_badge_thresholds, record_badge_event
+from apps.common.utils import get_counters, increment_counters, run_in_background
+from apps.content_actions.models.bookmark_models import Bookmark
+from apps.content_actions.models.view_models import ViewerSet
+from apps.content_actions.models.vote_models import Vote
+from apps.notifications.models.notification_models import Subscription
+
+User = get_user_model()
+
+VIEWER_STATE_CONTEXT_KEY = "viewer_state"
+VOTE_VALUES = {Vote.UPVOTE: 1, Vote.DOWNVOTE: -1}
+VOTE_REPUTATION = {Vote.UPVOTE: 10, Vote.DOWNVOTE: -2}
+
+
+class ViewerState:
+    """
+    Resolves the votes, bookmarks and subscriptions of the requesting user for a batch of objects.
+
+    Serializers register every object they are about to render through the `prime_*` methods, which
+    fetch the missing rows with a single query per table. The lookup methods then answer from memory
+    and only fall back to a query for objects that were never primed.
+
+    Attributes:
+        user (User): The user whose state is being resolved.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._votes = {}
+        self._bookmarks = set()
+        self._subscriptions = {}
+        self._loaded = {"votes": set(), "bookmarks": set(), "subscriptions": set()}
+
+    def _pending(self, kind, objects):
+        """
+        Groups the objects that were not loaded yet for `kind` by content type.
+
+        Returns:
+            dict: A mapping of content type to the set of pending object ids.
+        """
+        pending = {}
+        for obj in objects:
+            if obj is None:
+                continue
+            content_type = ContentType.objects.get_for_model(obj)
+            key = (content_type.id, obj.pk)
+            if key in self._loaded[kind]:
+                continue
+            self._loaded[kind].add(key)
+            pending.setdefault(content_type, set()).add(obj.pk)
+        return pending
+
+    def prime_votes(self, objects):
+        for content_type, object_ids in self._pending("votes", objects).items():
+            votes = Vote.objects.filter(user=self.user, content_type=content_type, object_id__in=object_ids)
+            for object_id, vote_type in votes.values_list("object_id", "vote_type"):
+                self._votes[(content_type.id, object_id)] = vote_type
+
+    def prime_bookmarks(self, objects):
+        for content_type, object_ids in self._pending("bookmarks", objects).items():
+            bookmarks = Bookmark.objects.filter(user=self.user, content_type=content_type, object_id__in=object_ids)
+            for object_id in bookmarks.values_list("object_id", flat=True):
+                self._bookmarks.add((content_type.id, object_id))
+
+    def prime_subscriptions(self, objects):
+        """
+        Loads the subscriptions of every content type with one query, as subscriptions are often primed for
+        targets of mixed types, e.g. the questions, answers and resources of a notification list.
+        """
+        pending = self._pending("subscriptions", objects)
+        if not pending:
+            return
+
+        keys = {
+            (content_type.id, object_id) for content_type, object_ids in pending.items() for object_id in object_ids
+        }
+        subscriptions = Subscription.objects.filter(
+            user=self.user,
+            target_content_type__in=pending,
+            target_object_id__in={object_id for _, object_id in keys},
+        )
+        for subscription_id, *key in subscriptions.values_list("id", "target_content_type_id", "target_object_id"):
+            if tuple(key) in keys:
+                self._subscriptions[tuple(key)] = subscription_id
+
+    def _key(self, obj):
+        return (ContentType.objects.get_for_model(obj).id, obj.pk)
+
+    def get_vote(self, obj) -> str:
+        self.prime_votes([obj])
+        return self._votes.get(self._key(obj), "")
+
+    def is_bookmarked(self, obj) -> bool:
+        self.prime_bookmarks([obj])
+        return self._key(obj) in self._bookmarks
+
+    def get_subscription_id(self, obj):
+        self.prime_subscriptions([obj])
+        return self._subscriptions.get(self._key(obj), "")
+
+
+def get_viewer_state(context) -> ViewerState | None:
+    """
+    Returns the viewer state shared by all serializers rendering the same request.
+
+    Args:
+        context (dict): The serializer context.
+
+    Returns:
+        ViewerState | None: The viewer state, or None if there is no authenticated user in the context.
+    """
+    request = context.get("request")
+    user = getattr(request, "user", None)
+    if not getattr(user, "is_authenticated", False):
+        return None
+
+    state = context.get(VIEWER_STATE_CONTEXT_KEY)
+    if state is None or state.user != user:
+        state = context[VIEWER_STATE_CONTEXT_KEY] = ViewerState(user)
+    return state
+
+
+def increment_view_counts(model, increments: dict):
+    """
+    Adds to the `view_count` of many objects with a single `UPDATE ... CASE` statement.
+
+    Args:
+        model (type): The model of the objects.
+        increments (dict): A mapping of object ID to the number of views to add.
+    """
+    by_amount = defaultdict(list)
+    for pk, amount in increments.items():
+        by_amount[amount].append(pk)
+
+    amount = Case(
+        *(When(pk__in=pks, then=Value(amount)) for amount, pks in by_amount.items()),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    model.objects.filter(pk__in=increments).update(view_count=F("view_count") + amount)
+
+
+def check_view_badges(model, increments: dict):
+    """
+    Evaluates the view badges of the objects whose `view_count` crossed one of the model's badge
+    thresholds with the given increments. Models without view badges are skipped.
+    """
+    thresholds = get_badge_thresholds(model, "views")
+    if not thresholds:
+        return
+
+    view_counts = model.objects.filter(pk__in=increments).values_list("pk", "view_count")
+    crossed = [
+        pk
+        for pk, view_count in view_counts
+        if any(view_count - increments[pk] < threshold <= view_count for threshold in thresholds)
+    ]
+    evaluate_badge_events((model._meta.label, "views", pk) for pk in crossed)
+
+
+def add_viewers(content_type_id, viewers: dict) -> dict:
+    """
+    Adds viewers to the viewer sets of many objects of one content type, creating the missing sets.
+    The caller runs it in a transaction.
+
+    Args:
+        content_type_id (int): The content type of the objects.
+        viewers (dict): A mapping of object ID to the IDs of its viewers.
+
+    Returns:
+        dict: A mapping of object ID to how many new viewers it got.
+    """
+    ViewerSet.objects.bulk_create(
+        [ViewerSet(content_type_id=content_type_id, object_id=object_id) for object_id in viewers],
+        ignore_conflicts=True,
+    )
+    viewer_sets = ViewerSet.objects.select_for_update().filter(content_type_id=content_type_id, object_id__in=viewers)
+
+    added, changed = {}, []
+    for viewer_set in viewer_sets:
+        if count := viewer_set.add(viewers[viewer_set.object_id]):
+            added[viewer_set.object_id] = count
+            changed.append(viewer_set)
+    ViewerSet.objects.bulk_update(changed, ["data", "size", "is_approximate"], batch_size=500)
+    return added
+
+
+def apply_views(views):
+    """
+    Writes buffered views to the database.
+
+    Views of deleted objects are dropped. The rest are added to each object's `ViewerSet`, and the number
+    of new viewers is added to the `view_count` of each object in one statement per content type. The
+    viewer sets stay locked until the counts are written, so a view flushed by several workers at once is
+    only counted by the first.
+
+    Args:
+        views (Iterable): `(content type ID, object ID, user ID)` triples.
+    """
+    by_content_type = defaultdict(lambda: defaultdict(set))
+    for content_type_id, object_id, user_id in views:
+        by_content_type[content_type_id][object_id].add(user_id)
+
+    for content_type_id, object_viewers in by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        existing_objects = model.objects.filter(pk__in=object_viewers).values_list("pk", flat=True)
+        viewers = {object_id: object_viewers[object_id] for object_id in existing_objects}
+        if not viewers:
+            continue
+
+        with transaction.atomic():
+            increments = add_viewers(content_type_id, viewers)
+            if increments:
+                increment_view_counts(model, increments)
+        if increments:
+            check_view_badges(model, increments)
+
+
+def has_viewed(user, instance) -> bool | None:
+    """
+    Returns whether a user viewed an object, or None if its viewers are only counted approximately.
+    Views still in the buffer are not included.
+    """
+    content_type = ContentType.objects.get_for_model(instance)
+    viewer_set = ViewerSet.objects.filter(content_type=content_type, object_id=instance.pk).first()
+    if viewer_set is None:
+        return False
+    if viewer_set.is_approximate:
+        return None
+    return user.pk in viewer_set
+
+
+def get_viewer_count(instance) -> int:
+    """
+    Returns the number of distinct users who viewed an object. Views still in the buffer are not included.
+    """
+    content_type = ContentType.objects.get_for_model(instance)
+    viewer_set = ViewerSet.objects.filter(content_type=content_type, object_id=instance.pk).only("size").first()
+    return viewer_set.size if viewer_set else 0
+
+
+class ViewBuffer:
+    """
+    Collects the views of the current process in memory and writes them in batches.
+
+    Recording a view only adds it to a set, so repeated views by the same user collapse before they reach
+    the database. The buffer is written on a background thread once `VIEW_BUFFER_SIZE` views are pending
+    or `VIEW_BUFFER_FLUSH_INTERVAL` seconds passed since the last write, and when the process exits. A timer
+    writes views that are still pending `VIEW_BUFFER_FLUSH_INTERVAL` seconds after they were recorded, so
+    they are not held back until the next view. No timer is started with `BACKGROUND_TASKS_EAGER`.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._views = set()
+        self._last_flush = monotonic()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self._views)
+
+    def record(self, user, instance):
+        """
+        Records that a user viewed an object.
+
+        Args:
+            user (User): The viewer.
+            instance (Model): The viewed object. Its model must have a `view_count` field.
+        """
+        view = (ContentType.objects.get_for_model(instance).pk, instance.pk, user.pk)
+        with self._lock:
+            self._views.add(view)
+            is_due = (
+                len(self._views) >= settings.VIEW_BUFFER_SIZE
+                or monotonic() - self._last_flush >= settings.VIEW_BUFFER_FLUSH_INTERVAL
+            )
+            if not is_due and self._timer is None and not settings.BACKGROUND_TASKS_EAGER:
+                self._timer = Timer(settings.VIEW_BUFFER_FLUSH_INTERVAL, run_in_background, args=(self.flush,))
+                self._timer.daemon = True
+                self._timer.start()
+        if is_due:
+            run_in_background(self.flush)
+
+    def flush(self):
+        with self._lock:
+            views, self._views = self._views, set()
+            self._last_flush = monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if views:
+            apply_views(views)
+
+
+view_buffer = ViewBuffer()
+
+
+def get_vote_delta(previous_vote_type, vote_type) -> tuple[int, int]:
+    """
+    Returns how a vote changes the vote count of its target and the reputation of the target's author.
+
+    Voting the same type again retracts the vote, so every transition is the value of the new vote minus
+    the value of the previous one: a new upvote is `(1, 10)`, turning a downvote into an upvote `(2, 12)`
+    and retracting a downvote `(1, 2)`.
+
+    Args:
+        previous_vote_type (str | None): The user's vote before, if any.
+        vote_type (str): The vote being cast.
+
+    Returns:
+        tuple: The vote count and reputation deltas.
+    """
+    new_vote_type = None if previous_vote_type == vote_type else vote_type
+    return (
+        VOTE_VALUES.get(new_vote_type, 0) - VOTE_VALUES.get(previous_vote_type, 0),
+        VOTE_REPUTATION.get(new_vote_type, 0) - VOTE_REPUTATION.get(previous_vote_type, 0),
+    )
+
+
+@transaction.atomic
+def apply_vote(user, target, vote_type) -> Vote:
+    """
+    Casts, changes or retracts a vote and applies its effects in one transaction.
+
+    The vote count and score of the target are changed with atomic increments instead of being recounted,
+    so concurrent votes are never lost. With `COUNTER_SHARDS` set the increments go to counter shards, see
+    `increment_counters`. The reputation change of the author is recorded in the reputation ledger and
+    applied after the commit, see `User.change_reputation`. The target's score badges are evaluated
+    after the commit, and only if the vote made its score reach one of their thresholds.
+
+    Args:
+        user (User): The voter.
+        target (Post | Comment | Resource): The voted object.
+        vote_type (str): `Vote.UPVOTE` or `Vote.DOWNVOTE`. Voting the same type again retracts the vote.
+
+    Returns:
+        Vote: The vote. It is unsaved if the vote was retracted.
+    """
+    model = type(target)
+    content_type = ContentType.objects.get_for_model(model)
+    vote = Vote.objects.select_for_update().filter(user=user, content_type=content_type, object_id=target.pk).first()
+    previous_vote_type = vote.vote_type if vote else None
+    vote_count_delta, reputation_delta = get_vote_delta(previous_vote_type, vote_type)
+
+    if vote is None:
+        vote = Vote.objects.create(user=user, content_type=content_type, object_id=target.pk, vote_type=vote_type)
+    elif previous_vote_type == vote_type:
+        vote.delete()
+    else:
+        vote.vote_type = vote_type
+        vote.save(update_fields=["vote_type", "updated_at"])
+
+    has_score = hasattr(target, "score")
+    increments = {"vote_count": vote_count_delta}
+    if has_score:
+        increments["score"] = vote_count_delta
+    increment_counters(model, target.pk, increments)
+    User.change_reputation(target.user_id, reputation_delta, ReputationEvent.Reason.VOTE, target)
+
+    thresholds = get_badge_thresholds(model, "score")
+    if has_score and thresholds and vote_count_delta > 0:
+        score = get_counters(model, target.pk, "score")["score"]
+        if any(score - vote_count_delta < threshold <= score for threshold in thresholds):
+            record_badge_event(model, "score", target.pk)
+    return vote
@@ -2,6 +2,7 @@ from rest_framework import status, viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.badges.utils import record_badge_event
 from apps.content_actions.models.bookmark_models import Bookmark
 from apps.content_actions.serializers.bookmark_serializers import BookmarkSerializer
 
@@ -32,9 +33,7 @@ class BookmarkViewset(viewsets.ModelViewSet):
             object_id=serializer.validated_data["object_id"],
         )
 
-        instance = bookmark.content_type.get_object_for_this_type(id=bookmark.object_id)
-        if hasattr(instance, "evaluate_bookmark_badges"):
-            instance.evaluate_bookmark_badges()
+        record_badge_event(bookmark.content_type.model_class(), "bookmarks", bookmark.object_id)
 
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
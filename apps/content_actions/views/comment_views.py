@@ -3,6 +3,7 @@ from rest_framework import filters, viewsets
 from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
+from apps.common.pagination import FeedPagination
 from apps.content_actions.constants import MODEL_MAPPING
 from apps.content_actions.models.comment_models import Comment
 from apps.content_actions.serializers.comment_serializers import CommentSerializer
@@ -25,6 +26,7 @@ class CommentViewSet(viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     permission_classes = (AllowAny,)
     serializer_class = CommentSerializer
+    pagination_class = FeedPagination
     filter_backends = (filters.OrderingFilter,)
     ordering = ("-created_at",)
     ordering_fields = ("created_at",)
@@ -53,4 +55,9 @@ class CommentViewSet(viewsets.ModelViewSet):
         except model.DoesNotExist:
             raise ValidationError("Invalid object_id")
 
-        return super().get_queryset().filter(content_type=content_type, object_id=instance.id)
+        return (
+            super()
+            .get_queryset()
+            .visible_to(self.request.user)
+            .filter(content_type=content_type, object_id=instance.id)
+        )
@@ -12,3 +12,11 @@ STELLAR_QUESTION = 100
 FAVORITE_QUESTION = 25
 STELLAR_ANSWER = 100
 FAVORITE_ANSWER = 25
+GURU_ANSWER = 40
+
+RELATED_QUESTIONS_LIMIT = 5
+RELATED_QUESTIONS_CANDIDATES = 200
+RELATED_QUESTIONS_TAG_WEIGHT = 0.6
+RELATED_QUESTIONS_TITLE_WEIGHT = 0.4
+RELATED_QUESTIONS_MAX_NEIGHBOURS = 50
+POPULAR_QUESTIONS_LIMIT = 5
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-18 09:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0002_post_post__vote_count_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedQuestion',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('score', models.FloatField()),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='forum.question')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to_entries', to='forum.question')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='relatedquestion',
+            index=models.Index(fields=['question', '-score'], name='relatedquestion__score_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='relatedquestion',
+            constraint=models.UniqueConstraint(fields=('question', 'related'), name='relatedquestion__1'),
+        ),
+    ]
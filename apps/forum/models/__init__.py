@@ -2,4 +2,4 @@ from apps.forum.models.qa_meta_models import Tag  # noqa F401
 from apps.content_actions.models.bookmark_models import Bookmark  # noqa F401
 from apps.content_actions.models.comment_models import Comment  # noqa F401
 from apps.content_actions.models.vote_models import Vote  # noqa F401
-from apps.forum.models.qa_models import Answer, Post, Question  # noqa F401
+from apps.forum.models.qa_models import Answer, Post, Question, RelatedQuestion  # noqa F401
@@ -1,32 +1,17 @@
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
+from django.db.models import Prefetch, Q
 from django.utils.translation import gettext_lazy as _
 
-from apps.common.models import BaseModel
+from apps.common.models import BaseModel, ModeratedModel, ModeratedQuerySet
 from apps.content_actions.models.bookmark_models import Bookmark
 from apps.content_actions.models.comment_models import Comment
 from apps.content_actions.models.view_models import ViewTracker
 from apps.content_actions.models.vote_models import Vote
-from apps.forum.constants import (
-    FAMOUS_QUESTION_THRESHOLD,
-    FAVORITE_ANSWER,
-    FAVORITE_QUESTION,
-    GOOD_ANSWER,
-    GOOD_QUESTION_THRESHOLD,
-    GREAT_ANSWER,
-    GREAT_QUESTION_THRESHOLD,
-    NICE_ANSWER,
-    NICE_QUESTION_THRESHOLD,
-    NOTABLE_QUESTION_THRESHOLD,
-    POPULAR_QUESTION_THRESHOLD,
-    SELF_LEARNER,
-    STELLAR_ANSWER,
-    STELLAR_QUESTION,
-)
-
-
-class Post(BaseModel):
+
+
+class Post(BaseModel, ModeratedModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name="posts", on_delete=models.CASCADE)
     body = models.TextField(_("Post Body"))
     vote_count = models.IntegerField(default=0)
@@ -35,6 +20,18 @@ class Post(BaseModel):
     bookmarks = GenericRelation(Bookmark, related_query_name="post")
     score = models.IntegerField(default=0, help_text="The score of the post. upvotes - downvotes.")
 
+    objects = ModeratedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("vote_count", "id"), name="post__vote_count_idx"),
+            models.Index(
+                fields=("created_at",),
+                condition=Q(moderation_status=ModeratedModel.ModerationStatus.PENDING),
+                name="post__pending_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Post by {self.user}"
 
@@ -44,53 +41,20 @@ class Post(BaseModel):
         self.score = upvotes - downvotes
         self.save(update_fields=["score"])
 
-    def evaluate_score_badges(self):
-        question = getattr(self, "question", None)
-        answer = getattr(self, "answer", None)
-        if question:
-            self.check_question_score_badges()
-        if answer:
-            self.check_answer_score_badges(answer)
-
-    def check_question_score_badges(self):
-        if self.score >= GREAT_QUESTION_THRESHOLD:
-            self.user.assign_badge("Great Question")
-        elif self.score >= GOOD_QUESTION_THRESHOLD:
-            self.user.assign_badge("Good Question")
-        elif self.score >= NICE_QUESTION_THRESHOLD:
-            self.user.assign_badge("Nice Question")
-
-    def check_answer_score_badges(self, answer):
-        if self.score >= GREAT_ANSWER:
-            self.user.assign_badge("Great Answer")
-        elif self.score >= GOOD_ANSWER:
-            self.user.assign_badge("Good Answer")
-        elif self.score >= NICE_ANSWER:
-            self.user.assign_badge("Nice Answer")
-        elif self.score >= SELF_LEARNER and self.user == answer.question.post.user:
-            self.user.assign_badge("Self-Learner")
-        elif self.score >= 1:
-            self.user.assign_badge("Teacher")
-
-    def evaluate_bookmark_badges(self):
-        question = getattr(self, "question", None)
-        answer = getattr(self, "answer", None)
-        if question:
-            self.check_question_bookmark_badges()
-        if answer:
-            self.check_answer_bookmark_badges()
-
-    def check_question_bookmark_badges(self):
-        if self.bookmarks.count() >= STELLAR_QUESTION:
-            self.user.assign_badge("Stellar Question")
-        elif self.bookmarks.count() >= FAVORITE_QUESTION:
-            self.user.assign_badge("Favorite Question")
-
-    def check_answer_bookmark_badges(self):
-        if self.bookmarks.count() >= STELLAR_ANSWER:
-            self.user.assign_badge("Stellar Answer")
-        elif self.bookmarks.count() >= FAVORITE_ANSWER:
-            self.user.assign_badge("Favorite Answer")
+
+class QuestionQuerySet(ModeratedQuerySet):
+    moderation_path = "post__"
+
+    def with_card_relations(self, user=None):
+        """
+        Loads everything a question card renders: the post and its author, the tags and the post comments
+        visible to `user` with their authors. The number of queries stays the same regardless of how many
+        questions are loaded.
+        """
+        return self.select_related("post__user").prefetch_related(
+            "tags",
+            Prefetch("post__comments", queryset=Comment.objects.visible_to(user).select_related("user")),
+        )
 
 
 class Question(BaseModel):
@@ -107,16 +71,20 @@ class Question(BaseModel):
     slug = models.SlugField(max_length=255, unique=True)
     views = GenericRelation(ViewTracker, related_query_name="question")
 
+    objects = QuestionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("created_at", "id"), name="question__created_at_idx"),
+            models.Index(fields=("view_count", "id"), name="question__view_count_idx"),
+        ]
+
     def __str__(self):
         return self.title
 
-    def check_question_view_badges(self):
-        if self.view_count >= FAMOUS_QUESTION_THRESHOLD:
-            self.post.user.assign_badge("Famous Question")
-        elif self.view_count >= NOTABLE_QUESTION_THRESHOLD:
-            self.post.user.assign_badge("Notable Question")
-        elif self.view_count >= POPULAR_QUESTION_THRESHOLD:
-            self.post.user.assign_badge("Popular Question")
+
+class AnswerQuerySet(ModeratedQuerySet):
+    moderation_path = "post__"
 
 
 class Answer(BaseModel):
@@ -124,5 +92,29 @@ class Answer(BaseModel):
     question = models.ForeignKey(Question, related_name="answers", on_delete=models.CASCADE)
     is_accepted = models.BooleanField(default=False)
 
+    objects = AnswerQuerySet.as_manager()
+
     def __str__(self):
         return f"Answer to {self.question.title}"
+
+
+class RelatedQuestion(BaseModel):
+    """
+    An entry of the precomputed related-questions index.
+
+    Attributes:
+        question (Question): The question the entry is listed on.
+        related (Question): The related question.
+        score (float): How related the questions are, from shared tags and title terms. Higher is better.
+    """
+
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="related_entries")
+    related = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="related_to_entries")
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=("question", "related"), name="relatedquestion__1")]
+        indexes = [models.Index(fields=("question", "-score"), name="relatedquestion__score_idx")]
+
+    def __str__(self):
+        return f"{self.related} related to {self.question}"
@@ -1,23 +1,26 @@
 from datetime import datetime
 
 from django.contrib.auth import get_user_model
-from django.contrib.contenttypes.models import ContentType
 from django.db.models import F
 from django.utils.text import slugify
 from rest_framework import serializers
 
+from apps.common.models import ModeratedModel
+from apps.common.serializers import CounterField, PrimingListSerializer
+from apps.common.utils import prime_counters
 from apps.content_actions.models.bookmark_models import Bookmark
-from apps.content_actions.models.vote_models import Vote
 from apps.content_actions.serializers.comment_serializers import CommentSerializer
+from apps.content_actions.utils import get_viewer_state
 from apps.forum.models.qa_meta_models import Tag
 from apps.forum.models.qa_models import Answer, Post, Question
-from apps.notifications.models.notification_models import Subscription
-from apps.services.utils import check_toxicity
+from apps.services.serializers.moderation_serializers import ToxicityCheckMixin
 
 User = get_user_model()
 
 
 class PostSerializer(serializers.ModelSerializer):
+    vote_count = CounterField()
+    score = CounterField()
     user_vote = serializers.SerializerMethodField()
     is_bookmarked = serializers.SerializerMethodField()
     comments = CommentSerializer(many=True, read_only=True)
@@ -33,37 +36,40 @@ class PostSerializer(serializers.ModelSerializer):
             "user_vote",
             "is_bookmarked",
             "score",
+            "moderation_status",
         )
+        list_serializer_class = PrimingListSerializer
 
-    def validate_body(self, value):
-        if check_toxicity(value):
-            raise serializers.ValidationError("The post contains toxic content.")
-        return value
+    def prime(self, instances):
+        prime_counters(instances, "vote_count", "score")
+        if viewer_state := get_viewer_state(self.context):
+            viewer_state.prime_votes(instances)
+            viewer_state.prime_bookmarks(instances)
 
     def get_user_vote(self, obj) -> str:
-        request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            user = request.user
-            vote = Vote.objects.filter(user=user, content_type__model="post", object_id=obj.id).first()
-            return vote.vote_type if vote else ""
+        if viewer_state := get_viewer_state(self.context):
+            return viewer_state.get_vote(obj)
         return ""
 
     def get_is_bookmarked(self, obj) -> bool:
-        request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            user = request.user
-            bookmark = Bookmark.objects.filter(user=user, content_type__model="post", object_id=obj.id).first()
-            return bookmark is not None
+        if viewer_state := get_viewer_state(self.context):
+            return viewer_state.is_bookmarked(obj)
         return False
 
 
-class AnswerSerializer(serializers.ModelSerializer):
+class AnswerSerializer(ToxicityCheckMixin, serializers.ModelSerializer):
     post = PostSerializer()
+    toxicity_fields = {"post.body": "The post contains toxic content."}
+    moderated_path = "post"
     answered_by = serializers.SerializerMethodField()
 
     class Meta:
         model = Answer
         fields = ("id", "post", "answered_by", "is_accepted")
+        list_serializer_class = PrimingListSerializer
+
+    def prime(self, instances):
+        self.fields["post"].prime([instance.post for instance in instances])
 
     def get_answered_by(self, obj) -> str:
         return obj.post.user.username
@@ -89,8 +95,10 @@ class AnswerSerializer(serializers.ModelSerializer):
         post_data["user"] = post_user
         post = Post.objects.create(**post_data)
         answer = Answer.objects.create(post=post, **validated_data)
-        answer.question.answer_count = F("answer_count") + 1
-        answer.question.save(update_fields=["answer_count"])
+        # Answers pending moderation are counted once they are published, see `count_moderated_answers`.
+        if post.moderation_status == ModeratedModel.ModerationStatus.PUBLISHED:
+            answer.question.answer_count = F("answer_count") + 1
+            answer.question.save(update_fields=["answer_count"])
         return answer
 
     def update(self, instance, validated_data):
@@ -105,8 +113,10 @@ class AnswerSerializer(serializers.ModelSerializer):
         return instance
 
 
-class BaseQuestionSerializer(serializers.ModelSerializer):
+class BaseQuestionSerializer(ToxicityCheckMixin, serializers.ModelSerializer):
     MIN_TITLE_LENGTH = 20
+    toxicity_fields = {"title": "The title contains toxic content.", "post.body": "The post contains toxic content."}
+    moderated_path = "post"
 
     post = PostSerializer()
     tags = serializers.SlugRelatedField(slug_field="name", many=True, queryset=Tag.objects.all())
@@ -143,6 +153,10 @@ class BaseQuestionSerializer(serializers.ModelSerializer):
             "asked_by",
             "slug",
         )
+        list_serializer_class = PrimingListSerializer
+
+    def prime(self, instances):
+        self.fields["post"].prime([instance.post for instance in instances])
 
     def get_asked_by(self, obj) -> str:
         return obj.post.user.username
@@ -157,10 +171,6 @@ class BaseQuestionSerializer(serializers.ModelSerializer):
     def validate_title(self, value):
         if len(value) < self.MIN_TITLE_LENGTH:
             raise serializers.ValidationError("The title must be at least 20 characters long.")
-
-        if check_toxicity(value):
-            raise serializers.ValidationError("The title contains toxic content.")
-
         return value
 
     def create(self, validated_data):
@@ -207,15 +217,14 @@ class QuestionDetailSerializer(BaseQuestionSerializer):
     class Meta(BaseQuestionSerializer.Meta):
         fields = "__all__"
 
+    def prime(self, instances):
+        super().prime(instances)
+        if viewer_state := get_viewer_state(self.context):
+            viewer_state.prime_subscriptions(instances)
+
     def get_subscription_id(self, obj) -> str:
-        request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            user = self.context["request"].user
-            content_type = ContentType.objects.get(model="question")
-            subscription = Subscription.objects.filter(
-                user=user, target_content_type=content_type, target_object_id=obj.id
-            ).first()
-            return subscription.id if subscription else ""
+        if viewer_state := get_viewer_state(self.context):
+            return viewer_state.get_subscription_id(obj)
         return ""
 
 
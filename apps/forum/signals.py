@@ -0,0 +1,45 @@
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.forum.models.qa_models import Answer, Post, Question, RelatedQuestion
+from apps.forum.utils import count_answers, schedule_related_questions
+from apps.services.moderation import content_moderated
+
+
+@receiver(post_save, sender=Question)
+def index_related_questions(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Updates the related-questions index when a question is created or its title may have changed.
+    """
+    if created or update_fields is None or "title" in update_fields:
+        schedule_related_questions(instance.pk)
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def index_related_questions_tags(sender, instance, action, **kwargs):
+    """
+    Updates the related-questions index when the tags of a question change, from either side of the relation.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not kwargs["reverse"]:
+        schedule_related_questions(instance.pk)
+    else:
+        schedule_related_questions(*(kwargs["pk_set"] or ()))
+
+
+@receiver(pre_delete, sender=Question)
+def index_related_questions_delete(sender, instance, **kwargs):
+    """
+    Refills the related questions of every question that listed a question being deleted.
+    """
+    schedule_related_questions(*RelatedQuestion.objects.filter(related=instance).values_list("question_id", flat=True))
+
+
+@receiver(content_moderated, sender=Post)
+def count_moderated_answers(sender, instances, **kwargs):
+    """
+    Recomputes the answer counts of the questions of answers that were published or flagged.
+    """
+    count_answers(set(Answer.objects.filter(post__in=instances).values_list("question_id", flat=True)))
@@ -1,6 +1,7 @@
 import pytest
 
 from apps.badges.models.badge_models import UserBadge
+from apps.badges.utils import evaluate_badge_events
 from apps.content_actions.models.vote_models import Vote
 from apps.forum.models.qa_models import Answer, Post, Question
 from apps.forum.tests.factories import BookmarkFactory, VoteFactory
@@ -27,8 +28,8 @@ class TestPostModel:
             25: "Good Question",
             10: "Nice Question",
         }
-        question.post.score = score
-        question.post.evaluate_score_badges()
+        Post.objects.filter(pk=question.post.pk).update(score=score)
+        evaluate_badge_events([("forum.Post", "score", question.post.pk)])
         assert UserBadge.objects.filter(user=question.post.user, badge__name=score_badge_mapping[score]).exists()
 
     @pytest.mark.parametrize("score", [100, 25, 10, 3, 1])
@@ -40,8 +41,8 @@ class TestPostModel:
             3: "Self-Learner",
             1: "Teacher",
         }
-        answer.post.score = score
-        answer.post.evaluate_score_badges()
+        Post.objects.filter(pk=answer.post.pk).update(score=score)
+        evaluate_badge_events([("forum.Post", "score", answer.post.pk)])
         assert UserBadge.objects.filter(user=answer.post.user, badge__name=score_badge_mapping[score]).exists()
 
     @pytest.mark.parametrize("bookmark_count", [100, 25])
@@ -51,7 +52,7 @@ class TestPostModel:
             25: "Favorite Question",
         }
         BookmarkFactory.create_batch(size=bookmark_count, content_object=question.post)
-        question.post.evaluate_bookmark_badges()
+        evaluate_badge_events([("forum.Post", "bookmarks", question.post.pk)])
         assert UserBadge.objects.filter(
             user=question.post.user, badge__name=bookmark_count_mapping[bookmark_count]
         ).exists()
@@ -63,7 +64,7 @@ class TestPostModel:
             25: "Favorite Answer",
         }
         BookmarkFactory.create_batch(size=bookmark_count, content_object=answer.post)
-        answer.post.evaluate_bookmark_badges()
+        evaluate_badge_events([("forum.Post", "bookmarks", answer.post.pk)])
         assert UserBadge.objects.filter(
             user=answer.post.user, badge__name=bookmark_count_mapping[bookmark_count]
         ).exists()
@@ -74,14 +75,14 @@ class TestQuestionModel:
         assert str(question) == question.title
 
     @pytest.mark.parametrize("view_count", [10_000, 2500, 1000])
-    def test_check_question_view_badges(self, question: Question, view_count: int):
+    def test_evaluate_view_badges(self, question: Question, view_count: int):
         view_count_mapping = {
             10_000: "Famous Question",
             2500: "Notable Question",
             1000: "Popular Question",
         }
-        question.view_count = view_count
-        question.check_question_view_badges()
+        Question.objects.filter(pk=question.pk).update(view_count=view_count)
+        evaluate_badge_events([("forum.Question", "views", question.pk)])
         assert UserBadge.objects.filter(user=question.post.user, badge__name=view_count_mapping[view_count]).exists()
 
 
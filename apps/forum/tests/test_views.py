@@ -0,0 +1,215 @@
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.utils.urls import replace_query_param
+
+from apps.content_actions.models.comment_models import Comment
+from apps.factories import UserFactory
+from apps.forum import utils as forum_utils
+from apps.forum.tests.factories import AnswerFactory, PostFactory, QuestionFactory, TagFactory
+from apps.forum.utils import POPULAR_QUESTIONS_KEY
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def question_feed(user, django_capture_on_commit_callbacks):
+    """
+    Creates `MAX_PAGE_SIZE` questions answered by `user`, each with a tag and a comment.
+    """
+    tag = TagFactory.create()
+    author = UserFactory.create()
+    with django_capture_on_commit_callbacks(execute=True):
+        questions = QuestionFactory.create_batch(size=settings.MAX_PAGE_SIZE, post__user=author)
+        for question in questions:
+            question.tags.add(tag)
+            Comment.objects.create(user=author, text="comment", content_object=question.post)
+            AnswerFactory.create(question=question, post=PostFactory.create(user=user))
+    return tag
+
+
+def count_queries(client, url, size):
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, {"size": size})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == size
+    return len(context.captured_queries)
+
+
+class TestQuestionFeedQueryCount:
+    RELATED_QUESTIONS_COUNT = 5
+
+    @pytest.mark.parametrize(
+        "url_name", ["forum:question-list", "forum:tag-questions", "forum:user_answered_questions"]
+    )
+    def test_query_count_is_constant(self, api_client, user, question_feed, url_name):
+        url_kwargs = {
+            "forum:question-list": {},
+            "forum:tag-questions": {"name": question_feed.name},
+            "forum:user_answered_questions": {"username": user.username},
+        }[url_name]
+        api_client.force_authenticate(user)
+        url = reverse(url_name, kwargs=url_kwargs)
+
+        assert count_queries(api_client, url, 1) == count_queries(api_client, url, settings.MAX_PAGE_SIZE)
+
+    def test_others_query_count_is_constant(self, api_client, user, question_feed, django_assert_max_num_queries):
+        api_client.force_authenticate(user)
+        question = question_feed.questions.first()
+        url = reverse("forum:question-others", kwargs={"slug": question.slug})
+
+        with django_assert_max_num_queries(15):
+            response = api_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["related_questions"]) == self.RELATED_QUESTIONS_COUNT
+
+
+class TestQuestionOthers:
+    def test_related_questions_are_ranked_by_tags_and_title(
+        self, api_client, user, django_capture_on_commit_callbacks
+    ):
+        python, django, rust = TagFactory.create_batch(size=3)
+        author = UserFactory.create()
+        with django_capture_on_commit_callbacks(execute=True):
+            question = QuestionFactory.create(title="Django queryset pagination", post__user=author)
+            question.tags.add(python, django)
+            same_tags = QuestionFactory.create(title="Deploying with docker", post__user=author)
+            same_tags.tags.add(python, django)
+            same_tags_and_title = QuestionFactory.create(title="Slow queryset pagination", post__user=author)
+            same_tags_and_title.tags.add(python, django)
+            one_tag = QuestionFactory.create(title="Python packaging", post__user=author)
+            one_tag.tags.add(python)
+            QuestionFactory.create(title="Django pagination in rust?", post__user=author).tags.add(rust)
+        api_client.force_authenticate(user)
+
+        response = api_client.get(reverse("forum:question-others", kwargs={"slug": question.slug}))
+
+        assert [related["slug"] for related in response.data["related_questions"]] == [
+            same_tags_and_title.slug,
+            same_tags.slug,
+            one_tag.slug,
+        ]
+
+    def test_index_follows_tag_changes(self, api_client, user, django_capture_on_commit_callbacks):
+        tag = TagFactory.create()
+        author = UserFactory.create()
+        with django_capture_on_commit_callbacks(execute=True):
+            question, other = QuestionFactory.create_batch(size=2, post__user=author)
+            question.tags.add(tag)
+            tag.questions.add(other)
+        api_client.force_authenticate(user)
+        url = reverse("forum:question-others", kwargs={"slug": question.slug})
+
+        assert [related["slug"] for related in api_client.get(url).data["related_questions"]] == [other.slug]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            other.tags.clear()
+
+        assert api_client.get(url).data["related_questions"] == []
+
+    def test_neighbours_refreshed_per_edit_are_capped(self, mocker, django_capture_on_commit_callbacks):
+        mocker.patch("apps.forum.utils.RELATED_QUESTIONS_MAX_NEIGHBOURS", 2)
+        tag = TagFactory.create()
+        author = UserFactory.create()
+        with django_capture_on_commit_callbacks(execute=True):
+            question, *others = QuestionFactory.create_batch(size=5, post__user=author)
+            tag.questions.add(question, *others)
+        rebuild = mocker.spy(forum_utils, "rebuild_related_questions")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            question.tags.remove(tag)
+
+        assert [len(call.args[0]) for call in rebuild.call_args_list] == [1, 2]
+
+    def test_popular_questions_are_cached(self, api_client, user):
+        author = UserFactory.create()
+        question, popular = QuestionFactory.create_batch(size=2, post__user=author)
+        popular.view_count = 10
+        popular.save(update_fields=["view_count"])
+        api_client.force_authenticate(user)
+        url = reverse("forum:question-others", kwargs={"slug": question.slug})
+
+        response = api_client.get(url)
+
+        assert [question["slug"] for question in response.data["popular_questions"]] == [popular.slug]
+        assert cache.get(POPULAR_QUESTIONS_KEY) == [popular.pk, question.pk]
+
+
+class TestQuestionCursorPagination:
+    PAGE_SIZE = 3
+
+    def walk(self, client, url, params):
+        slugs, previous = [], None
+        response = client.get(url, params)
+        while True:
+            assert response.status_code == status.HTTP_200_OK
+            assert "count" not in response.data
+            slugs.extend(question["slug"] for question in response.data["results"])
+            previous = response.data["previous"] or previous
+            if not response.data["next"]:
+                return slugs, previous
+            response = client.get(response.data["next"])
+
+    @pytest.mark.parametrize("sort", ["-created_at", "created_at", "-view_count", "-post__vote_count"])
+    def test_cursor_pages_cover_every_question_once(self, api_client, user, sort):
+        author = UserFactory.create()
+        questions = QuestionFactory.create_batch(size=10, post__user=author)
+        for index, question in enumerate(questions):
+            question.view_count = index % 3
+            question.save(update_fields=["view_count"])
+        api_client.force_authenticate(user)
+        url = reverse("forum:question-list")
+
+        slugs, previous = self.walk(api_client, url, {"pagination": "cursor", "size": self.PAGE_SIZE, "sort": sort})
+
+        expected = api_client.get(url, {"size": len(questions), "sort": sort}).data["results"]
+        assert len(slugs) == len(questions)
+        assert set(slugs) == {question["slug"] for question in expected}
+        if sort in ("-created_at", "created_at"):
+            assert slugs == [question["slug"] for question in expected]
+
+        response = api_client.get(previous)
+        assert [question["slug"] for question in response.data["results"]] == slugs[-4:-1]
+
+    def test_cursor_for_another_ordering_is_rejected(self, api_client, user):
+        QuestionFactory.create_batch(size=2, post__user=UserFactory.create())
+        api_client.force_authenticate(user)
+        url = reverse("forum:question-list")
+
+        next_url = api_client.get(url, {"pagination": "cursor", "size": 1}).data["next"]
+        response = api_client.get(replace_query_param(next_url, "sort", "view_count"))
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestQuestionListCount:
+    def count_statements(self, client, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, params)
+        statements = [query["sql"] for query in context.captured_queries if query["sql"].startswith("SELECT COUNT")]
+        return response, len(statements)
+
+    def test_count_is_cached_per_filter_and_invalidated_on_create(self, api_client, user):
+        author = UserFactory.create()
+        QuestionFactory.create_batch(size=3, post__user=author)
+        api_client.force_authenticate(user)
+        url = reverse("forum:question-list")
+
+        response, count_statements = self.count_statements(api_client, url, {"size": 1})
+        assert (response.data["count"], response.data["count_is_approximate"], count_statements) == (3, False, 1)
+
+        response, count_statements = self.count_statements(api_client, url, {"size": 2, "page": 2})
+        assert (response.data["count"], count_statements) == (3, 0)
+
+        response, count_statements = self.count_statements(api_client, url, {"size": 1, "is_answered": True})
+        assert (response.data["count"], count_statements) == (0, 1)
+
+        QuestionFactory.create(post__user=author)
+        response, count_statements = self.count_statements(api_client, url, {"size": 1})
+        assert (response.data["count"], count_statements) == (4, 1)
@@ -0,0 +1,190 @@
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.common.utils import OnCommitBatch, run_in_background
+from apps.forum.constants import (
+    POPULAR_QUESTIONS_LIMIT,
+    RELATED_QUESTIONS_CANDIDATES,
+    RELATED_QUESTIONS_LIMIT,
+    RELATED_QUESTIONS_MAX_NEIGHBOURS,
+    RELATED_QUESTIONS_TAG_WEIGHT,
+    RELATED_QUESTIONS_TITLE_WEIGHT,
+)
+from apps.forum.models.qa_models import Answer, Question, RelatedQuestion
+
+POPULAR_QUESTIONS_KEY = "forum:popular-questions"
+STOP_WORDS = frozenset(
+    "a an and are can do does for from how i in is it my of on or the to what when where which why with".split()
+)
+
+
+def count_answers(question_ids):
+    """
+    Sets the answer count of questions to their number of published answers.
+
+    The count is recomputed rather than adjusted, so answers that are flagged after an edit, or deleted
+    while pending, are never subtracted twice or counted once too many.
+    """
+    published = (
+        Answer.objects.visible_to(None)
+        .filter(question=OuterRef("pk"))
+        .order_by()
+        .values("question")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Question.objects.filter(pk__in=question_ids).update(answer_count=Coalesce(Subquery(published), 0))
+
+
+def get_title_terms(title: str) -> set[str]:
+    """
+    Returns the lowercase words of a title, without stop words and single characters.
+    """
+    return {word for word in re.findall(r"\w+", title.lower()) if len(word) > 1 and word not in STOP_WORDS}
+
+
+def get_similarity(first: set, second: set) -> float:
+    """
+    Returns the Jaccard similarity of two sets, from 0 for disjoint sets to 1 for equal ones.
+    """
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def compute_related_questions(question: Question) -> list[tuple]:
+    """
+    Ranks the questions related to a question.
+
+    Candidates are the questions sharing the most tags with it. Each is scored by the similarity of its
+    tags and its title terms to the question's, weighted by `RELATED_QUESTIONS_TAG_WEIGHT` and
+    `RELATED_QUESTIONS_TITLE_WEIGHT`.
+
+    Args:
+        question (Question): The question to find related questions for.
+
+    Returns:
+        list: Up to `RELATED_QUESTIONS_LIMIT` `(question id, score)` pairs, best first.
+    """
+    through = Question.tags.through
+    tag_ids = set(through.objects.filter(question_id=question.pk).values_list("tag_id", flat=True))
+    if not tag_ids:
+        return []
+
+    candidates = (
+        through.objects.filter(tag_id__in=tag_ids)
+        .exclude(question_id=question.pk)
+        .values("question_id")
+        .annotate(shared=Count("tag_id"))
+        .order_by("-shared")
+    )
+    candidate_ids = [candidate["question_id"] for candidate in candidates[:RELATED_QUESTIONS_CANDIDATES]]
+    candidate_tags = defaultdict(set)
+    candidate_tag_pairs = through.objects.filter(question_id__in=candidate_ids).values_list("question_id", "tag_id")
+    for question_id, tag_id in candidate_tag_pairs:
+        candidate_tags[question_id].add(tag_id)
+    titles = Question.objects.filter(pk__in=candidate_ids).values_list("pk", "title")
+
+    terms = get_title_terms(question.title)
+    scores = [
+        (
+            question_id,
+            RELATED_QUESTIONS_TAG_WEIGHT * get_similarity(tag_ids, candidate_tags[question_id])
+            + RELATED_QUESTIONS_TITLE_WEIGHT * get_similarity(terms, get_title_terms(title)),
+        )
+        for question_id, title in titles
+    ]
+    scores.sort(key=lambda entry: (-entry[1], str(entry[0])))
+    return scores[:RELATED_QUESTIONS_LIMIT]
+
+
+def rebuild_related_questions(question_ids) -> set:
+    """
+    Replaces the related-questions index entries of the given questions.
+
+    Args:
+        question_ids (Iterable): The IDs of the questions to rebuild. Deleted questions are skipped.
+
+    Returns:
+        set: The IDs of every question now listed as related to one of them.
+    """
+    entries = []
+    for question in Question.objects.filter(pk__in=question_ids).only("pk", "title"):
+        entries.extend(
+            RelatedQuestion(question=question, related_id=related_id, score=score)
+            for related_id, score in compute_related_questions(question)
+        )
+
+    with transaction.atomic():
+        RelatedQuestion.objects.filter(question_id__in=question_ids).delete()
+        RelatedQuestion.objects.bulk_create(entries)
+    return {entry.related_id for entry in entries}
+
+
+def update_related_questions(question_ids):
+    """
+    Incrementally updates the related-questions index after the tags or titles of questions changed.
+
+    The changed questions are rebuilt, then so are up to `RELATED_QUESTIONS_MAX_NEIGHBOURS` of their
+    neighbours: the questions that listed them before, best scored first, and the ones they list now. Scores
+    further away, and those of neighbours past the cap, drift until `refresh_question_rankings` runs.
+
+    Args:
+        question_ids (Iterable): The IDs of the changed questions.
+    """
+    question_ids = set(question_ids)
+    listed_by = (
+        RelatedQuestion.objects.filter(related_id__in=question_ids)
+        .exclude(question_id__in=question_ids)
+        .order_by("-score")
+        .values_list("question_id", flat=True)
+    )
+    listed_by = list(listed_by[:RELATED_QUESTIONS_MAX_NEIGHBOURS])
+    listed = rebuild_related_questions(question_ids) - question_ids
+    if neighbours := list(dict.fromkeys([*listed_by, *listed]))[:RELATED_QUESTIONS_MAX_NEIGHBOURS]:
+        rebuild_related_questions(neighbours)
+
+
+_related_batch = OnCommitBatch(lambda question_ids: run_in_background(update_related_questions, question_ids))
+
+
+def schedule_related_questions(*question_ids):
+    """
+    Updates the related-questions index of the given questions in the background once the current
+    transaction commits.
+    """
+    for question_id in question_ids:
+        _related_batch.add(question_id)
+
+
+def refresh_popular_questions() -> list:
+    """
+    Stores the IDs of the most viewed questions in the cache for `POPULAR_QUESTIONS_TIMEOUT` seconds.
+
+    One more question than `POPULAR_QUESTIONS_LIMIT` is kept, so a full list remains after the question
+    being viewed is left out.
+
+    Returns:
+        list: The IDs of the most viewed questions, most viewed first.
+    """
+    question_ids = list(
+        Question.objects.order_by("-view_count", "-id").values_list("id", flat=True)[: POPULAR_QUESTIONS_LIMIT + 1]
+    )
+    cache.set(POPULAR_QUESTIONS_KEY, question_ids, settings.POPULAR_QUESTIONS_TIMEOUT)
+    return question_ids
+
+
+def get_popular_question_ids() -> list:
+    """
+    Returns the cached IDs of the most viewed questions, computing them on a cache miss.
+    """
+    question_ids = cache.get(POPULAR_QUESTIONS_KEY)
+    if question_ids is None:
+        question_ids = refresh_popular_questions()
+    return question_ids
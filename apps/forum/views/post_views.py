@@ -1,6 +1,6 @@
 from django.contrib.auth import get_user_model
-from django.contrib.contenttypes.models import ContentType
-from django.db.models import F
+from django.db import transaction
+from django.db.models import Prefetch
 from django_filters import rest_framework as django_filters
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
@@ -8,8 +8,12 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.common.pagination import DynamicPageSizePagination
-from apps.content_actions.models.view_models import ViewTracker
+from apps.badges.models.badge_models import ReputationEvent
+from apps.badges.utils import record_badge_event
+from apps.common.pagination import DynamicPageSizePagination, FeedPagination
+from apps.content_actions.models.comment_models import Comment
+from apps.content_actions.utils import view_buffer
+from apps.forum.constants import POPULAR_QUESTIONS_LIMIT, RELATED_QUESTIONS_LIMIT
 from apps.forum.models.qa_models import Answer, Question
 from apps.forum.permissions import IsOwnerOrReadOnly
 from apps.forum.serializers.post_serializers import (
@@ -18,6 +22,8 @@ from apps.forum.serializers.post_serializers import (
     QuestionDetailSerializer,
     QuestionSerializer,
 )
+from apps.forum.utils import count_answers, get_popular_question_ids
+from apps.search.filters import FullTextSearchFilter
 
 User = get_user_model()
 
@@ -30,14 +36,12 @@ class QuestionViewSet(viewsets.ModelViewSet):
     the standard list, create, retrieve, update, and destroy actions.
     """
 
-    GURU_BADGE_THRESHOLD = 40
-
     queryset = Question.objects.all()
     permission_classes = (IsAuthenticated,)
     lookup_field = "slug"
-    filter_backends = (django_filters.DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
+    pagination_class = FeedPagination
+    filter_backends = (django_filters.DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter)
     filterset_fields = ("is_closed", "tags", "is_answered", "post__user__username")
-    search_fields = ("title",)
     ordering = ("-created_at",)
     ordering_fields = (
         "created_at",
@@ -45,6 +49,13 @@ class QuestionViewSet(viewsets.ModelViewSet):
         "view_count",
     )
 
+    def get_queryset(self):
+        """
+        Returns the published questions and the questions of the user, whatever their moderation status.
+        """
+        user = self.request.user
+        return Question.objects.with_card_relations(user).visible_to(user)
+
     def get_serializer_class(self):
         """
         Returns the appropriate serializer class based on the action being performed.
@@ -54,35 +65,38 @@ class QuestionViewSet(viewsets.ModelViewSet):
         return QuestionSerializer
 
     def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieves a question. The view is buffered and counted in the background, so `view_count` in the
+        response does not include it yet.
+        """
         question: Question = self.get_object()
-
-        content_type = ContentType.objects.get_for_model(Question)
-        if not ViewTracker.objects.filter(
-            user=request.user, content_type=content_type, object_id=question.pk
-        ).exists():
-            ViewTracker.objects.create(user=request.user, content_type=content_type, object_id=question.pk)
-            question.view_count = F("view_count") + 1
-            question.save(update_fields=["view_count"])
-            question.refresh_from_db(fields=["view_count"])
-            question.check_question_view_badges()
-
-        return super().retrieve(request, *args, **kwargs)
+        view_buffer.record(request.user, question)
+        serializer = self.get_serializer(question)
+        return Response(serializer.data)
 
     @action(detail=True, methods=["get"], url_path="others")
     def others(self, request, *args, **kwargs):
         """
         Retrieves related and popular questions for a specific question.
+
+        Related questions are read from the precomputed related-questions index and popular questions from
+        a cached list of the most viewed questions.
         """
         question = self.get_object()
-        related_questions = (
-            Question.objects.exclude(id=question.id).filter(tags__in=question.tags.all()).distinct()[:5]
-        )
-        popular_questions = Question.objects.exclude(id=question.id).order_by("-view_count")[:5]
-        related_serializer = QuestionSerializer(related_questions, many=True)
-        popular_serializer = QuestionSerializer(popular_questions, many=True)
+        questions = self.get_queryset()
+        related_questions = questions.filter(related_to_entries__question=question).order_by(
+            "-related_to_entries__score"
+        )[:RELATED_QUESTIONS_LIMIT]
+        popular_ids = [pk for pk in get_popular_question_ids() if pk != question.pk][:POPULAR_QUESTIONS_LIMIT]
+        popular_questions = questions.in_bulk(popular_ids)
+        popular_questions = [popular_questions[pk] for pk in popular_ids if pk in popular_questions]
+        context = self.get_serializer_context()
+        related_serializer = QuestionSerializer(related_questions, many=True, context=context)
+        popular_serializer = QuestionSerializer(popular_questions, many=True, context=context)
         return Response({"related_questions": related_serializer.data, "popular_questions": popular_serializer.data})
 
     @action(detail=True, methods=["post"], url_path="accept_answer")
+    @transaction.atomic
     def accept_answer(self, request, *args, **kwargs):
         serializer = AcceptAnswerSerializer(data=request.data)
         if serializer.is_valid():
@@ -98,7 +112,7 @@ class QuestionViewSet(viewsets.ModelViewSet):
                 return Response({"error": "Answer ID must be provided."}, status=status.HTTP_400_BAD_REQUEST)
 
             try:
-                answer = Answer.objects.get(id=answer_id, question=question)
+                answer = Answer.objects.visible_to(request.user).get(id=answer_id, question=question)
             except Answer.DoesNotExist:
                 return Response(
                     {"error": "No valid answer found for the provided ID."}, status=status.HTTP_404_NOT_FOUND
@@ -111,16 +125,19 @@ class QuestionViewSet(viewsets.ModelViewSet):
                 question.is_answered = False
                 question.accepted_answer = None
                 question.save()
-                question.accepted_answer.post.user.subtract_reputation(15)
-                request.user.subtract_reputation(2)
+                User.change_reputation(answer.post.user_id, -15, ReputationEvent.Reason.ANSWER_ACCEPTED, answer)
+                User.change_reputation(request.user.pk, -2, ReputationEvent.Reason.ACCEPTING_ANSWER, answer)
                 return Response({"message": "Answer unaccepted successfully."}, status=status.HTTP_200_OK)
 
             # Take away acceptance from another answer and give it to the new one
             if question.accepted_answer and question.accepted_answer.id != answer.id:
-                question.accepted_answer.is_accepted = False
-                question.accepted_answer.post.user.subtract_reputation(15)
-                request.user.subtract_reputation(2)
-                question.accepted_answer.save()
+                previous_answer = question.accepted_answer
+                previous_answer.is_accepted = False
+                previous_answer.save()
+                User.change_reputation(
+                    previous_answer.post.user_id, -15, ReputationEvent.Reason.ANSWER_ACCEPTED, previous_answer
+                )
+                User.change_reputation(request.user.pk, -2, ReputationEvent.Reason.ACCEPTING_ANSWER, previous_answer)
 
             question.accepted_answer = answer
             question.is_answered = True
@@ -131,11 +148,10 @@ class QuestionViewSet(viewsets.ModelViewSet):
 
             # Accepting your own answer does not increase your reputation.
             if answer.post.user != request.user:
-                answer.post.user.add_reputation(15)
-                request.user.add_reputation(2)
+                User.change_reputation(answer.post.user_id, 15, ReputationEvent.Reason.ANSWER_ACCEPTED, answer)
+                User.change_reputation(request.user.pk, 2, ReputationEvent.Reason.ACCEPTING_ANSWER, answer)
 
-            if answer.post.score >= self.GURU_BADGE_THRESHOLD:
-                answer.post.user.assign_badge("Guru")
+            record_badge_event(Answer, "accepted", answer.pk)
             return Response({"message": "Answer accepted successfully."}, status=status.HTTP_200_OK)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -165,7 +181,17 @@ class AnswerViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
     def get_queryset(self):
-        return super().get_queryset().filter(question__slug=self.kwargs.get("question_slug"))
+        user = self.request.user
+        return (
+            super()
+            .get_queryset()
+            .visible_to(user)
+            .filter(question__slug=self.kwargs.get("question_slug"))
+            .select_related("post__user")
+            .prefetch_related(
+                Prefetch("post__comments", queryset=Comment.objects.visible_to(user).select_related("user"))
+            )
+        )
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -173,9 +199,8 @@ class AnswerViewSet(viewsets.ModelViewSet):
         return context
 
     def perform_destroy(self, instance):
-        instance.question.answer_count = F("answer_count") - 1
-        instance.question.save(update_fields=["answer_count"])
-        return instance.delete()
+        instance.delete()
+        count_answers([instance.question_id])
 
 
 class UserAnsweredQuestionsView(APIView):
@@ -201,8 +226,14 @@ class UserAnsweredQuestionsView(APIView):
         if not user:
             return Response({"error": "User not found"}, status=404)
 
-        questions = Question.objects.filter(answers__post__user=user).order_by("-created_at")
+        questions = (
+            Question.objects.with_card_relations(request.user)
+            .visible_to(request.user)
+            .filter(answers__in=Answer.objects.visible_to(request.user).filter(post__user=user))
+            .distinct()
+            .order_by("-created_at")
+        )
         paginator = DynamicPageSizePagination()
         result_page = paginator.paginate_queryset(questions, request)
-        serializer = QuestionSerializer(result_page, many=True)
+        serializer = QuestionSerializer(result_page, many=True, context={"request": request})
         return paginator.get_paginated_response(serializer.data)
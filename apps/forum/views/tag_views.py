@@ -34,12 +34,13 @@ class TagReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=["get"], url_path="questions")
     def questions(self, request, *args, **kwargs):
         tag = self.get_object()
-        questions = tag.questions.order_by("-created_at")
+        questions = tag.questions.with_card_relations(request.user).visible_to(request.user).order_by("-created_at")
+        context = self.get_serializer_context()
 
         page = self.paginate_queryset(questions)
         if page is not None:
-            serializer = QuestionSerializer(page, many=True)
+            serializer = QuestionSerializer(page, many=True, context=context)
             return self.get_paginated_response(serializer.data)
 
-        serializer = QuestionSerializer(questions, many=True)
+        serializer = QuestionSerializer(questions, many=True, context=context)
         return Response(serializer.data)
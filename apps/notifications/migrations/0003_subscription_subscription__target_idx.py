@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_notification__user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['target_content_type', 'target_object_id', 'user'], name='subscription__target_idx'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 4.2 on 2026-10-18 10:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def create_archive_table(apps, schema_editor):
+    """
+    Creates the archive table, partitioned by range of `archived_at` on PostgreSQL. A partitioned table's
+    primary key must include the partition key, so the table is built from a regular one without its keys.
+    The index of the model is deferred by the schema editor and so is created on the partitioned table.
+    """
+    model = apps.get_model("notifications", "ArchivedNotification")
+    schema_editor.create_model(model)
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    table = model._meta.db_table
+    schema_editor.execute(f"ALTER TABLE {table} RENAME TO {table}_template")
+    schema_editor.execute(
+        f"CREATE TABLE {table} (LIKE {table}_template INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (archived_at)"
+    )
+    schema_editor.execute(f"DROP TABLE {table}_template")
+    schema_editor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, archived_at)")
+    schema_editor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def drop_archive_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model("notifications", "ArchivedNotification"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0004_notification_count_notification_last_actor'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='is_read',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', 'created_at', 'id'], name='notification__user_read_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', True)), fields=['created_at'], name='notification__read_created_idx'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ArchivedNotification',
+                    fields=[
+                        ('id', models.UUIDField(primary_key=True, serialize=False)),
+                        ('level', models.CharField(choices=[('info', 'Info'), ('success', 'Success'), ('warning', 'Warning'), ('error', 'Error')], max_length=10)),
+                        ('title', models.CharField(max_length=255)),
+                        ('message', models.TextField()),
+                        ('target_object_id', models.UUIDField(null=True)),
+                        ('count', models.PositiveIntegerField(default=1)),
+                        ('created_at', models.DateTimeField()),
+                        ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                        ('target_content_type', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+                        ('user', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'indexes': [models.Index(fields=['user', 'created_at'], name='archivednotification__user_idx')],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_archive_table, drop_archive_table),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notification_retention'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification__user_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification__user_read_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='notification__user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', 'updated_at', 'id'], name='notification__user_read_idx'),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
 from apps.common.models import BaseModel
 
@@ -21,12 +23,23 @@ class Notification(BaseModel):
     level = models.CharField(choices=Level.choices, max_length=10, default=Level.INFO)
     title = models.CharField(max_length=255)
     message = models.TextField()
-    is_read = models.BooleanField(default=False, db_index=True)
+    is_read = models.BooleanField(default=False)
     target_content_type = models.ForeignKey(
         ContentType, on_delete=models.CASCADE, related_name="notify_target", blank=True, null=True
     )
     target_object_id = models.UUIDField(blank=True, null=True)
     target = GenericForeignKey("target_content_type", "target_object_id")
+    count = models.PositiveIntegerField(default=1)
+    last_actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, related_name="+", blank=True, null=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("user", "updated_at", "id"), name="notification__user_updated_idx"),
+            models.Index(fields=("user", "is_read", "updated_at", "id"), name="notification__user_read_idx"),
+            models.Index(fields=("created_at",), condition=Q(is_read=True), name="notification__read_created_idx"),
+        ]
 
     def __str__(self):
         return f"Notification for {self.user}: {self.title}"
@@ -35,15 +48,26 @@ class Notification(BaseModel):
         """
         Marks the notification as read.
         """
-        self.is_read = True
-        self.save()
+        self.set_read(True)
 
     def mark_as_unread(self):
         """
         Marks the notification as unread.
         """
-        self.is_read = False
-        self.save()
+        self.set_read(False)
+
+    def set_read(self, is_read: bool):
+        """
+        Sets whether the notification is read. When it changes, the cached unread count of the user is
+        adjusted and the user's streams are woken once the transaction commits.
+        """
+        from apps.notifications.utils import change_unread_counts
+
+        if self.is_read == is_read:
+            return
+        self.is_read = is_read
+        self.save(update_fields=["is_read"])
+        change_unread_counts({self.user_id: -1 if is_read else 1})
 
 
 class Subscription(BaseModel):
@@ -58,5 +82,42 @@ class Subscription(BaseModel):
     target_object_id = models.UUIDField(blank=True, null=True)
     target = GenericForeignKey("target_content_type", "target_object_id")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=("target_content_type", "target_object_id", "user"), name="subscription__target_idx")
+        ]
+
     def __str__(self):
         return f"Subscription by {self.user} to {self.target}"
+
+
+class ArchivedNotification(models.Model):
+    """
+    A read notification moved out of the notifications table once it expired, see
+    `apps.notifications.retention`.
+
+    On PostgreSQL the table is partitioned by the month of `archived_at`, so expired archives are dropped a
+    partition at a time. The foreign keys have no database constraints, as the partitions are created and
+    dropped outside of the migrations.
+    """
+
+    id = models.UUIDField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+", db_constraint=False, db_index=False
+    )
+    level = models.CharField(choices=Notification.Level.choices, max_length=10)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    target_content_type = models.ForeignKey(
+        ContentType, on_delete=models.CASCADE, related_name="+", null=True, db_constraint=False, db_index=False
+    )
+    target_object_id = models.UUIDField(null=True)
+    count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=("user", "created_at"), name="archivednotification__user_idx")]
+
+    def __str__(self):
+        return f"Archived notification for {self.user_id}: {self.title}"
@@ -0,0 +1,160 @@
+"""
+The retention of notifications.
+
+Read notifications older than `NOTIFICATION_RETENTION_DAYS` are moved to the archive table in chunks, each in
+a short transaction, so neither table is locked for long. When `NOTIFICATION_ARCHIVE_RETENTION_DAYS` is 0
+they are deleted instead. Archives expire after `NOTIFICATION_ARCHIVE_RETENTION_DAYS`. On PostgreSQL the
+archive is partitioned by month of archiving, and expired months are dropped as whole partitions. The
+partition of the next month is created ahead of time, so rows archived around the turn of a month never land
+in the default partition, which would block creating that month's partition later.
+"""
+
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from time import sleep
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.notifications.models.notification_models import ArchivedNotification, Notification
+
+ARCHIVED_FIELDS = (
+    "id",
+    "user_id",
+    "level",
+    "title",
+    "message",
+    "target_content_type_id",
+    "target_object_id",
+    "count",
+    "created_at",
+)
+DECEMBER = 12
+
+
+def get_month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def get_next_month_start(value: datetime) -> datetime:
+    month_start = get_month_start(value)
+    if month_start.month == DECEMBER:
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
+
+
+def get_partition_name(month_start: datetime) -> str:
+    return f"{ArchivedNotification._meta.db_table}_{month_start:%Y%m}"
+
+
+def ensure_archive_partition(value: datetime):
+    """
+    Creates the archive partition of the month of `value` on PostgreSQL, if it does not exist yet. Rows
+    outside of every month partition go to the default partition.
+    """
+    if connection.vendor != "postgresql":
+        return
+
+    month_start = get_month_start(value.astimezone(dt_timezone.utc))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {get_partition_name(month_start)} "
+            f"PARTITION OF {ArchivedNotification._meta.db_table} FOR VALUES FROM (%s) TO (%s)",
+            [month_start, get_next_month_start(month_start)],
+        )
+
+
+def ensure_archive_partitions(value: datetime):
+    """
+    Creates the archive partitions of the month of `value` and of the month after it, if they do not exist.
+    """
+    ensure_archive_partition(value)
+    ensure_archive_partition(get_next_month_start(value.astimezone(dt_timezone.utc)))
+
+
+def archive_notifications(chunk_size: int, pause: float = 0) -> int:
+    """
+    Archives, or deletes, the read notifications older than `NOTIFICATION_RETENTION_DAYS`, oldest first.
+    The archive partitions are checked again for each chunk once the month changes, as a run can span months.
+
+    Args:
+        chunk_size (int): The number of notifications moved per transaction.
+        pause (float): Seconds to wait between chunks, to leave room for other writers.
+
+    Returns:
+        int: The number of notifications removed from the notifications table.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+    expired = Notification.objects.filter(is_read=True, created_at__lt=cutoff).order_by("created_at")
+    archive = settings.NOTIFICATION_ARCHIVE_RETENTION_DAYS > 0
+
+    count = 0
+    partition_month = None
+    while rows := list(expired.values(*ARCHIVED_FIELDS)[:chunk_size]):
+        archived_at = timezone.now()
+        if archive and get_month_start(archived_at.astimezone(dt_timezone.utc)) != partition_month:
+            ensure_archive_partitions(archived_at)
+            partition_month = get_month_start(archived_at.astimezone(dt_timezone.utc))
+        with transaction.atomic():
+            if archive:
+                ArchivedNotification.objects.bulk_create(
+                    [ArchivedNotification(**row, archived_at=archived_at) for row in rows], ignore_conflicts=True
+                )
+            Notification.objects.filter(pk__in=[row["id"] for row in rows]).delete()
+        count += len(rows)
+        if pause:
+            sleep(pause)
+    return count
+
+
+def drop_archive_partitions() -> int:
+    """
+    Drops the archive partitions of months that ended more than `NOTIFICATION_ARCHIVE_RETENTION_DAYS` ago.
+    Only PostgreSQL partitions the archive.
+
+    Returns:
+        int: The number of partitions dropped.
+    """
+    if connection.vendor != "postgresql":
+        return 0
+
+    table = ArchivedNotification._meta.db_table
+    cutoff = timezone.now() - timedelta(days=settings.NOTIFICATION_ARCHIVE_RETENTION_DAYS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = %s",
+            [table],
+        )
+        partitions = [name for (name,) in cursor.fetchall()]
+
+    count = 0
+    for name in partitions:
+        try:
+            month_start = datetime.strptime(name.removeprefix(f"{table}_"), "%Y%m").replace(tzinfo=dt_timezone.utc)
+        except ValueError:
+            continue
+        if get_next_month_start(month_start) <= cutoff:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {name}")
+            count += 1
+    return count
+
+
+def delete_expired_archives(chunk_size: int) -> int:
+    """
+    Deletes the archived notifications older than `NOTIFICATION_ARCHIVE_RETENTION_DAYS` that are not in a
+    dropped partition, in chunks.
+
+    Returns:
+        int: The number of archived notifications deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.NOTIFICATION_ARCHIVE_RETENTION_DAYS)
+    expired = ArchivedNotification.objects.filter(archived_at__lt=cutoff).values_list("pk", flat=True)
+    count = 0
+    while pks := list(expired[:chunk_size]):
+        count += ArchivedNotification.objects.filter(pk__in=pks).delete()[0]
+    return count
@@ -1,7 +1,10 @@
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 
+from apps.common.serializers import PrimingListSerializer
+from apps.content_actions.utils import get_viewer_state
 from apps.forum.models.qa_models import Answer, Question
 from apps.notifications.models.notification_models import Notification, Subscription
 from apps.resources.models.resource_models import Resource
@@ -55,6 +58,7 @@ class NotificationReadOnlySerializer(serializers.ModelSerializer):
     target_type = serializers.SerializerMethodField()
     target_slug = serializers.SerializerMethodField()
     subscription_id = serializers.SerializerMethodField()
+    last_actor = serializers.CharField(source="last_actor.username", default=None, read_only=True)
 
     class Meta:
         model = Notification
@@ -64,6 +68,8 @@ class NotificationReadOnlySerializer(serializers.ModelSerializer):
             "title",
             "message",
             "is_read",
+            "count",
+            "last_actor",
             "created_at",
             "updated_at",
             "target_object_id",
@@ -71,6 +77,19 @@ class NotificationReadOnlySerializer(serializers.ModelSerializer):
             "target_slug",
             "subscription_id",
         )
+        list_serializer_class = PrimingListSerializer
+
+    def prime(self, instances):
+        """
+        Loads the targets of the notifications with one query per content type, the questions of answer
+        targets and the last actors with one more each, and the subscriptions of the requesting user to the
+        targets with a single query.
+        """
+        prefetch_related_objects(instances, "target", "last_actor")
+        targets = [instance.target for instance in instances]
+        prefetch_related_objects([target for target in targets if isinstance(target, Answer)], "question")
+        if viewer_state := get_viewer_state(self.context):
+            viewer_state.prime_subscriptions(targets)
 
     def get_target_slug(self, obj) -> str:
         """
@@ -100,14 +119,7 @@ class NotificationReadOnlySerializer(serializers.ModelSerializer):
         """
         Returns the subscription ID for the notification.
         """
-        request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            user = self.context["request"].user
-            target_content_type = ContentType.objects.get_for_model(obj.target)
-            subscription = Subscription.objects.filter(
-                user=user,
-                target_content_type=target_content_type,
-                target_object_id=obj.target_object_id,
-            ).first()
-            return subscription.id if subscription else ""
+        viewer_state = get_viewer_state(self.context)
+        if viewer_state and obj.target is not None:
+            return viewer_state.get_subscription_id(obj.target)
         return ""
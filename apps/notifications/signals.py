@@ -1,13 +1,15 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from apps.common.models import ModeratedModel
 from apps.content_actions.models.bookmark_models import Bookmark
 from apps.content_actions.models.comment_models import Comment
 from apps.content_actions.models.vote_models import Vote
-from apps.forum.models.qa_models import Answer, Question
+from apps.forum.models.qa_models import Answer, Post, Question
 from apps.notifications.models.notification_models import Notification
 from apps.notifications.utils import create_subscription, notify_if_not_owner, notify_subscribers
 from apps.resources.models.resource_models import Resource
+from apps.services.moderation import content_published
 
 
 @receiver(post_save, sender=Question)
@@ -28,29 +30,54 @@ def subscribe_owner(sender, instance, created, **kwargs):
             create_subscription(user, instance)
 
 
-@receiver(post_save, sender=Answer)
-def create_answer_notification(sender, instance, created, **kwargs):
-    """
-    Creates a notification when a new answer is created for a question.
-    """
-    if created and instance.question.post.user != instance.post.user:
+def notify_new_answer(answer):
+    if answer.question.post.user != answer.post.user:
         notify_subscribers(
             title="New Answer",
             message="Question received a new answer",
             level=Notification.Level.INFO,
-            target=instance.question,
+            target=answer.question,
+            actor=answer.post.user,
         )
 
 
+def notify_new_comment(comment):
+    notify_if_not_owner(comment, "New Comment", f"{type(comment.content_object).__name__} received a new comment")
+
+
+@receiver(post_save, sender=Answer)
+def create_answer_notification(sender, instance, created, **kwargs):
+    """
+    Creates a notification when a new answer is created for a question. Answers pending moderation notify
+    once they are published.
+    """
+    if created and instance.post.moderation_status == ModeratedModel.ModerationStatus.PUBLISHED:
+        notify_new_answer(instance)
+
+
 @receiver(post_save, sender=Comment)
 def create_comment_notification(sender, instance, created, **kwargs):
     """
-    Creates a notification for a new comment.
+    Creates a notification for a new comment. Comments pending moderation notify once they are published.
     """
-    if created:
-        notify_if_not_owner(
-            instance, "New Comment", f"{type(instance.content_object).__name__} received a new comment"
-        )
+    if created and instance.moderation_status == ModeratedModel.ModerationStatus.PUBLISHED:
+        notify_new_comment(instance)
+
+
+@receiver(content_published, sender=Post)
+@receiver(content_published, sender=Comment)
+def create_published_content_notifications(sender, instances, created, **kwargs):
+    """
+    Creates the notifications of new answers and comments that were held for moderation.
+    """
+    if not created:
+        return
+
+    for instance in instances:
+        if sender is Comment:
+            notify_new_comment(instance)
+        elif answer := getattr(instance, "answer", None):
+            notify_new_answer(answer)
 
 
 @receiver(post_save, sender=Vote)
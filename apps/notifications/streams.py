@@ -0,0 +1,165 @@
+"""
+The push channel of notifications.
+
+Every change to the notifications of a user (a new one, one read or deleted) is published to the `broker`
+of `apps.notifications.utils` once its transaction commits. Clients connected in the same process are woken
+up at once. Other processes see the change within `NOTIFICATION_STREAM_CHECK_INTERVAL` seconds through a
+per-user version kept in the cache. A connected client only reads the notifications table when something
+changed for it.
+"""
+
+import asyncio
+import json
+from datetime import timedelta
+from functools import partial
+from threading import Event
+from time import monotonic
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.notifications.models.notification_models import Notification
+from apps.notifications.serializers.notification_serializers import NotificationReadOnlySerializer
+from apps.notifications.utils import broker, get_unread_count
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets `text/event-stream` requests through content negotiation. Streams write their own events, so this
+    only renders error responses, as a single `error` event.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event("error", data)
+
+
+def format_event(event: str, data, event_id: str | None = None) -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines += [f"event: {event}", f"data: {json.dumps(data, cls=JSONEncoder)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+def parse_cursor(value) -> tuple:
+    """
+    Returns the `(updated_at, pk)` of the last notification change a client has seen, or now if it sent
+    none. A cursor with only a time is accepted too.
+    """
+    updated_at, _, pk = (value or "").partition("_")
+    try:
+        updated_at = parse_datetime(updated_at) if updated_at else None
+        pk = UUID(pk) if pk else None
+    except ValueError:
+        updated_at = pk = None
+    return (updated_at, pk) if updated_at else (timezone.now(), None)
+
+
+def format_cursor(cursor) -> str:
+    updated_at, pk = cursor
+    updated_at = updated_at.isoformat().replace("+00:00", "Z")
+    return f"{updated_at}_{pk}" if pk else updated_at
+
+
+def get_notification_changes(request, cursor) -> tuple:
+    """
+    Returns the notifications of the requesting user created or updated after `cursor`, e.g. by coalescing,
+    oldest change first.
+
+    A change is stamped when it is written, not when it commits, so one that committed late may sort before
+    changes already seen. The changes of the `NOTIFICATION_CURSOR_OVERLAP` seconds before `cursor` are sent
+    again first, and clients skip the ones they already have by ID and `updated_at`.
+
+    Returns:
+        tuple: The serialized notifications, the new cursor and the unread count.
+    """
+    updated_at, pk = cursor
+    after = Q(updated_at__gt=updated_at)
+    if pk is not None:
+        after |= Q(updated_at=updated_at, pk__gt=pk)
+    notifications = Notification.objects.filter(user=request.user).order_by("updated_at", "pk")
+    overlap = updated_at - timedelta(seconds=settings.NOTIFICATION_CURSOR_OVERLAP)
+    seen = list(notifications.filter(updated_at__gt=overlap).exclude(after)[: settings.MAX_PAGE_SIZE])
+    new = list(notifications.filter(after)[: settings.MAX_PAGE_SIZE])
+    if new:
+        cursor = (new[-1].updated_at, new[-1].pk)
+    data = NotificationReadOnlySerializer(seen + new, many=True, context={"request": request}).data
+    return data, cursor, get_unread_count(request.user.pk)
+
+
+async def stream_notifications(request, cursor):
+    """
+    Yields server-sent events for the new notifications and the unread count of the requesting user.
+
+    Each notification is sent as a `notification` event whose ID is the cursor after it, so a reconnecting
+    `EventSource` resumes there with `Last-Event-ID`. Notifications sent again by the overlap of
+    `get_notification_changes` are skipped. The unread count is sent as an `unread_count` event
+    on connect and after every change. The stream ends after `NOTIFICATION_STREAM_TIMEOUT` seconds and the
+    client reconnects.
+    """
+    user_id = request.user.pk
+    changed = asyncio.Event()
+    callback = partial(asyncio.get_running_loop().call_soon_threadsafe, changed.set)
+    broker.subscribe(user_id, callback)
+    try:
+        yield f"retry: {settings.NOTIFICATION_STREAM_CHECK_INTERVAL * 1000}\n\n"
+        deadline = monotonic() + settings.NOTIFICATION_STREAM_TIMEOUT
+        version = None
+        sent = {}
+        while monotonic() < deadline:
+            current = await sync_to_async(broker.get_version)(user_id)
+            if current != version:
+                version = current
+                data, cursor, unread_count = await sync_to_async(get_notification_changes)(request, cursor)
+                for notification in data:
+                    if sent.get(notification["id"]) != notification["updated_at"]:
+                        yield format_event("notification", notification, event_id=format_cursor(cursor))
+                sent = {notification["id"]: notification["updated_at"] for notification in data}
+                yield format_event("unread_count", {"unread_count": unread_count})
+            else:
+                yield ": keep-alive\n\n"
+
+            try:
+                await asyncio.wait_for(changed.wait(), settings.NOTIFICATION_STREAM_CHECK_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            changed.clear()
+    finally:
+        broker.unsubscribe(user_id, callback)
+
+
+def wait_for_notifications(request, cursor, timeout: int) -> tuple:
+    """
+    Long-polls for the new notifications of the requesting user, for servers that cannot stream.
+
+    Returns as soon as there is a notification change after `cursor`, or a change of the overlap window of
+    `get_notification_changes` is published while waiting, or after `timeout` seconds.
+
+    Returns:
+        tuple: The serialized notifications, the new cursor and the unread count.
+    """
+    user_id = request.user.pk
+    changed = Event()
+    broker.subscribe(user_id, changed.set)
+    try:
+        deadline = monotonic() + timeout
+        version = broker.get_version(user_id)
+        changes = get_notification_changes(request, cursor)
+        while changes[1] == cursor and (remaining := deadline - monotonic()) > 0:
+            changed.wait(min(remaining, settings.NOTIFICATION_STREAM_CHECK_INTERVAL))
+            changed.clear()
+            if (current := broker.get_version(user_id)) != version:
+                version = current
+                changes = get_notification_changes(request, cursor)
+                if changes[0]:
+                    break
+        return changes
+    finally:
+        broker.unsubscribe(user_id, changed.set)
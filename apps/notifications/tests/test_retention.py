@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.notifications.models.notification_models import ArchivedNotification, Notification
+from apps.notifications.retention import archive_notifications
+from apps.notifications.utils import notify_user
+
+pytestmark = pytest.mark.django_db
+
+
+class TestNotificationRetention:
+    @pytest.fixture
+    def notifications(self, user, settings):
+        settings.NOTIFICATION_RETENTION_DAYS = 30
+        expired = timezone.now() - timedelta(days=31)
+        old_read, old_unread, recent_read = (notify_user(user, title) for title in ("old", "unread", "recent"))
+        Notification.objects.filter(pk__in=[old_read.pk, old_unread.pk]).update(created_at=expired)
+        Notification.objects.filter(pk__in=[old_read.pk, recent_read.pk]).update(is_read=True)
+        return old_read, old_unread, recent_read
+
+    def test_old_read_notifications_are_archived(self, notifications):
+        old_read, old_unread, recent_read = notifications
+
+        call_command("prune_notifications", chunk_size=1)
+
+        assert set(Notification.objects.values_list("pk", flat=True)) == {old_unread.pk, recent_read.pk}
+        archived = ArchivedNotification.objects.get()
+        assert (archived.pk, archived.title) == (old_read.pk, "old")
+
+    def test_old_read_notifications_are_deleted_without_archive(self, notifications, settings):
+        settings.NOTIFICATION_ARCHIVE_RETENTION_DAYS = 0
+        ArchivedNotification.objects.create(
+            id=notifications[0].pk, user_id=notifications[0].user_id, title="archived", created_at=timezone.now()
+        )
+
+        call_command("prune_notifications")
+
+        assert Notification.objects.count() == len(notifications) - 1
+        assert not ArchivedNotification.objects.exists()
+
+    def test_partitions_follow_the_month_of_each_chunk(self, notifications, mocker):
+        Notification.objects.filter(pk=notifications[1].pk).update(is_read=True)
+        months = [
+            datetime(2026, 1, 31, 23, 59, tzinfo=dt_timezone.utc),
+            datetime(2026, 2, 1, 0, 1, tzinfo=dt_timezone.utc),
+        ]
+        mocker.patch("apps.notifications.retention.timezone.now", side_effect=[timezone.now(), *months])
+        ensure_archive_partition = mocker.patch("apps.notifications.retention.ensure_archive_partition")
+
+        archive_notifications(chunk_size=1)
+
+        assert [call.args[0].month for call in ensure_archive_partition.call_args_list] == [1, 2, 2, 3]
@@ -23,4 +23,5 @@ class TestNotificationSignals:
             message="Question received a new answer",
             level=Notification.Level.INFO,
             target=instance.question,
+            actor=instance.post.user,
         )
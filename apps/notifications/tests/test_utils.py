@@ -0,0 +1,91 @@
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.factories import UserFactory
+from apps.forum.tests.factories import QuestionFactory
+from apps.notifications.models.notification_models import Notification
+from apps.notifications.tests.factories import SubscriptionFactory
+from apps.notifications.utils import fan_out_notification, get_unread_count, notify_subscribers, notify_user
+
+pytestmark = pytest.mark.django_db
+
+SUBSCRIBERS = 5
+CHUNK_SIZE = 2
+
+
+class TestNotificationFanOut:
+    def test_fan_out_inserts_in_chunks(self, settings):
+        settings.NOTIFICATION_FAN_OUT_CHUNK_SIZE = CHUNK_SIZE
+        question = QuestionFactory.create()
+        for user in UserFactory.create_batch(SUBSCRIBERS - 1):
+            SubscriptionFactory.create(user=user, target=question)
+        content_type = ContentType.objects.get_for_model(question)
+
+        with CaptureQueriesContext(connection) as context:
+            count = fan_out_notification(content_type.pk, question.pk, {"title": "Title", "message": "Message"})
+
+        inserts = [query for query in context.captured_queries if query["sql"].startswith("INSERT")]
+        assert count == SUBSCRIBERS
+        assert len(inserts) == -(-SUBSCRIBERS // CHUNK_SIZE)
+        assert Notification.objects.filter(target_object_id=question.pk).count() == SUBSCRIBERS
+
+    def test_notifications_are_created_on_commit(self, django_capture_on_commit_callbacks):
+        subscription = SubscriptionFactory.create(user=UserFactory.create())
+
+        with django_capture_on_commit_callbacks(execute=True):
+            notify_subscribers(title="Title", message=None, level="unknown", target=subscription.target)
+            assert not Notification.objects.exists()
+
+        notification = Notification.objects.get(user=subscription.user)
+        assert (notification.message, notification.level) == ("Title", Notification.Level.INFO)
+
+    def test_repeated_events_are_coalesced(self, django_capture_on_commit_callbacks):
+        question = QuestionFactory.create()
+        owner = question.post.user
+        voters = UserFactory.create_batch(3)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for voter in voters:
+                notify_subscribers(
+                    title="New Vote", message="Question received an upvote", level="info", target=question, actor=voter
+                )
+
+        notification = Notification.objects.get(user=owner)
+        assert (notification.count, notification.last_actor) == (len(voters), voters[-1])
+        assert notification.created_at < notification.updated_at
+
+        notification.mark_as_read()
+        with django_capture_on_commit_callbacks(execute=True):
+            notify_subscribers(title="New Vote", message="Question received an upvote", level="info", target=question)
+        assert Notification.objects.filter(user=owner, is_read=False, count=1).exists()
+
+    def test_new_answers_are_not_coalesced(self, django_capture_on_commit_callbacks):
+        question = QuestionFactory.create()
+        answers = 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for _ in range(answers):
+                notify_subscribers(title="New Answer", message="A new answer", level="info", target=question)
+
+        assert Notification.objects.filter(user=question.post.user, count=1).count() == answers
+
+
+class TestUnreadCount:
+    def test_reading_a_notification_updates_the_count(self, user, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            titles = ["First", "Second"]
+            for title in titles:
+                notify_user(user, title)
+        assert get_unread_count(user.pk) == len(titles)
+
+        notification = Notification.objects.filter(user=user).first()
+        with django_capture_on_commit_callbacks(execute=True):
+            notification.mark_as_read()
+            notification.mark_as_read()
+        assert get_unread_count(user.pk) == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            notification.mark_as_unread()
+        assert get_unread_count(user.pk) == len(titles)
@@ -0,0 +1,156 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from apps.factories import UserFactory
+from apps.forum.tests.factories import AnswerFactory, QuestionFactory
+from apps.notifications.models.notification_models import Notification, Subscription
+from apps.notifications.streams import format_cursor, format_event, parse_cursor, stream_notifications
+from apps.notifications.tests.factories import SubscriptionFactory
+from apps.notifications.utils import UNREAD_COUNT_KEY, notify_user
+
+pytestmark = pytest.mark.django_db
+
+PAGE_SIZE = 20
+
+
+def count_queries(client, size):
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse("notifications:notification-list"), {"size": size})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == size
+    return len(context.captured_queries), response.data["results"]
+
+
+class TestNotificationList:
+    def test_query_count_is_constant(self, api_client, user):
+        author = UserFactory.create()
+        for index in range(PAGE_SIZE // 2):
+            question = QuestionFactory.create(post__user=author)
+            answer = AnswerFactory.create(question=question, post__user=author)
+            notify_user(user, "New question", target=question)
+            notify_user(user, "New answer", target=answer)
+            if index % 2:
+                SubscriptionFactory.create(user=user, target=question)
+        api_client.force_authenticate(user)
+
+        few, _ = count_queries(api_client, 2)
+        many, results = count_queries(api_client, PAGE_SIZE)
+
+        assert few == many
+        subscriptions = Subscription.objects.filter(user=user).values_list("target_object_id", "id")
+        subscriptions = {str(object_id): subscription_id for object_id, subscription_id in subscriptions}
+        for result in results:
+            assert result["target_type"] in ("question", "answer")
+            assert result["target_slug"]
+            if result["target_type"] == "question":
+                assert result["subscription_id"] == subscriptions.get(result["target_object_id"], "")
+
+
+class TestUnreadCount:
+    def test_count_is_cached_and_kept_up_to_date(
+        self, api_client, user, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        cache.clear()
+        api_client.force_authenticate(user)
+        url = reverse("notifications:notification-unread-count")
+        with django_capture_on_commit_callbacks(execute=True):
+            notifications = [notify_user(user, "Title") for _ in range(3)]
+
+        assert api_client.get(url).data["unread_count"] == len(notifications)
+        with django_assert_num_queries(0):
+            api_client.get(url)
+
+        actions_url = reverse("notifications:notification_actions", kwargs={"action": "mark_as_read"})
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(actions_url, {"ids": [notifications[0].pk]}, format="json")
+            notify_user(user, "Title")
+
+        with django_assert_num_queries(0):
+            assert api_client.get(url).data["unread_count"] == len(notifications)
+
+        cache.set(UNREAD_COUNT_KEY.format(user_id=user.pk), 0)
+        call_command("reconcile_unread_counts")
+        assert api_client.get(url).data["unread_count"] == len(notifications)
+
+
+class TestNotificationPush:
+    def test_poll_returns_new_notifications(self, api_client, user, settings):
+        settings.NOTIFICATION_LONG_POLL_TIMEOUT = 0
+        api_client.force_authenticate(user)
+        url = reverse("notifications:notification-poll")
+        cursor = api_client.get(url).data["cursor"]
+        notification = notify_user(user, "Title")
+
+        response = api_client.get(url, {"after": cursor})
+
+        assert [result["id"] for result in response.data["results"]] == [str(notification.pk)]
+        assert response.data["cursor"] == format_cursor((notification.updated_at, notification.pk))
+        settings.NOTIFICATION_CURSOR_OVERLAP = 0
+        assert not api_client.get(url, {"after": response.data["cursor"]}).data["results"]
+
+    def test_poll_does_not_skip_changes_of_the_same_time_or_committed_late(self, api_client, user, settings):
+        settings.NOTIFICATION_LONG_POLL_TIMEOUT = 0
+        settings.NOTIFICATION_CURSOR_OVERLAP = 0
+        settings.MAX_PAGE_SIZE = 1
+        api_client.force_authenticate(user)
+        url = reverse("notifications:notification-poll")
+        stamp = timezone.now() - timedelta(minutes=1)
+        notifications = sorted(
+            (notify_user(user, "Title") for _ in range(2)), key=lambda notification: notification.pk
+        )
+        Notification.objects.filter(user=user).update(updated_at=stamp)
+
+        cursor, pages = format_cursor((stamp - timedelta(seconds=1), None)), []
+        for _ in notifications:
+            response = api_client.get(url, {"after": cursor})
+            cursor = response.data["cursor"]
+            pages += [result["id"] for result in response.data["results"]]
+        assert pages == [str(notification.pk) for notification in notifications]
+
+        settings.NOTIFICATION_CURSOR_OVERLAP = 5
+        late = notify_user(user, "Late")
+        Notification.objects.filter(pk=late.pk).update(updated_at=stamp - timedelta(seconds=1))
+        response = api_client.get(url, {"after": cursor})
+        assert [result["id"] for result in response.data["results"]] == [str(late.pk)]
+        assert response.data["cursor"] == cursor
+
+    def test_stream_pushes_published_notifications(self, user, settings, django_capture_on_commit_callbacks):
+        settings.NOTIFICATION_STREAM_CHECK_INTERVAL = 0
+        request = APIRequestFactory().get("/")
+        request.user = user
+
+        def publish_notification():
+            with django_capture_on_commit_callbacks(execute=True):
+                return notify_user(user, "Title")
+
+        async def read_stream():
+            stream = stream_notifications(request, parse_cursor(None))
+            events = [await anext(stream) for _ in range(2)]
+            notification = await sync_to_async(publish_notification)()
+            events += [await anext(stream) for _ in range(2)]
+            await stream.aclose()
+            return notification, events
+
+        notification, events = async_to_sync(read_stream)()
+
+        assert events[0].startswith("retry:")
+        assert events[1] == format_event("unread_count", {"unread_count": 0})
+        assert events[2].startswith(f"id: {format_cursor((notification.updated_at, notification.pk))}\n")
+        assert events[3] == format_event("unread_count", {"unread_count": 1})
+
+    def test_stream_is_refused_over_wsgi(self, api_client, user):
+        api_client.force_authenticate(user)
+        response = api_client.get(reverse("notifications:notification-stream"), HTTP_ACCEPT="text/event-stream")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.content.startswith(b"event: error")
@@ -1,8 +1,69 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from functools import partial
+from itertools import islice
+from threading import Lock
+
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
 
+from apps.common.pagination import invalidate_counts
+from apps.common.utils import run_in_background
 from apps.forum.models.qa_models import Post
 from apps.notifications.models.notification_models import Notification, Subscription
 
+UNREAD_COUNT_KEY = "notifications:unread-count:{user_id}"
+STREAM_VERSION_KEY = "notifications:stream-version:{user_id}"
+# The titles of the notifications that repeated events are merged into. Other notifications, e.g. of new
+# answers, each stand for something the user may want to open on its own.
+COALESCED_TITLES = frozenset({"New Vote", "New Bookmark", "New Comment"})
+
+
+class NotificationBroker:
+    """
+    Publishes the users whose notifications changed to the listeners of this process and to the cache.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._listeners = defaultdict(set)
+
+    def subscribe(self, user_id, callback):
+        with self._lock:
+            self._listeners[user_id].add(callback)
+
+    def unsubscribe(self, user_id, callback):
+        with self._lock:
+            self._listeners[user_id].discard(callback)
+            if not self._listeners[user_id]:
+                del self._listeners[user_id]
+
+    def publish(self, user_ids):
+        """
+        Bumps the version of each user and calls the listeners of this process that wait on them.
+        """
+        for user_id in user_ids:
+            key = STREAM_VERSION_KEY.format(user_id=user_id)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+
+        with self._lock:
+            callbacks = [callback for user_id in user_ids for callback in self._listeners.get(user_id, ())]
+        for callback in callbacks:
+            callback()
+
+    def get_version(self, user_id) -> int:
+        return cache.get(STREAM_VERSION_KEY.format(user_id=user_id), 0)
+
+
+broker = NotificationBroker()
+
 
 def notify_user(
     user: object, title: str, message: str | None = None, level: str = "info", target: object = None
@@ -38,39 +99,165 @@ def notify_user(
         notification_kwargs["target_object_id"] = target.pk
 
     notification = Notification.objects.create(**notification_kwargs)
+    change_unread_counts({notification.user_id: 1})
     return notification
 
 
-def notify_subscribers(title, message, level, target):
+def notify_subscribers(title, message, level, target, actor=None):
     """
-    Notifies the subscribers about a new notification.
+    Notifies the subscribers of a target about a new notification.
+
+    Only an event is queued here. Once the current transaction commits, the notifications are created in the
+    background by `fan_out_notification`, so the request that triggered them does not wait on the number of
+    subscribers.
 
     Args:
         title (str): The title of the notification.
         message (str): The message content of the notification.
         level (str): The level of the notification (e.g., 'info', 'warning', 'error').
         target (object): The target object for which the notification is being sent.
+        actor (User, optional): The user whose action caused the notification.
+    """
+    if level not in Notification.Level.values:
+        level = Notification.Level.INFO
+
+    content_type_id = ContentType.objects.get_for_model(target).pk
+    fields = {"title": title, "message": message or title, "level": level, "last_actor_id": getattr(actor, "pk", None)}
+    transaction.on_commit(partial(run_in_background, fan_out_notification, content_type_id, target.pk, fields))
 
-    Returns:
-        list: A list of newly created notifications.
 
+def fan_out_notification(content_type_id, object_id, fields: dict) -> int:
     """
-    target_content_type = ContentType.objects.get_for_model(target)
-    subscriptions = Subscription.objects.filter(target_content_type=target_content_type, target_object_id=target.pk)
+    Notifies every subscriber of a target.
 
-    new_notifications = []
+    Subscriber IDs are streamed from the database in chunks of `NOTIFICATION_FAN_OUT_CHUNK_SIZE`, and each
+    chunk is written with one bulk insert, so memory and round trips stay flat however many subscribers
+    there are. Subscribers who already have an unread vote, bookmark or comment notification about the
+    target that changed in the last `NOTIFICATION_COALESCE_WINDOW` seconds get that one updated instead, see
+    `coalesce_notifications`.
 
-    for subscription in subscriptions:
-        notification = notify_user(
-            user=subscription.user,
-            title=title,
-            message=message,
-            level=level,
-            target=target,
+    Args:
+        content_type_id (int): The content type of the target.
+        object_id (UUID): The ID of the target.
+        fields (dict): The values of the notification, e.g. `title`, `message`, `level` and `last_actor_id`.
+
+    Returns:
+        int: The number of subscribers notified.
+    """
+    chunk_size = settings.NOTIFICATION_FAN_OUT_CHUNK_SIZE
+    target = {"target_content_type_id": content_type_id, "target_object_id": object_id}
+    user_ids = (
+        Subscription.objects.filter(**target)
+        .order_by()
+        .values_list("user_id", flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    count, created = 0, False
+    while chunk := list(islice(user_ids, chunk_size)):
+        coalesced = coalesce_notifications(chunk, target, fields)
+        new_user_ids = [user_id for user_id in chunk if user_id not in coalesced]
+        Notification.objects.bulk_create(
+            [Notification(user_id=user_id, **target, **fields) for user_id in new_user_ids]
         )
-        new_notifications.append(notification)
+        change_unread_counts(Counter(new_user_ids))
+        if coalesced:
+            transaction.on_commit(partial(broker.publish, list(coalesced)))
+        count += len(chunk)
+        created = created or bool(new_user_ids)
+
+    if created:
+        invalidate_counts(Notification)
+    return count
+
+
+def coalesce_notifications(user_ids, target: dict, fields: dict) -> set:
+    """
+    Merges a repeated event into the recent unread notifications of users, e.g. the votes on a popular
+    answer into a single "New Vote" notification of its owner.
+
+    Only the titles in `COALESCED_TITLES` are merged. The notifications of the users with the same title
+    about the same target that changed in the last `NOTIFICATION_COALESCE_WINDOW` seconds take the new
+    values, count one more event and move to the top of the list, which is ordered by `updated_at`. Their
+    `created_at` is left as is. A window of 0 turns coalescing off.
+
+    Returns:
+        set: The IDs of the users whose notification was updated.
+    """
+    if not settings.NOTIFICATION_COALESCE_WINDOW or fields["title"] not in COALESCED_TITLES:
+        return set()
+
+    now = timezone.now()
+    recent = Notification.objects.filter(
+        user_id__in=user_ids,
+        title=fields["title"],
+        is_read=False,
+        updated_at__gte=now - timedelta(seconds=settings.NOTIFICATION_COALESCE_WINDOW),
+        **target,
+    )
+    matches = dict(recent.values_list("pk", "user_id"))
+    if matches:
+        Notification.objects.filter(pk__in=matches).update(count=F("count") + 1, updated_at=now, **fields)
+    return set(matches.values())
+
+
+def get_unread_count(user_id) -> int:
+    """
+    Returns the number of unread notifications of a user.
+
+    The count is served from the cache, where it is adjusted by `change_unread_counts` as notifications are
+    created, read or deleted. When it is missing it is counted from the database and cached again for
+    `NOTIFICATION_UNREAD_COUNT_TIMEOUT` seconds, which also bounds how long a drifted count can last.
+    """
+    key = UNREAD_COUNT_KEY.format(user_id=user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.add(key, count, settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def change_unread_counts(changes: dict):
+    """
+    Adjusts the cached unread counts of users once the current transaction commits.
+
+    Args:
+        changes (dict): A mapping of user ID to the number of notifications that became unread, negative
+            for notifications that were read or deleted.
+    """
+    changes = {user_id: amount for user_id, amount in changes.items() if amount}
+    if changes:
+        transaction.on_commit(partial(_apply_unread_count_changes, changes))
+        transaction.on_commit(partial(broker.publish, list(changes)))
 
-    return new_notifications
+
+def _apply_unread_count_changes(changes: dict):
+    for user_id, amount in changes.items():
+        key = UNREAD_COUNT_KEY.format(user_id=user_id)
+        try:
+            if cache.incr(key, amount) < 0:
+                cache.delete(key)
+        except ValueError:
+            # Not cached, the next read counts it from the database.
+            pass
+
+
+def reconcile_unread_counts(user_ids) -> int:
+    """
+    Recounts the unread notifications of users with one query and caches the exact values.
+
+    Returns:
+        int: The number of users reconciled.
+    """
+    user_ids = list(user_ids)
+    counts = dict.fromkeys(user_ids, 0)
+    unread = Notification.objects.filter(user_id__in=user_ids, is_read=False).order_by()
+    counts.update(unread.values_list("user_id").annotate(count=Count("pk")).values_list("user_id", "count"))
+    cache.set_many(
+        {UNREAD_COUNT_KEY.format(user_id=user_id): count for user_id, count in counts.items()},
+        settings.NOTIFICATION_UNREAD_COUNT_TIMEOUT,
+    )
+    return len(counts)
 
 
 def create_subscription(user: object, target: object):
@@ -108,4 +295,5 @@ def notify_if_not_owner(instance, title, message):
             message=message,
             level=Notification.Level.INFO,
             target=target,
+            actor=instance.user,
         )
@@ -1,4 +1,7 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import StreamingHttpResponse
 from django_filters import rest_framework as django_filters
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
@@ -6,12 +9,21 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.common.pagination import FeedPagination
 from apps.common.permissions import IsOwnerOrSuperUser
 from apps.notifications.models.notification_models import Notification, Subscription
 from apps.notifications.serializers.notification_serializers import (
     NotificationReadOnlySerializer,
     SubscriptionSerializer,
 )
+from apps.notifications.streams import (
+    EventStreamRenderer,
+    format_cursor,
+    parse_cursor,
+    stream_notifications,
+    wait_for_notifications,
+)
+from apps.notifications.utils import change_unread_counts, get_unread_count
 
 User = get_user_model()
 
@@ -53,19 +65,51 @@ class NotificationReadOnlyViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Notification.objects.all()
     serializer_class = NotificationReadOnlySerializer
     permission_classes = (IsAuthenticated, IsOwnerOrSuperUser)
+    pagination_class = FeedPagination
     filter_backends = (django_filters.DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
     filterset_fields = ("is_read",)
     search_fields = ("message",)
-    ordering = ("-created_at",)
-    ordering_fields = ("created_at",)
+    ordering = ("-updated_at",)
+    ordering_fields = ("created_at", "updated_at")
 
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
 
     @action(detail=False, methods=["get"], url_path="unread_count")
     def unread_count(self, request):
-        unread_count = self.get_queryset().filter(is_read=False).count()
-        return Response({"unread_count": unread_count}, status=status.HTTP_200_OK)
+        return Response({"unread_count": get_unread_count(request.user.pk)}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], renderer_classes=(EventStreamRenderer,))
+    def stream(self, request):
+        """
+        Pushes new notifications and unread count changes as server-sent events. Needs an ASGI server, as
+        a WSGI worker would buffer the whole stream; clients served over WSGI long-poll `poll` instead. The
+        stream of a client that disconnects is closed by `DisconnectMiddleware`.
+        """
+        if isinstance(request._request, WSGIRequest):
+            return Response(
+                {"error": "Streaming needs an ASGI server, use the poll endpoint instead."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cursor = parse_cursor(request.headers.get("Last-Event-ID") or request.query_params.get("after"))
+        response = StreamingHttpResponse(stream_notifications(request, cursor), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @action(detail=False, methods=["get"])
+    def poll(self, request):
+        """
+        Waits up to `NOTIFICATION_LONG_POLL_TIMEOUT` seconds for notifications created or updated after the
+        `after` cursor, and returns them with the cursor to send next and the unread count. The results may
+        repeat notifications of the previous poll, see `get_notification_changes`.
+        """
+        cursor = parse_cursor(request.query_params.get("after"))
+        results, cursor, unread_count = wait_for_notifications(
+            request, cursor, settings.NOTIFICATION_LONG_POLL_TIMEOUT
+        )
+        return Response({"results": results, "cursor": format_cursor(cursor), "unread_count": unread_count})
 
 
 class NotificationActionView(APIView):
@@ -89,21 +133,24 @@ class NotificationActionView(APIView):
             filters["id__in"] = ids
 
         if action == "mark_as_read":
-            Notification.objects.filter(**filters, is_read=False).update(is_read=True)
+            unread_change = -Notification.objects.filter(**filters, is_read=False).update(is_read=True)
 
         elif action == "mark_as_unread":
-            Notification.objects.filter(**filters, is_read=True).update(is_read=False)
+            unread_change = Notification.objects.filter(**filters, is_read=True).update(is_read=False)
 
         elif action == "delete_read":
             Notification.objects.filter(**filters, is_read=True).delete()
+            unread_change = 0
 
         elif action == "delete_unread":
-            Notification.objects.filter(**filters, is_read=False).delete()
+            unread_change = -Notification.objects.filter(**filters, is_read=False).delete()[0]
 
         elif action == "delete_any":
+            unread_change = -Notification.objects.filter(**filters, is_read=False).delete()[0]
             Notification.objects.filter(**filters).delete()
 
         else:
             return Response({"error": "Invalid action"}, status=status.HTTP_400_BAD_REQUEST)
 
+        change_unread_counts({request.user.pk: unread_change})
         return Response(status=status.HTTP_204_NO_CONTENT)
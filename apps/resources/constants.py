@@ -26,3 +26,7 @@ class ResourceConstants:
         "audio/ogg": "OGG",
         "audio/wav": "WAV",
     }
+
+    GREAT_RESOURCE_THRESHOLD = 100
+    GOOD_RESOURCE_THRESHOLD = 25
+    NICE_RESOURCE_THRESHOLD = 10
@@ -0,0 +1,22 @@
+# Generated by Django 4.2 on 2026-10-18 10:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resources', '0004_resource_resource__created_at_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resource',
+            name='moderation_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('published', 'Published'), ('flagged', 'Flagged')], default='published', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='resource',
+            index=models.Index(condition=models.Q(('moderation_status', 'pending')), fields=['created_at'], name='resource__pending_idx'),
+        ),
+    ]
@@ -2,7 +2,7 @@ from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
 
-from apps.common.models import BaseModel
+from apps.common.models import BaseModel, ModeratedModel, ModeratedQuerySet
 from apps.content_actions.models.bookmark_models import Bookmark
 from apps.content_actions.models.comment_models import Comment
 from apps.content_actions.models.view_models import ViewTracker
@@ -26,7 +26,7 @@ class ResourceCategory(BaseModel):
         return self.name
 
 
-class Resource(BaseModel):
+class Resource(BaseModel, ModeratedModel):
     """
     Represents a resource in the system.
 
@@ -38,10 +38,6 @@ class Resource(BaseModel):
         tags (QuerySet): The tags associated with the resource.
     """
 
-    GREAT_RESOURCE_THRESHOLD = 100
-    GOOD_RESOURCE_THRESHOLD = 25
-    NICE_RESOURCE_THRESHOLD = 10
-
     title = models.CharField(max_length=200)
     description = models.TextField()
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="resources")
@@ -55,6 +51,19 @@ class Resource(BaseModel):
     views = GenericRelation(ViewTracker, related_query_name="resource")
     score = models.IntegerField(default=0, help_text="The score of the post. upvotes - downvotes.")
 
+    objects = ModeratedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("created_at", "id"), name="resource__created_at_idx"),
+            models.Index(fields=("view_count", "id"), name="resource__view_count_idx"),
+            models.Index(
+                fields=("created_at",),
+                condition=models.Q(moderation_status=ModeratedModel.ModerationStatus.PENDING),
+                name="resource__pending_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -64,14 +73,6 @@ class Resource(BaseModel):
         self.score = upvotes - downvotes
         self.save(update_fields=["score"])
 
-    def evaluate_score_badges(self):
-        if self.score >= self.GREAT_RESOURCE_THRESHOLD:
-            self.user.assign_badge("Great Resource")
-        elif self.score >= self.GOOD_RESOURCE_THRESHOLD:
-            self.user.assign_badge("Good Resource")
-        elif self.score >= self.NICE_RESOURCE_THRESHOLD:
-            self.user.assign_badge("Nice Resource")
-
 
 class ResourceFile(BaseModel):
     """
@@ -1,17 +1,17 @@
-from django.contrib.contenttypes.models import ContentType
 from rest_framework import serializers
 
-from apps.content_actions.models.bookmark_models import Bookmark
-from apps.content_actions.models.vote_models import Vote
+from apps.common.serializers import CounterField, PrimingListSerializer
+from apps.common.utils import prime_counters
 from apps.content_actions.serializers.comment_serializers import CommentSerializer
+from apps.content_actions.utils import get_viewer_state
 from apps.forum.models import Tag
-from apps.notifications.models.notification_models import Subscription
 from apps.resources.constants import ResourceConstants
 from apps.resources.models.resource_models import (
     Resource,
     ResourceCategory,
     ResourceFile,
 )
+from apps.services.serializers.moderation_serializers import ToxicityCheckMixin
 
 
 class ResourceFileSerializer(serializers.ModelSerializer):
@@ -32,15 +32,20 @@ class ResourceFileSerializer(serializers.ModelSerializer):
         return instance
 
 
-class ResourceSerializer(serializers.ModelSerializer):
+class ResourceSerializer(ToxicityCheckMixin, serializers.ModelSerializer):
     files = ResourceFileSerializer(many=True, required=False)
     user = serializers.ReadOnlyField(source="user.username")
     tags = serializers.SlugRelatedField(slug_field="name", queryset=Tag.objects.all(), many=True)
     categories = serializers.SlugRelatedField(slug_field="name", queryset=ResourceCategory.objects.all(), many=True)
     comments = CommentSerializer(many=True, read_only=True)
+    vote_count = CounterField()
     user_vote = serializers.SerializerMethodField()
     is_bookmarked = serializers.SerializerMethodField()
     subscription_id = serializers.SerializerMethodField(read_only=True)
+    toxicity_fields = {
+        "title": "The title contains toxic content.",
+        "description": "The description contains toxic content.",
+    }
 
     class Meta:
         model = Resource
@@ -60,37 +65,38 @@ class ResourceSerializer(serializers.ModelSerializer):
             "user_vote",
             "is_bookmarked",
             "subscription_id",
+            "moderation_status",
         )
         read_only_fields = (
             "view_count",
             "vote_count",
+            "moderation_status",
         )
+        list_serializer_class = PrimingListSerializer
+
+    def prime(self, instances):
+        prime_counters(instances, "vote_count")
+        if viewer_state := get_viewer_state(self.context):
+            if "user_vote" in self.fields:
+                viewer_state.prime_votes(instances)
+            if "is_bookmarked" in self.fields:
+                viewer_state.prime_bookmarks(instances)
+            if "subscription_id" in self.fields:
+                viewer_state.prime_subscriptions(instances)
 
     def get_user_vote(self, obj) -> str:
-        request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            user = request.user
-            vote = Vote.objects.filter(user=user, content_type__model="resource", object_id=obj.id).first()
-            return vote.vote_type if vote else ""
+        if viewer_state := get_viewer_state(self.context):
+            return viewer_state.get_vote(obj)
         return ""
 
     def get_is_bookmarked(self, obj) -> bool:
-        request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            user = request.user
-            bookmark = Bookmark.objects.filter(user=user, content_type__model="resource", object_id=obj.id).first()
-            return bookmark is not None
+        if viewer_state := get_viewer_state(self.context):
+            return viewer_state.is_bookmarked(obj)
         return False
 
     def get_subscription_id(self, obj) -> str:
-        request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            user = self.context["request"].user
-            content_type = ContentType.objects.get(model="resource")
-            subscription = Subscription.objects.filter(
-                user=user, target_content_type=content_type, target_object_id=obj.id
-            ).first()
-            return subscription.id if subscription else ""
+        if viewer_state := get_viewer_state(self.context):
+            return viewer_state.get_subscription_id(obj)
         return ""
 
     def create(self, validated_data):
@@ -123,6 +129,7 @@ class ResourceSerializer(serializers.ModelSerializer):
 
         instance.title = validated_data.get("title", instance.title)
         instance.description = validated_data.get("description", instance.description)
+        instance.moderation_status = validated_data.get("moderation_status", instance.moderation_status)
         instance.save()
 
         if tags_data is not None:
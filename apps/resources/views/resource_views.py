@@ -1,15 +1,17 @@
-from django.contrib.contenttypes.models import ContentType
-from django.db.models import F
+from django.db.models import Prefetch
 from django_filters import rest_framework as django_filters
 from rest_framework import filters, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from apps.common.pagination import FeedPagination
 from apps.common.permissions import IsOwnerOrSuperUser
-from apps.content_actions.models.view_models import ViewTracker
+from apps.content_actions.models.comment_models import Comment
+from apps.content_actions.utils import view_buffer
 from apps.resources.models.resource_models import Resource, ResourceCategory
 from apps.resources.serializers.resource_serializers import ResourceCategorySerializer, ResourceSerializer
+from apps.search.filters import FullTextSearchFilter
 
 
 class ResourceFilter(django_filters.FilterSet):
@@ -44,9 +46,9 @@ class ResourceViewSet(viewsets.ModelViewSet):
     queryset = Resource.objects.all()
     serializer_class = ResourceSerializer
     permission_classes = (IsAuthenticated,)
-    filter_backends = (django_filters.DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter)
+    pagination_class = FeedPagination
+    filter_backends = (django_filters.DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter)
     filterset_class = ResourceFilter
-    search_fields = ("title",)
     ordering = ("-created_at",)
     ordering_fields = ("created_at", "view_count")
 
@@ -57,18 +59,27 @@ class ResourceViewSet(viewsets.ModelViewSet):
             self.permission_classes = [IsAuthenticated, IsOwnerOrSuperUser]
         return super().get_permissions()
 
+    def get_queryset(self):
+        """
+        Returns the published resources and the resources of the user, whatever their moderation status.
+        """
+        user = self.request.user
+        return (
+            super()
+            .get_queryset()
+            .visible_to(user)
+            .prefetch_related(Prefetch("comments", queryset=Comment.objects.visible_to(user).select_related("user")))
+        )
+
     def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieves a resource. The view is buffered and counted in the background, so `view_count` in the
+        response does not include it yet.
+        """
         resource = self.get_object()
-
-        content_type = ContentType.objects.get_for_model(Resource)
-        if not ViewTracker.objects.filter(
-            user=request.user, content_type=content_type, object_id=resource.pk
-        ).exists():
-            ViewTracker.objects.create(user=request.user, content_type=content_type, object_id=resource.pk)
-            resource.view_count = F("view_count") + 1
-            resource.save(update_fields=["view_count"])
-
-        return super().retrieve(request, *args, **kwargs)
+        view_buffer.record(request.user, resource)
+        serializer = self.get_serializer(resource)
+        return Response(serializer.data)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from apps.search.models.search_models import SearchDocument
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ("title", "content_type", "object_id", "updated_at")
+    search_fields = ("title",)
+    list_filter = ("content_type",)
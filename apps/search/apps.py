@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def setup_search_backend(**kwargs):
+    from apps.search.backends import get_search_backend
+
+    get_search_backend().setup()
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.search"
+
+    def ready(self):
+        import apps.search.signals  # noqa
+
+        post_migrate.connect(setup_search_backend, sender=self)
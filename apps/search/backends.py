@@ -0,0 +1,276 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from uuid import UUID
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from apps.search.models.search_models import SearchDocument
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+QUERY_TOKEN_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """
+    A single ranked search result.
+
+    Attributes:
+        document_id (UUID): The ID of the matching search document.
+        content_type_id (int): The content type of the matching object.
+        object_id (UUID): The ID of the matching object.
+        title (str): The title of the matching object.
+        rank (float): The relevance of the hit. Higher is better.
+        snippet (str): An excerpt of the matching text with the matched terms wrapped in `<mark>` tags.
+    """
+
+    document_id: UUID
+    content_type_id: int
+    object_id: UUID
+    title: str
+    rank: float
+    snippet: str
+
+
+def parse_query(query: str) -> list[list[str]]:
+    """
+    Splits a user query into phrases, each a list of words. Quoted text is kept together as a phrase.
+
+    Args:
+        query (str): The raw query, e.g. `django "query set" pagination`.
+
+    Returns:
+        list: The phrases of the query, e.g. `[["django"], ["query", "set"], ["pagination"]]`.
+    """
+    phrases = []
+    for quoted, word in QUERY_TOKEN_PATTERN.findall(query):
+        words = re.findall(r"\w+", quoted or word)
+        if words:
+            phrases.append(words)
+    return phrases
+
+
+class BaseSearchBackend:
+    """
+    The interface every search backend implements.
+
+    Backends index the `SearchDocument` table. `setup` creates any database objects the backend needs and
+    runs after every `migrate`; it must be idempotent.
+    """
+
+    vendor = None
+
+    def setup(self):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, query, content_types=None, tags=None, limit=20) -> list[SearchHit]:
+        raise NotImplementedError("Subclasses must implement `search()`.")
+
+    def get_filter_sql(self, content_types=None, tags=None):
+        """
+        Returns a `document id IN (...)` condition for the content type and tag filters, or an empty
+        condition if there are no filters.
+        """
+        if not content_types and not tags:
+            return "", []
+
+        documents = SearchDocument.objects.all()
+        if content_types:
+            documents = documents.filter(content_type__in=content_types)
+        if tags:
+            documents = documents.filter(tags__name__in=tags)
+        sql, params = documents.values("id").query.sql_with_params()
+        return f"AND d.id IN ({sql})", list(params)
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Full-text search with an SQLite FTS5 table.
+
+    The FTS5 table uses `search_searchdocument` as external content, keyed on its `index_id`, and is kept in
+    sync by triggers, so saving a `SearchDocument` is all it takes to index it. The triggers find the indexed
+    row of a document by rowid. The implicit rowid of `search_searchdocument` is not used, as `VACUUM` may
+    renumber it since its primary key is a UUID. Results are ranked with BM25, weighting the title over the
+    body over the answers.
+    """
+
+    vendor = "sqlite"
+    fts_table = "search_document_fts"
+    # Earlier tables keyed on the rowid of the document table, or on an unindexed document ID column.
+    legacy_fts_tables = ("search_fts",)
+    weights = (10.0, 4.0, 1.0)
+    snippet_tokens = 16
+
+    def get_table_sql(self) -> str:
+        return (
+            f"CREATE VIRTUAL TABLE {self.fts_table} USING fts5(title, body, answers, "
+            f"content='{SearchDocument._meta.db_table}', content_rowid='index_id', tokenize='porter unicode61')"
+        )
+
+    def setup(self):
+        """
+        Creates the FTS5 table and its triggers. A table with another definition, e.g. one created by an
+        earlier version, is dropped and rebuilt from the search documents.
+        """
+        document_table = SearchDocument._meta.db_table
+        columns = "title, body, answers"
+        insert = (
+            f"INSERT INTO {self.fts_table}(rowid, {columns}) "
+            "VALUES (new.index_id, new.title, new.body, new.answers);"
+        )
+        delete = (
+            f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {columns}) "
+            "VALUES ('delete', old.index_id, old.title, old.body, old.answers);"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", [self.fts_table])
+            row = cursor.fetchone()
+            is_current = row is not None and row[0] == self.get_table_sql()
+
+            statements = [
+                f"DROP TRIGGER IF EXISTS {table}_{suffix}"
+                for table in (*self.legacy_fts_tables, self.fts_table)
+                for suffix in ("ai", "ad", "au")
+            ]
+            statements += [f"DROP TABLE IF EXISTS {table}" for table in self.legacy_fts_tables]
+            if not is_current:
+                statements += [f"DROP TABLE IF EXISTS {self.fts_table}", self.get_table_sql()]
+            statements += [
+                f"CREATE TRIGGER {self.fts_table}_ai AFTER INSERT ON {document_table} BEGIN {insert} END",
+                f"CREATE TRIGGER {self.fts_table}_ad AFTER DELETE ON {document_table} BEGIN {delete} END",
+                f"CREATE TRIGGER {self.fts_table}_au AFTER UPDATE ON {document_table} BEGIN {delete} {insert} END",
+            ]
+            for statement in statements:
+                cursor.execute(statement)
+        if not is_current:
+            self.rebuild()
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')")
+
+    def build_match_expression(self, query):
+        """
+        Builds an FTS5 expression that matches every phrase of the query. Each phrase is quoted, so user
+        input can never be interpreted as FTS5 syntax.
+        """
+        return " ".join('"{}"'.format(" ".join(words)) for words in parse_query(query))
+
+    def search(self, query, content_types=None, tags=None, limit=20):
+        expression = self.build_match_expression(query)
+        if not expression:
+            return []
+
+        filter_sql, filter_params = self.get_filter_sql(content_types, tags)
+        weights = ", ".join(str(weight) for weight in self.weights)
+        sql = (
+            f"SELECT d.id, d.content_type_id, d.object_id, d.title, bm25({self.fts_table}, {weights}) AS rank, "
+            f"snippet({self.fts_table}, -1, %s, %s, '…', {self.snippet_tokens}) "
+            f"FROM {self.fts_table} JOIN {SearchDocument._meta.db_table} d ON d.index_id = {self.fts_table}.rowid "
+            f"WHERE {self.fts_table} MATCH %s {filter_sql} ORDER BY rank LIMIT %s"
+        )
+        params = [HIGHLIGHT_START, HIGHLIGHT_STOP, expression, *filter_params, limit]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        return [
+            SearchHit(
+                document_id=UUID(document_id),
+                content_type_id=content_type_id,
+                object_id=UUID(object_id),
+                title=title,
+                rank=-rank,
+                snippet=snippet,
+            )
+            for document_id, content_type_id, object_id, title, rank, snippet in rows
+        ]
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Full-text search with a weighted `tsvector` column and a GIN index.
+
+    The column is generated from the title (weight A), body (weight B) and answers (weight C), so
+    PostgreSQL keeps it in sync with every `SearchDocument` write. Queries use `websearch_to_tsquery`,
+    which understands quoted phrases, and are ranked with `ts_rank`.
+    """
+
+    vendor = "postgresql"
+    config = "english"
+    headline_options = "StartSel={start}, StopSel={stop}, MaxFragments=2, MaxWords=20, MinWords=8"
+
+    def setup(self):
+        document_table = SearchDocument._meta.db_table
+        vector = (
+            f"setweight(to_tsvector('{self.config}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{self.config}', coalesce(body, '')), 'B') || "
+            f"setweight(to_tsvector('{self.config}', coalesce(answers, '')), 'C')"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {document_table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({vector}) STORED"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {document_table}_vector_idx ON {document_table} USING gin (search_vector)"
+            )
+
+    def search(self, query, content_types=None, tags=None, limit=20):
+        if not parse_query(query):
+            return []
+
+        filter_sql, filter_params = self.get_filter_sql(content_types, tags)
+        headline_options = self.headline_options.format(start=HIGHLIGHT_START, stop=HIGHLIGHT_STOP)
+        sql = (
+            "SELECT d.id, d.content_type_id, d.object_id, d.title, ts_rank(d.search_vector, q) AS rank, "
+            f"ts_headline('{self.config}', d.title || ' ' || d.body || ' ' || d.answers, q, %s) "
+            f"FROM {SearchDocument._meta.db_table} d, websearch_to_tsquery('{self.config}', %s) q "
+            f"WHERE d.search_vector @@ q {filter_sql} ORDER BY rank DESC LIMIT %s"
+        )
+        params = [headline_options, query, *filter_params, limit]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        return [
+            SearchHit(
+                document_id=document_id,
+                content_type_id=content_type_id,
+                object_id=object_id,
+                title=title,
+                rank=rank,
+                snippet=snippet,
+            )
+            for document_id, content_type_id, object_id, title, rank, snippet in rows
+        ]
+
+
+SEARCH_BACKENDS = {
+    SQLiteSearchBackend.vendor: SQLiteSearchBackend,
+    PostgresSearchBackend.vendor: PostgresSearchBackend,
+}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend() -> BaseSearchBackend:
+    """
+    Returns the configured search backend.
+
+    `SEARCH_BACKEND` may name a backend class by its dotted path. Otherwise the backend matching the
+    database vendor is used.
+    """
+    if settings.SEARCH_BACKEND:
+        return import_string(settings.SEARCH_BACKEND)()
+
+    try:
+        return SEARCH_BACKENDS[connection.vendor]()
+    except KeyError:
+        raise NotImplementedError(f"There is no search backend for the {connection.vendor} database.")
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Case, IntegerField, Value, When
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from apps.search.backends import get_search_backend
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Filters a queryset of questions or resources with the full-text search backend.
+
+    Matching objects are annotated with `search_rank`, their position in the ranked results, and ordered
+    by it unless the request asks for another ordering. Only the best `SEARCH_MAX_RESULTS` hits are kept,
+    whichever ordering is asked for. Place this backend after `OrderingFilter`.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+    search_title = "Search"
+    search_description = (
+        "A full-text search term. Wrap words in double quotes to search for a phrase. "
+        "Only the best ranked matches are returned, up to the configured maximum (500 by default)."
+    )
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+
+        hits = get_search_backend().search(
+            query,
+            content_types=[ContentType.objects.get_for_model(queryset.model)],
+            limit=settings.SEARCH_MAX_RESULTS,
+        )
+        if not hits:
+            return queryset.none()
+
+        search_rank = Case(
+            *(When(pk=hit.object_id, then=Value(position)) for position, hit in enumerate(hits)),
+            output_field=IntegerField(),
+        )
+        queryset = queryset.filter(pk__in=[hit.object_id for hit in hits]).annotate(search_rank=search_rank)
+        if api_settings.ORDERING_PARAM not in request.query_params:
+            queryset = queryset.order_by("search_rank")
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": self.search_description,
+                "schema": {"type": "string"},
+            },
+        ]
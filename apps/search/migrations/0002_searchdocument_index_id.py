@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-18 12:02
+
+from django.db import migrations, models
+import apps.search.models.search_models
+from apps.search.models.search_models import get_index_id
+
+
+def set_index_ids(apps, schema_editor):
+    SearchDocument = apps.get_model("search", "SearchDocument")
+    documents = list(SearchDocument.objects.only("pk"))
+    for document in documents:
+        document.index_id = get_index_id()
+    SearchDocument.objects.bulk_update(documents, ["index_id"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchdocument',
+            name='index_id',
+            field=models.BigIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(set_index_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='searchdocument',
+            name='index_id',
+            field=models.BigIntegerField(default=apps.search.models.search_models.get_index_id, editable=False, unique=True),
+        ),
+    ]
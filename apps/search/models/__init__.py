@@ -0,0 +1 @@
+from apps.search.models.search_models import SearchDocument  # noqa F401
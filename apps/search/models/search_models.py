@@ -0,0 +1,50 @@
+import secrets
+
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+from apps.common.models import BaseModel
+from apps.forum.models.qa_meta_models import Tag
+
+
+def get_index_id() -> int:
+    """
+    Returns a random positive 63-bit integer, the `index_id` of a new search document.
+    """
+    return secrets.randbits(63) or 1
+
+
+class SearchDocument(BaseModel):
+    """
+    A denormalized, searchable copy of a question or a resource.
+
+    The search backend builds its full-text index from these rows, so the source models never have to be
+    joined at query time.
+
+    Attributes:
+        content_type (ContentType): The content type of the indexed object.
+        object_id (UUIDField): The ID of the indexed object.
+        content_object (GenericForeignKey): The indexed object.
+        title (str): The title of the object. Weighted highest.
+        body (str): The question body or the resource description.
+        answers (str): The bodies of all answers to a question. Weighted lowest.
+        tags (QuerySet): The tags of the object, used for filtering.
+        index_id (int): A stable integer key, for backends that index rows by integer, e.g. the rowid of
+            the SQLite FTS5 table. The primary key is a UUID, so the table's own rowids may be renumbered.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.UUIDField()
+    content_object = GenericForeignKey("content_type", "object_id")
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    answers = models.TextField(blank=True)
+    tags = models.ManyToManyField(Tag, blank=True, related_name="search_documents")
+    index_id = models.BigIntegerField(unique=True, default=get_index_id, editable=False)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=("content_type", "object_id"), name="searchdocument__1")]
+
+    def __str__(self):
+        return f"Search document for {self.content_type.model} -> {self.object_id}"
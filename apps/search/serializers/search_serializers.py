@@ -0,0 +1,29 @@
+from rest_framework import serializers
+
+from apps.search.utils import INDEXED_MODELS
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """
+    Serializer class for the query parameters of a search.
+    """
+
+    q = serializers.CharField(help_text="The search query. Wrap words in double quotes to search for a phrase.")
+    type = serializers.ChoiceField(choices=tuple(INDEXED_MODELS), required=False, help_text="Only return this type.")
+    tags = serializers.CharField(required=False, help_text="Comma separated tag names the results must have.")
+
+    def validate_tags(self, value) -> list:
+        return [tag.strip() for tag in value.split(",") if tag.strip()]
+
+
+class SearchHitSerializer(serializers.Serializer):
+    """
+    Serializer class for a ranked search result.
+    """
+
+    id = serializers.UUIDField(source="object_id")
+    type = serializers.CharField()
+    slug = serializers.CharField(allow_blank=True)
+    title = serializers.CharField()
+    snippet = serializers.CharField(help_text="Matching text with the matched terms wrapped in <mark> tags.")
+    rank = serializers.FloatField()
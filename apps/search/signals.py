@@ -0,0 +1,77 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.forum.models.qa_models import Answer, Post, Question
+from apps.resources.models.resource_models import Resource
+from apps.search.utils import schedule_index
+from apps.services.moderation import content_published
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=Resource)
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=Resource)
+def index_searchable(sender, instance, **kwargs):
+    """
+    Re-indexes a question or a resource when it is saved or deleted. Signals sent for unsaved instances
+    are ignored.
+    """
+    if instance._state.adding:
+        return
+    schedule_index(sender, instance.pk)
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+@receiver(m2m_changed, sender=Resource.tags.through)
+def index_searchable_tags(sender, instance, action, **kwargs):
+    """
+    Re-indexes a question or a resource when its tags change, from either side of the relation.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not kwargs["reverse"]:
+        schedule_index(type(instance), instance.pk)
+    else:
+        for pk in kwargs["pk_set"] or ():
+            schedule_index(kwargs["model"], pk)
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def index_answered_question(sender, instance, **kwargs):
+    """
+    Re-indexes the question of an answer that was created or deleted.
+    """
+    if instance._state.adding:
+        return
+    schedule_index(Question, instance.question_id)
+
+
+@receiver(post_save, sender=Post)
+def index_post_body(sender, instance, created, **kwargs):
+    """
+    Re-indexes the question a question or answer body belongs to when the body is edited.
+    """
+    if created:
+        return
+
+    if question := getattr(instance, "question", None):
+        schedule_index(Question, question.pk)
+    elif answer := getattr(instance, "answer", None):
+        schedule_index(Question, answer.question_id)
+
+
+@receiver(content_published, sender=Post)
+@receiver(content_published, sender=Resource)
+def index_published_content(sender, instances, **kwargs):
+    """
+    Indexes the questions and resources whose content was published by moderation.
+    """
+    for instance in instances:
+        if sender is Resource:
+            schedule_index(Resource, instance.pk)
+        elif question := getattr(instance, "question", None):
+            schedule_index(Question, question.pk)
+        elif answer := getattr(instance, "answer", None):
+            schedule_index(Question, answer.question_id)
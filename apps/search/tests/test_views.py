@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from apps.factories import UserFactory
+from apps.forum.tests.factories import AnswerFactory, PostFactory, QuestionFactory, TagFactory
+from apps.search.backends import get_search_backend
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def questions(django_capture_on_commit_callbacks):
+    """
+    Creates three questions that mention "keyset pagination" in their title, body and answer respectively.
+    """
+    author = UserFactory.create()
+    with django_capture_on_commit_callbacks(execute=True):
+        in_title = QuestionFactory.create(
+            title="Keyset pagination for large tables", post__body="How deep can I page?", post__user=author
+        )
+        in_body = QuestionFactory.create(
+            title="Slow feed", post__body="Should the feed use keyset pagination?", post__user=author
+        )
+        in_answer = QuestionFactory.create(title="Listing posts", post__body="Pages are slow.", post__user=author)
+        AnswerFactory.create(question=in_answer, post=PostFactory.create(body="Try keyset pagination", user=author))
+        QuestionFactory.create(title="Pagination of pages", post__body="Keyset is unrelated here.", post__user=author)
+        in_title.tags.add(TagFactory.create(name="databases"))
+    return in_title, in_body, in_answer
+
+
+class TestSearchView:
+    def search(self, client, **params):
+        response = client.get(reverse("search:search"), params)
+        assert response.status_code == status.HTTP_200_OK
+        return response.data["results"]
+
+    def test_results_are_ranked_by_field_weight(self, api_client, user, questions):
+        api_client.force_authenticate(user)
+
+        results = self.search(api_client, q='"keyset pagination"')
+
+        assert [result["slug"] for result in results] == [question.slug for question in questions]
+        assert results[0]["type"] == "question"
+        assert "<mark>" in results[0]["snippet"]
+
+    def test_results_are_filtered_by_tag(self, api_client, user, questions):
+        api_client.force_authenticate(user)
+
+        results = self.search(api_client, q="keyset", tags="databases")
+
+        assert [result["slug"] for result in results] == [questions[0].slug]
+
+    def test_deleted_question_is_removed_from_index(
+        self, api_client, user, questions, django_capture_on_commit_callbacks
+    ):
+        api_client.force_authenticate(user)
+        with django_capture_on_commit_callbacks(execute=True):
+            questions[0].delete()
+
+        results = self.search(api_client, q='"keyset pagination"')
+
+        assert [result["slug"] for result in results] == [question.slug for question in questions[1:]]
+
+    def test_question_list_search_uses_index(self, api_client, user, questions):
+        api_client.force_authenticate(user)
+
+        response = api_client.get(reverse("forum:question-list"), {"search": '"keyset pagination"'})
+
+        assert [question["slug"] for question in response.data["results"]] == [question.slug for question in questions]
+
+    def test_edited_question_is_reindexed(self, api_client, user, questions, django_capture_on_commit_callbacks):
+        api_client.force_authenticate(user)
+        with django_capture_on_commit_callbacks(execute=True):
+            questions[0].title = "Offset pagination for small tables"
+            questions[0].save()
+
+        assert [result["slug"] for result in self.search(api_client, q="offset")] == [questions[0].slug]
+        get_search_backend().rebuild()
+        assert [result["slug"] for result in self.search(api_client, q="offset")] == [questions[0].slug]
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="Only the SQLite backend builds an FTS5 table.")
+def test_setup_keeps_an_up_to_date_index(mocker):
+    backend = get_search_backend()
+    rebuild = mocker.patch.object(type(backend), "rebuild")
+
+    backend.setup()
+
+    rebuild.assert_not_called()
@@ -0,0 +1,77 @@
+from django.contrib.contenttypes.models import ContentType
+
+from apps.common.utils import OnCommitBatch
+from apps.forum.models.qa_models import Question
+from apps.resources.models.resource_models import Resource
+from apps.search.models.search_models import SearchDocument
+
+INDEXED_MODELS = {"question": Question, "resource": Resource}
+
+
+def get_document_fields(instance) -> dict:
+    """
+    Returns the searchable fields of a question or a resource.
+
+    Args:
+        instance (Question | Resource): The object to index.
+
+    Returns:
+        dict: The `title`, `body` and `answers` of the search document.
+    """
+    if isinstance(instance, Question):
+        answers = instance.answers.visible_to(None).select_related("post").order_by("created_at")
+        return {
+            "title": instance.title,
+            "body": instance.post.body,
+            "answers": "\n".join(answer.post.body for answer in answers),
+        }
+    return {"title": instance.title, "body": instance.description, "answers": ""}
+
+
+def index_instance(instance) -> SearchDocument:
+    """
+    Creates or refreshes the search document of a question or a resource.
+    """
+    document, _ = SearchDocument.objects.update_or_create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        defaults=get_document_fields(instance),
+    )
+    document.tags.set(instance.tags.all())
+    return document
+
+
+def remove_instance(model, pk):
+    SearchDocument.objects.filter(content_type=ContentType.objects.get_for_model(model), object_id=pk).delete()
+
+
+def sync_documents(objects):
+    """
+    Brings the search documents of the given objects in line with the database.
+
+    Published objects are re-indexed and the documents of deleted or unpublished ones are removed, so entries
+    left behind by a rolled back transaction are harmless.
+
+    Args:
+        objects (Iterable): `(model, pk)` pairs.
+    """
+    for model, pk in objects:
+        if instance := model.objects.visible_to(None).filter(pk=pk).first():
+            index_instance(instance)
+        else:
+            remove_instance(model, pk)
+
+
+_index_batch = OnCommitBatch(sync_documents)
+
+
+def schedule_index(model, pk):
+    """
+    Re-indexes or removes the search document of a question or a resource once the current transaction
+    commits. Several changes to the same object in one transaction are applied once.
+
+    Args:
+        model (type): `Question` or `Resource`.
+        pk (UUID): The ID of the object.
+    """
+    _index_batch.add((model, pk))
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from apps.common.pagination import DynamicPageSizePagination
+from apps.forum.models.qa_models import Question
+from apps.search.backends import get_search_backend
+from apps.search.serializers.search_serializers import SearchHitSerializer, SearchQuerySerializer
+from apps.search.utils import INDEXED_MODELS
+
+
+class SearchView(APIView):
+    """
+    API view for ranked full-text search over questions, their answers, and resources.
+
+    Titles weigh more than bodies, which weigh more than answers. Quoted words are matched as a phrase.
+    Only the best `SEARCH_MAX_RESULTS` hits (500 by default) are ranked and paginated, so `count` never
+    exceeds it, and a less specific query may leave out matching content.
+
+    Usage:
+        GET /search/?q=django "query set"
+        GET /search/?q=pagination&type=question&tags=python,django
+
+    Returns:
+        A paginated list of hits with highlighted snippets.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    pagination_class = DynamicPageSizePagination
+
+    @extend_schema(parameters=[SearchQuerySerializer], responses=SearchHitSerializer(many=True))
+    def get(self, request):
+        query_serializer = SearchQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+
+        content_types = None
+        if params.get("type"):
+            content_types = [ContentType.objects.get_for_model(INDEXED_MODELS[params["type"]])]
+
+        hits = get_search_backend().search(
+            params["q"], content_types=content_types, tags=params.get("tags"), limit=settings.SEARCH_MAX_RESULTS
+        )
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(hits, request, view=self)
+        serializer = SearchHitSerializer(self.get_results(page), many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    def get_results(self, hits):
+        """
+        Adds the type and, for questions, the slug to each hit.
+        """
+        question_ids = [
+            hit.object_id for hit in hits if ContentType.objects.get_for_id(hit.content_type_id).model == "question"
+        ]
+        slugs = dict(Question.objects.filter(pk__in=question_ids).values_list("pk", "slug"))
+        return [
+            {
+                "object_id": hit.object_id,
+                "type": ContentType.objects.get_for_id(hit.content_type_id).model,
+                "slug": slugs.get(hit.object_id, ""),
+                "title": hit.title,
+                "snippet": hit.snippet,
+                "rank": hit.rank,
+            }
+            for hit in hits
+        ]
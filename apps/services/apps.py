@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ServicesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.services"
+
+    def ready(self):
+        import apps.services.signals  # noqa
+
+        if settings.USE_AI_MODELS and settings.AI_MODELS_WARM_UP:
+            from apps.common.utils import run_in_background
+            from apps.services.registry import model_registry
+
+            run_in_background(model_registry.warm_up)
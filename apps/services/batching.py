@@ -0,0 +1,71 @@
+from concurrent.futures import Future
+from queue import Empty, SimpleQueue
+from threading import Lock, Thread
+from time import monotonic
+
+
+class MicroBatcher:
+    """
+    Merges the inputs of concurrent callers into batches that are processed with a single call each.
+
+    A worker thread takes the first waiting request and keeps adding the requests that arrive within
+    `max_latency` seconds, until the batch holds `max_batch_size` inputs. Callers block until the outputs
+    of their own inputs are ready, so no request waits longer than `max_latency` for others to join.
+
+    Attributes:
+        func (callable): Processes a list of inputs and returns a list of outputs in the same order.
+        max_batch_size (int): The number of inputs after which a batch is processed without waiting.
+        max_latency (float): The seconds a batch waits for more requests.
+    """
+
+    def __init__(self, func, max_batch_size: int, max_latency: float):
+        self.func = func
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._queue = SimpleQueue()
+        self._lock = Lock()
+        self._worker = None
+
+    def submit(self, inputs: list) -> list:
+        """
+        Processes inputs together with those of concurrent callers and returns their outputs.
+        """
+        if not inputs:
+            return []
+
+        future = Future()
+        self._queue.put((inputs, future))
+        self._ensure_worker()
+        return future.result()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            deadline = monotonic() + self.max_latency
+            while size < self.max_batch_size and (remaining := deadline - monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except Empty:
+                    break
+                size += len(batch[-1][0])
+            self._process(batch)
+
+    def _process(self, batch):
+        try:
+            outputs = self.func([item for inputs, _ in batch for item in inputs])
+        except Exception as error:
+            for _, future in batch:
+                future.set_exception(error)
+            return
+
+        start = 0
+        for inputs, future in batch:
+            future.set_result(outputs[start : start + len(inputs)])
+            start += len(inputs)
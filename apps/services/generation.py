@@ -0,0 +1,143 @@
+"""
+Streaming text generation.
+
+The generation model stays resident in the `model_registry`, so a request only waits for its own tokens.
+Each request generates on a thread of its own and reads the tokens as they are produced. At most
+`GENERATION_MAX_CONCURRENCY` requests generate at once, and a request whose client stops reading is
+stopped at its next token.
+"""
+
+import logging
+from functools import lru_cache
+from threading import BoundedSemaphore, Event, Thread
+from time import perf_counter
+
+from django.conf import settings
+from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+from apps.services.registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationUnavailableError(Exception):
+    """
+    Raised when every generation slot stays busy for `GENERATION_QUEUE_TIMEOUT` seconds.
+    """
+
+
+class StopOnEvent(StoppingCriteria):
+    """
+    Stops a generation once an event is set, e.g. when its client disconnected.
+    """
+
+    def __init__(self, event: Event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.event.is_set()
+
+
+class GenerationStream:
+    """
+    The tokens of one generation, as text pieces in the order they are produced.
+
+    Iterate over it to receive the pieces. Closing it, or stopping to iterate, cancels the generation.
+
+    Attributes:
+        streamer (TextIteratorStreamer): Hands the decoded tokens from the generating thread over.
+        cancelled (Event): Set to stop the generation.
+        error (Exception | None): The error the generation failed with.
+        text (str): The text received so far.
+        time_to_first_token (float | None): The seconds between the start of the generation and its first
+            piece of text.
+    """
+
+    def __init__(self, streamer: TextIteratorStreamer):
+        self.streamer = streamer
+        self.cancelled = Event()
+        self.error = None
+        self.text = ""
+        self.time_to_first_token = None
+        self._started = perf_counter()
+
+    def __iter__(self):
+        try:
+            for piece in self.streamer:
+                if not piece:
+                    continue
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = perf_counter() - self._started
+                self.text += piece
+                yield piece
+        finally:
+            self.close()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.cancelled.set()
+
+
+class GenerationEngine:
+    """
+    Generates text with a model of the `model_registry`, streaming the new tokens.
+
+    Attributes:
+        name (str): The name of the model in the registry.
+        max_concurrency (int): The number of generations run at once.
+    """
+
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self._slots = BoundedSemaphore(max_concurrency)
+
+    def stream(self, prompt: str, max_new_tokens: int) -> GenerationStream:
+        """
+        Starts generating up to `max_new_tokens` tokens after a prompt.
+
+        Raises:
+            GenerationUnavailableError: If no generation slot frees up within `GENERATION_QUEUE_TIMEOUT`.
+        """
+        generator = model_registry.get(self.name)
+        if not self._slots.acquire(timeout=settings.GENERATION_QUEUE_TIMEOUT):
+            raise GenerationUnavailableError
+
+        try:
+            tokenizer = generator.tokenizer
+            inputs = tokenizer(prompt, return_tensors="pt").to(generator.model.device)
+            streamer = TextIteratorStreamer(
+                tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=settings.GENERATION_TOKEN_TIMEOUT
+            )
+            stream = GenerationStream(streamer)
+            Thread(
+                target=self._generate,
+                args=(generator, inputs, max_new_tokens, stream),
+                name="text-generation",
+                daemon=True,
+            ).start()
+        except Exception:
+            self._slots.release()
+            raise
+        return stream
+
+    def _generate(self, generator, inputs, max_new_tokens, stream):
+        try:
+            generator.model.generate(
+                **inputs,
+                streamer=stream.streamer,
+                max_new_tokens=max_new_tokens,
+                pad_token_id=generator.tokenizer.pad_token_id or 0,
+                stopping_criteria=StoppingCriteriaList([StopOnEvent(stream.cancelled)]),
+            )
+        except Exception as error:
+            logger.exception("Text generation failed")
+            stream.error = error
+            stream.streamer.end()
+        finally:
+            self._slots.release()
+
+
+@lru_cache(maxsize=None)
+def get_generation_engine() -> GenerationEngine:
+    return GenerationEngine("generation", settings.GENERATION_MAX_CONCURRENCY)
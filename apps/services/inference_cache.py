@@ -0,0 +1,106 @@
+"""
+The cache of model outputs.
+
+Outputs are cached by model and by a hash of the normalized input, so a text that was already seen, e.g. a
+duplicate comment or a body saved again with new tags, is not run through a model twice. Each process keeps
+the most recent outputs in memory, in front of the configured cache backend that all workers share.
+"""
+
+import unicodedata
+from collections import OrderedDict, defaultdict
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+
+INFERENCE_CACHE_KEY = "inference:{digest}"
+
+
+def normalize_input(text: str) -> str:
+    """
+    Returns the form of a text that is hashed: Unicode NFC with runs of whitespace collapsed.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def get_inference_key(model: str, text: str) -> str:
+    digest = sha256(f"{model}\0{normalize_input(text)}".encode()).hexdigest()
+    return INFERENCE_CACHE_KEY.format(digest=digest)
+
+
+class InferenceCache:
+    """
+    A two-level cache of model outputs: a least recently used cache of `AI_INFERENCE_CACHE_SIZE` entries per
+    process, backed by the shared cache. Entries of both expire after `AI_INFERENCE_CACHE_TIMEOUT` seconds.
+    Hits and misses are counted per model.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._local = OrderedDict()
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    def get_many(self, model: str, texts) -> dict:
+        """
+        Returns the cached outputs of a model for texts.
+
+        Returns:
+            dict: A mapping of text to output, for the texts that were cached. Texts that normalize to the same
+                key all get its output.
+        """
+        keys = defaultdict(list)
+        for text in texts:
+            keys[get_inference_key(model, text)].append(text)
+        found = {}
+        now = monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._local.get(key)
+                if entry is not None and entry[1] > now:
+                    self._local.move_to_end(key)
+                    found[key] = entry[0]
+
+        if missing := [key for key in keys if key not in found]:
+            shared = cache.get_many(missing)
+            self._store_local(shared)
+            found.update(shared)
+
+        with self._lock:
+            self._stats[model]["hits"] += len(found)
+            self._stats[model]["misses"] += len(keys) - len(found)
+        return {text: output for key, output in found.items() for text in keys[key]}
+
+    def set_many(self, model: str, outputs: dict):
+        """
+        Caches the outputs of a model, given as a mapping of text to output.
+        """
+        entries = {get_inference_key(model, text): output for text, output in outputs.items()}
+        if entries:
+            cache.set_many(entries, settings.AI_INFERENCE_CACHE_TIMEOUT)
+            self._store_local(entries)
+
+    def _store_local(self, entries: dict):
+        if not settings.AI_INFERENCE_CACHE_SIZE:
+            return
+
+        expires_at = monotonic() + settings.AI_INFERENCE_CACHE_TIMEOUT
+        with self._lock:
+            for key, output in entries.items():
+                self._local[key] = (output, expires_at)
+                self._local.move_to_end(key)
+            while len(self._local) > settings.AI_INFERENCE_CACHE_SIZE:
+                self._local.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {model: dict(counts) for model, counts in self._stats.items()}
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+            self._stats.clear()
+
+
+inference_cache = InferenceCache()
@@ -0,0 +1,158 @@
+"""
+Asynchronous moderation of user content.
+
+With `MODERATION_MODE` set to `async`, posts, comments and resources are saved as pending without waiting
+for the toxicity classifier, and are hidden from everyone but their author. Once the transaction commits,
+a background worker classifies the texts of the pending objects in batches, with one inference call per
+batch, and publishes or flags them. `content_published` is then sent for the published objects, so the
+notifications and search documents skipped while they were pending catch up, and `content_moderated` for
+all of them, so counts of published content are recomputed.
+"""
+
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q
+from django.dispatch import Signal
+
+from apps.common.models import ModeratedModel
+from apps.common.pagination import invalidate_counts
+from apps.common.utils import OnCommitBatch, run_in_background
+from apps.content_actions.models.comment_models import Comment
+from apps.forum.models.qa_models import Post
+from apps.resources.models.resource_models import Resource
+from apps.services.utils import check_toxicity_many
+
+MODERATION_ASYNC = "async"
+MODERATED_MODELS = (Post, Comment, Resource)
+Status = ModeratedModel.ModerationStatus
+
+# Sent with `instances`, the published objects of the sender model, and `created`, whether they are new
+# rather than edited.
+content_published = Signal()
+# Sent with `instances`, the objects of the sender model that were published or flagged.
+content_moderated = Signal()
+
+
+def is_async_moderation() -> bool:
+    return settings.MODERATION_MODE == MODERATION_ASYNC
+
+
+def get_moderation_texts(instance) -> list:
+    """
+    Returns the texts of a post, a comment or a resource that are checked for toxic content. The title of a
+    question is checked with its post.
+    """
+    if isinstance(instance, Post):
+        question = getattr(instance, "question", None)
+        return [question.title, instance.body] if question else [instance.body]
+    if isinstance(instance, Comment):
+        return [instance.text]
+    return [instance.title, instance.description]
+
+
+def get_unchanged_filter(instances) -> Q:
+    """
+    Matches the objects that were not saved again since they were loaded.
+    """
+    return reduce(or_, (Q(pk=instance.pk, updated_at=instance.updated_at) for instance in instances))
+
+
+def moderate_batch(model, created: dict) -> int:
+    """
+    Classifies the pending objects of a model with a single inference call, then publishes or flags them.
+
+    Objects edited while they were classified keep their pending status, for the run scheduled by the edit.
+
+    Args:
+        model (type): `Post`, `Comment` or `Resource`.
+        created (dict): A mapping of the IDs of the objects to whether they are new.
+
+    Returns:
+        int: The number of objects published or flagged.
+    """
+    queryset = model.objects.filter(pk__in=created, moderation_status=Status.PENDING)
+    if model is Post:
+        queryset = queryset.select_related("question")
+    instances = list(queryset)
+    if not instances:
+        return 0
+
+    texts = [[text for text in get_moderation_texts(instance) if text] for instance in instances]
+    results = iter(check_toxicity_many([text for instance_texts in texts for text in instance_texts]))
+    decisions = defaultdict(list)
+    for instance, instance_texts in zip(instances, texts):
+        toxic = any([next(results) for _ in instance_texts])
+        decisions[Status.FLAGGED if toxic else Status.PUBLISHED].append(instance)
+
+    count = 0
+    for status, decided in decisions.items():
+        count += model.objects.filter(get_unchanged_filter(decided), moderation_status=Status.PENDING).update(
+            moderation_status=status
+        )
+    invalidate_counts(model)
+    content_moderated.send(sender=model, instances=instances)
+
+    if published := decisions[Status.PUBLISHED]:
+        published_ids = set(
+            model.objects.filter(get_unchanged_filter(published), moderation_status=Status.PUBLISHED).values_list(
+                "pk", flat=True
+            )
+        )
+        for is_new in (True, False):
+            sent = [
+                instance for instance in published if instance.pk in published_ids and created[instance.pk] is is_new
+            ]
+            for instance in sent:
+                instance.moderation_status = Status.PUBLISHED
+            if sent:
+                content_published.send(sender=model, instances=sent, created=is_new)
+    return count
+
+
+def moderate_content(objects):
+    """
+    Moderates objects that were saved as pending, in batches of `MODERATION_BATCH_SIZE`.
+
+    Args:
+        objects (Iterable): `(model, pk, created)` triples.
+    """
+    created_by_model = defaultdict(dict)
+    for model, pk, created in objects:
+        created_by_model[model][pk] = created_by_model[model].get(pk, False) or created
+
+    for model, created in created_by_model.items():
+        pks = list(created)
+        for start in range(0, len(pks), settings.MODERATION_BATCH_SIZE):
+            moderate_batch(model, {pk: created[pk] for pk in pks[start : start + settings.MODERATION_BATCH_SIZE]})
+
+
+def moderate_pending() -> int:
+    """
+    Moderates every pending object, oldest first, e.g. those left behind by a process that stopped before
+    its background worker ran. Their notifications are not sent, as they may be edits.
+
+    Returns:
+        int: The number of objects published or flagged.
+    """
+    count = 0
+    for model in MODERATED_MODELS:
+        pending = model.objects.filter(moderation_status=Status.PENDING).order_by("created_at")
+        while pks := list(pending.values_list("pk", flat=True)[: settings.MODERATION_BATCH_SIZE]):
+            moderated = moderate_batch(model, dict.fromkeys(pks, False))
+            if not moderated:
+                break
+            count += moderated
+    return count
+
+
+_moderation_batch = OnCommitBatch(lambda objects: run_in_background(moderate_content, objects))
+
+
+def schedule_moderation(instance, created: bool):
+    """
+    Moderates a pending post, comment or resource in the background once the current transaction commits.
+    """
+    _moderation_batch.add((type(instance), instance.pk, created))
@@ -0,0 +1,129 @@
+"""
+The machine learning models of the process.
+
+Loading a model takes seconds, so each model is loaded once per process, on first use or when the app is
+warmed up, and then shared by every request and thread. The device, dtype and number of CPU threads the
+models run with come from the `AI_MODEL_*` settings.
+"""
+
+import logging
+from dataclasses import dataclass
+from threading import Lock
+from time import perf_counter
+
+import torch
+from django.conf import settings
+from transformers import pipeline
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """
+    How to load a model.
+
+    Attributes:
+        task (str): The task of the `transformers` pipeline, e.g. `text-classification`.
+        setting (str): The name of the setting holding the model name or path.
+    """
+
+    task: str
+    setting: str
+
+    @property
+    def model(self) -> str:
+        return getattr(settings, self.setting)
+
+
+MODEL_SPECS = {
+    "toxicity": ModelSpec(task="text-classification", setting="TOXICITY_MODEL"),
+    "generation": ModelSpec(task="text-generation", setting="GENERATION_MODEL"),
+}
+
+
+class ModelRegistry:
+    """
+    Loads each model of `MODEL_SPECS` once per process and hands out the shared pipeline.
+
+    Concurrent first uses of a model wait for a single load instead of each loading it. A model that failed
+    to load is retried on its next use.
+    """
+
+    NOT_LOADED = "not_loaded"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self, specs: dict):
+        self.specs = specs
+        self._models = {}
+        self._locks = {name: Lock() for name in specs}
+        self._status = {name: {"state": self.NOT_LOADED} for name in specs}
+        self._threads_configured = False
+
+    def get(self, name: str):
+        """
+        Returns the pipeline of a model, loading it first if this process has not yet.
+
+        Raises:
+            KeyError: If there is no model with this name.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._locks[name]:
+            if name not in self._models:
+                self._models[name] = self._load(name)
+            return self._models[name]
+
+    def _load(self, name: str):
+        spec = self.specs[name]
+        self._configure_threads()
+        self._status[name] = {"state": self.LOADING, "model": spec.model}
+        started = perf_counter()
+        try:
+            model = pipeline(
+                spec.task,
+                model=spec.model,
+                device=settings.AI_MODEL_DEVICE,
+                torch_dtype=getattr(torch, settings.AI_MODEL_DTYPE),
+            )
+        except Exception as error:
+            self._status[name] = {"state": self.FAILED, "model": spec.model, "error": str(error)}
+            raise
+
+        load_seconds = round(perf_counter() - started, 3)
+        self._status[name] = {
+            "state": self.READY,
+            "model": spec.model,
+            "device": str(model.device),
+            "load_seconds": load_seconds,
+        }
+        logger.info("Loaded model %s (%s) in %.1fs", name, spec.model, load_seconds)
+        return model
+
+    def _configure_threads(self):
+        if settings.AI_MODEL_THREADS and not self._threads_configured:
+            torch.set_num_threads(settings.AI_MODEL_THREADS)
+            self._threads_configured = True
+
+    def warm_up(self):
+        """
+        Loads every model that is not loaded yet. Failures are logged, and retried on first use.
+        """
+        for name in self.specs:
+            try:
+                self.get(name)
+            except Exception:
+                logger.exception("Could not load model %s", name)
+
+    def status(self) -> dict:
+        """
+        Returns the state of each model, with its device and load time once it is ready.
+        """
+        return {name: dict(status) for name, status in self._status.items()}
+
+
+model_registry = ModelRegistry(MODEL_SPECS)
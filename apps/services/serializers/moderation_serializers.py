@@ -0,0 +1,56 @@
+from rest_framework import serializers
+from rest_framework.fields import empty
+
+from apps.common.models import ModeratedModel
+from apps.services.moderation import is_async_moderation
+from apps.services.utils import check_toxicity_many
+
+
+class ToxicityCheckMixin:
+    """
+    Checks text fields for toxic content once the rest of the data is valid, all with a single batched
+    inference call instead of one per field.
+
+    With asynchronous moderation the fields are not checked. When any of them is written, the moderated
+    object is saved as pending instead, and checked in the background once it is saved.
+
+    Attributes:
+        toxicity_fields (dict): A mapping of field path, e.g. `post.body` for a nested serializer's field, to
+            the error message raised when it is toxic.
+        moderated_path (str): The path of the data of the moderated object, e.g. `post` for a question, or an
+            empty string for the object of the serializer.
+    """
+
+    toxicity_fields = {}
+    moderated_path = ""
+
+    def run_validation(self, data=empty):
+        value = super().run_validation(data)
+
+        fields = {}
+        for path in self.toxicity_fields:
+            text = value
+            for name in path.split("."):
+                text = text.get(name) if isinstance(text, dict) else None
+            if text:
+                fields[path] = text
+
+        if is_async_moderation():
+            if fields:
+                node = value
+                for name in filter(None, self.moderated_path.split(".")):
+                    node = node.setdefault(name, {})
+                node["moderation_status"] = ModeratedModel.ModerationStatus.PENDING
+            return value
+
+        errors = {}
+        for path, toxic in zip(fields, check_toxicity_many(list(fields.values()))):
+            if toxic:
+                *parents, name = path.split(".")
+                node = errors
+                for parent in parents:
+                    node = node.setdefault(parent, {})
+                node[name] = [self.toxicity_fields[path]]
+        if errors:
+            raise serializers.ValidationError(errors)
+        return value
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.common.models import ModeratedModel
+from apps.content_actions.models.comment_models import Comment
+from apps.forum.models.qa_models import Post
+from apps.resources.models.resource_models import Resource
+from apps.services.moderation import schedule_moderation
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Resource)
+def moderate_saved_content(sender, instance, created, **kwargs):
+    """
+    Schedules the moderation of a post, a comment or a resource that was saved as pending.
+    """
+    if instance.moderation_status == ModeratedModel.ModerationStatus.PENDING:
+        schedule_moderation(instance, created)
@@ -0,0 +1,169 @@
+import asyncio
+from contextlib import aclosing
+from threading import Event
+from time import sleep
+
+import pytest
+import torch
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import status
+
+from apps.common.asgi import DisconnectMiddleware
+from apps.services.generation import GenerationEngine, GenerationStream
+from apps.services.inference_cache import inference_cache
+from apps.services.views.ai_views import AsyncEventStream
+
+pytestmark = pytest.mark.unit
+
+MAX_TOKENS = 1000
+
+
+class FakeTokenizer:
+    pad_token_id = 0
+
+    def __call__(self, text, return_tensors=None):
+        return FakeInputs(input_ids=torch.tensor([[0, 0]]))
+
+    def decode(self, token_ids, **kwargs):
+        return "".join(f"w{token_id} " for token_id in token_ids)
+
+
+class FakeInputs(dict):
+    def to(self, device):
+        return self
+
+
+class FakeModel:
+    device = "cpu"
+
+    def __init__(self):
+        self.generated = 0
+        self.finished = Event()
+
+    def generate(self, input_ids, streamer, max_new_tokens, stopping_criteria, **kwargs):
+        streamer.put(input_ids)
+        for token_id in range(max_new_tokens):
+            if stopping_criteria(input_ids, None):
+                break
+            streamer.put(torch.tensor([token_id]))
+            self.generated += 1
+            sleep(0.001)
+        streamer.end()
+        self.finished.set()
+
+
+@pytest.fixture
+def generator(mocker):
+    generator = mocker.Mock(tokenizer=FakeTokenizer(), model=FakeModel())
+    mocker.patch("apps.services.generation.model_registry.get", return_value=generator)
+    return generator
+
+
+class TestGenerationEngine:
+    def test_tokens_are_streamed_within_the_budget(self, generator):
+        stream = GenerationEngine("generation", 1).stream("A prompt", 3)
+
+        assert list(stream) == ["w0 ", "w1 ", "w2 "]
+        assert stream.text == "w0 w1 w2 "
+        assert stream.time_to_first_token is not None
+
+    def test_closing_the_stream_cancels_the_generation(self, generator):
+        engine = GenerationEngine("generation", 1)
+        stream = engine.stream("A prompt", MAX_TOKENS)
+        pieces = iter(stream)
+        next(pieces)
+        pieces.close()
+
+        assert generator.model.finished.wait(timeout=5)
+        assert generator.model.generated < MAX_TOKENS
+        engine.stream("Another prompt", 1).close()
+
+
+@pytest.fixture
+def ai_models(settings):
+    settings.USE_AI_MODELS = True
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("ai_models", "generator")
+class TestGenerateTextView:
+    def test_tokens_are_sent_as_events(self, api_client, user, mocker):
+        mocker.patch("apps.services.views.ai_views.get_generation_engine", return_value=GenerationEngine("x", 1))
+        inference_cache.clear()
+        api_client.force_authenticate(user)
+
+        response = api_client.post(
+            reverse("services:generate_text"),
+            {"option": "improve", "text": "Some text", "max_tokens": 2},
+            format="json",
+            HTTP_ACCEPT="text/event-stream",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        events = b"".join(response.streaming_content).decode().split("\n\n")
+        assert events[0] == 'event: token\ndata: {"text": "w0 "}'
+        assert events[1] == 'event: token\ndata: {"text": "w1 "}'
+        assert events[2].startswith("event: done\n")
+
+    def test_closing_the_response_cancels_the_generation(self, api_client, user, generator, mocker):
+        mocker.patch("apps.services.views.ai_views.get_generation_engine", return_value=GenerationEngine("x", 1))
+        inference_cache.clear()
+        api_client.force_authenticate(user)
+
+        response = api_client.post(
+            reverse("services:generate_text"),
+            {"option": "improve", "text": "Some text", "max_tokens": settings.GENERATION_MAX_TOKENS_LIMIT},
+            format="json",
+            HTTP_ACCEPT="text/event-stream",
+        )
+        response.close()
+
+        assert generator.model.finished.wait(timeout=5)
+        assert generator.model.generated < settings.GENERATION_MAX_TOKENS_LIMIT
+
+
+def test_async_event_stream_produces_the_events_off_the_event_loop():
+    async def collect(events):
+        return [event async for event in events]
+
+    assert asyncio.run(collect(AsyncEventStream(iter(["first", "second"])))) == ["first", "second"]
+
+
+def test_async_event_stream_cancels_the_generation_when_closed_early():
+    stream = GenerationStream(streamer=None)
+
+    async def read_first(events):
+        async with aclosing(aiter(events)) as content:
+            return await anext(content)
+
+    assert asyncio.run(read_first(AsyncEventStream(iter(["first", "second"]), stream))) == "first"
+    assert stream.cancelled.is_set()
+
+
+def test_disconnect_middleware_cancels_the_request_of_a_disconnected_client():
+    closed = Event()
+    messages = [{"type": "http.request", "body": b"", "more_body": False}, {"type": "http.disconnect"}]
+    sent = []
+
+    async def app(scope, receive, send):
+        await receive()
+        try:
+            while True:
+                await send({"type": "http.response.body", "body": b"event", "more_body": True})
+                await asyncio.sleep(0)
+        finally:
+            closed.set()
+
+    async def receive():
+        if len(messages) == 1:
+            await asyncio.sleep(0.01)
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asyncio.wait_for(DisconnectMiddleware(app)({"type": "http"}, receive, send), timeout=5))
+
+    assert closed.is_set()
+    assert sent
@@ -0,0 +1,98 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.common.models import ModeratedModel
+from apps.factories import UserFactory
+from apps.forum.models.qa_models import Answer
+from apps.forum.tests.factories import QuestionFactory
+from apps.notifications.models.notification_models import Notification
+from apps.services.moderation import moderate_pending
+
+pytestmark = pytest.mark.django_db
+
+Status = ModeratedModel.ModerationStatus
+
+
+@pytest.fixture
+def async_moderation(settings):
+    settings.MODERATION_MODE = "async"
+
+
+def post_answer(client, user, question, body):
+    client.force_authenticate(user)
+    url = reverse("forum:answer-list", kwargs={"question_slug": question.slug})
+    response = client.post(url, {"post": {"body": body}}, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    return Answer.objects.get(pk=response.data["id"])
+
+
+def list_answers(client, user, question):
+    client.force_authenticate(user)
+    response = client.get(reverse("forum:answer-list", kwargs={"question_slug": question.slug}))
+    return [answer["id"] for answer in response.data["results"]]
+
+
+def accept_answer(client, question, answer):
+    client.force_authenticate(question.post.user)
+    url = reverse("forum:question-accept-answer", kwargs={"slug": question.slug})
+    return client.post(url, {"answer_id": str(answer.pk)}, format="json")
+
+
+@pytest.mark.usefixtures("async_moderation")
+class TestAsyncModeration:
+    def test_answers_are_hidden_until_published(self, api_client, user, mocker, django_capture_on_commit_callbacks):
+        check = mocker.patch("apps.services.moderation.check_toxicity_many", return_value=[False])
+        question = QuestionFactory.create()
+        with django_capture_on_commit_callbacks() as callbacks:
+            answer = post_answer(api_client, user, question, "A helpful answer")
+
+        check.assert_not_called()
+        assert answer.post.moderation_status == Status.PENDING
+        assert list_answers(api_client, question.post.user, question) == []
+        assert list_answers(api_client, user, question) == [str(answer.pk)]
+        assert accept_answer(api_client, question, answer).status_code == status.HTTP_404_NOT_FOUND
+        assert not Notification.objects.filter(user=question.post.user).exists()
+        question.refresh_from_db()
+        assert question.answer_count == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for callback in callbacks:
+                callback()
+
+        check.assert_called_once_with(["A helpful answer"])
+        assert list_answers(api_client, question.post.user, question) == [str(answer.pk)]
+        assert Notification.objects.filter(user=question.post.user, title="New Answer").exists()
+        question.refresh_from_db()
+        assert question.answer_count == 1
+        assert accept_answer(api_client, question, answer).status_code == status.HTTP_200_OK
+
+    def test_toxic_content_is_flagged(self, api_client, user, mocker):
+        mocker.patch("apps.services.moderation.check_toxicity_many", return_value=[True])
+        question = QuestionFactory.create()
+        answer = post_answer(api_client, user, question, "A toxic answer")
+
+        assert moderate_pending() == 1
+        answer.post.refresh_from_db()
+        assert answer.post.moderation_status == Status.FLAGGED
+        assert list_answers(api_client, UserFactory.create(), question) == []
+
+    def test_answer_count_follows_moderation(self, api_client, user, mocker):
+        check = mocker.patch("apps.services.moderation.check_toxicity_many", return_value=[False])
+        question = QuestionFactory.create()
+        answer = post_answer(api_client, user, question, "A helpful answer")
+        moderate_pending()
+        question.refresh_from_db()
+        assert question.answer_count == 1
+
+        check.return_value = [True]
+        url = reverse("forum:answer-detail", kwargs={"question_slug": question.slug, "pk": answer.pk})
+        response = api_client.patch(url, {"post": {"body": "A toxic answer"}}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        moderate_pending()
+        question.refresh_from_db()
+        assert question.answer_count == 0
+
+        assert api_client.delete(url).status_code == status.HTTP_204_NO_CONTENT
+        question.refresh_from_db()
+        assert question.answer_count == 0
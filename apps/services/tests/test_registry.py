@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from apps.services.registry import MODEL_SPECS, ModelRegistry
+
+pytestmark = pytest.mark.unit
+
+
+class TestModelRegistry:
+    def test_model_is_loaded_once_across_threads(self, mocker):
+        load = mocker.patch("apps.services.registry.pipeline")
+        registry = ModelRegistry(MODEL_SPECS)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            models = list(executor.map(lambda _: registry.get("toxicity"), range(8)))
+
+        load.assert_called_once()
+        assert all(model is load.return_value for model in models)
+        assert registry.status()["toxicity"]["state"] == ModelRegistry.READY
+
+    def test_failed_load_is_reported_and_retried(self, mocker):
+        mocker.patch("apps.services.registry.pipeline", side_effect=[OSError("missing"), mocker.Mock()])
+        registry = ModelRegistry({"toxicity": MODEL_SPECS["toxicity"]})
+
+        registry.warm_up()
+        assert registry.status()["toxicity"] == {
+            "state": ModelRegistry.FAILED,
+            "model": "unitary/toxic-bert",
+            "error": "missing",
+        }
+
+        assert registry.get("toxicity") is not None
+        assert registry.status()["toxicity"]["state"] == ModelRegistry.READY
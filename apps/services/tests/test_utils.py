@@ -0,0 +1,119 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+from rest_framework import serializers
+
+from apps.services import utils
+from apps.services.batching import MicroBatcher
+from apps.services.inference_cache import inference_cache
+from apps.services.serializers.moderation_serializers import ToxicityCheckMixin
+from apps.services.utils import split_into_windows
+
+pytestmark = pytest.mark.unit
+
+
+class TestMicroBatcher:
+    def test_concurrent_requests_share_a_batch(self):
+        calls = []
+        batcher = MicroBatcher(lambda inputs: calls.append(inputs) or [value * 2 for value in inputs], 4, 1)
+        barrier = Barrier(2)
+
+        def submit(inputs):
+            barrier.wait()
+            return batcher.submit(inputs)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(submit, [[1, 2], [3, 4]]))
+
+        assert results == [[2, 4], [6, 8]]
+        assert len(calls) == 1
+
+    def test_errors_reach_every_caller(self):
+        batcher = MicroBatcher(lambda inputs: 1 / 0, 4, 0)
+        with pytest.raises(ZeroDivisionError):
+            batcher.submit([1])
+
+
+def tokenize_words(text, **kwargs):
+    return {"offset_mapping": [match.span() for match in re.finditer(r"\S+", text)]}
+
+
+class TestSplitIntoWindows:
+    def test_windows_overlap_at_token_boundaries(self):
+        windows = split_into_windows("one two three four five six seven", tokenize_words, max_tokens=3, stride=1)
+        assert windows == ["one two three", "three four five", "five six seven"]
+
+    def test_short_and_empty_texts(self):
+        assert split_into_windows("one two", tokenize_words, max_tokens=3, stride=1) == ["one two"]
+        assert split_into_windows("   ", tokenize_words, max_tokens=3, stride=1) == []
+
+
+class NestedSerializer(serializers.Serializer):
+    body = serializers.CharField()
+
+
+class ModeratedSerializer(ToxicityCheckMixin, serializers.Serializer):
+    title = serializers.CharField()
+    post = NestedSerializer()
+    toxicity_fields = {"title": "Toxic title.", "post.body": "Toxic body."}
+
+
+class TestToxicityCheckMixin:
+    def test_fields_are_checked_in_one_call(self, mocker):
+        check = mocker.patch(
+            "apps.services.serializers.moderation_serializers.check_toxicity_many", return_value=[False, True]
+        )
+        serializer = ModeratedSerializer(data={"title": "A title", "post": {"body": "A body"}})
+
+        assert not serializer.is_valid()
+        check.assert_called_once_with(["A title", "A body"])
+        assert serializer.errors == {"post": {"body": ["Toxic body."]}}
+
+
+class TestInferenceCache:
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        inference_cache.clear()
+        yield
+        inference_cache.clear()
+
+    def test_outputs_are_shared_by_normalized_content(self):
+        inference_cache.set_many("model", {"Hello  world": 0.9})
+
+        assert inference_cache.get_many("model", ["Hello world\n", "Goodbye"]) == {"Hello world\n": 0.9}
+        assert inference_cache.get_many("other-model", ["Hello world"]) == {}
+        assert inference_cache.stats() == {"model": {"hits": 1, "misses": 1}, "other-model": {"hits": 0, "misses": 1}}
+
+    def test_texts_sharing_a_key_are_all_hits(self):
+        inference_cache.set_many("model", {"Hello world": 0.9})
+
+        assert inference_cache.get_many("model", ["Hello world", "Hello  world", "Hello world\n"]) == {
+            "Hello world": 0.9,
+            "Hello  world": 0.9,
+            "Hello world\n": 0.9,
+        }
+
+    def test_least_recently_used_entries_leave_the_process(self, settings, mocker):
+        settings.AI_INFERENCE_CACHE_SIZE = 2
+        inference_cache.set_many("model", {"one": 1, "two": 2})
+        inference_cache.get_many("model", ["one"])
+        inference_cache.set_many("model", {"three": 3})
+        shared = mocker.patch("apps.services.inference_cache.cache.get_many", return_value={})
+
+        assert inference_cache.get_many("model", ["one", "two", "three"]) == {"one": 1, "three": 3}
+        shared.assert_called_once_with([mocker.ANY])
+
+    def test_repeated_checks_skip_the_model(self, settings, mocker):
+        settings.USE_AI_MODELS = True
+        classifier = mocker.Mock(tokenizer=mocker.Mock(model_max_length=5, num_special_tokens_to_add=lambda: 2))
+        classifier.tokenizer.side_effect = tokenize_words
+        mocker.patch.object(utils.model_registry, "get", return_value=classifier)
+        batcher = mocker.Mock()
+        batcher.submit.side_effect = lambda windows: [float("bad" in window) for window in windows]
+        mocker.patch.object(utils, "get_toxicity_batcher", return_value=batcher)
+
+        assert utils.check_toxicity_many(["a fine text", "a bad text"]) == [False, True]
+        assert utils.check_toxicity_many(["a  fine text", "a bad text"]) == [False, True]
+        batcher.submit.assert_called_once_with(["a fine text", "a bad text"])
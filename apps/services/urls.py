@@ -1,9 +1,10 @@
 from django.urls import path
 
-from apps.services.views.ai_views import GenerateTextView
+from apps.services.views.ai_views import GenerateTextView, ModelStatusView
 
 app_name = "services"
 
 urlpatterns = [
     path("ai/generate_text/", GenerateTextView.as_view(), name="generate_text"),
+    path("ai/models/", ModelStatusView.as_view(), name="model_status"),
 ]
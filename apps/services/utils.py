@@ -1,5 +1,14 @@
+from functools import lru_cache
+
 from django.conf import settings
-from transformers import pipeline
+
+from apps.services.batching import MicroBatcher
+from apps.services.inference_cache import inference_cache
+from apps.services.registry import model_registry
+
+TOXIC_LABEL = "toxic"
+# Some tokenizers report no practical limit, BERT models take 512 tokens.
+MAX_WINDOW_TOKENS = 512
 
 
 def chunk_text(text, chunk_size=512):
@@ -16,26 +25,109 @@ def chunk_text(text, chunk_size=512):
     return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
 
 
-def check_toxicity(text, threshold=0.5):
+def split_into_windows(text, tokenizer, max_tokens, stride):
     """
-    Checks the toxicity of a given text by splitting it into chunks and analyzing each chunk.
+    Splits text into windows of at most `max_tokens` tokens of a tokenizer, cut at token boundaries.
+
+    Consecutive windows overlap by `stride` tokens, so toxic phrases across a cut are still seen whole.
 
     Parameters:
-    - text (str): The text to check for toxicity.
+    - text (str): The text to be split.
+    - tokenizer: The tokenizer of the model the windows are for.
+    - max_tokens (int): The most tokens in a window, without the special tokens the model adds.
+    - stride (int): The number of tokens shared by consecutive windows.
+
+    Returns:
+    - list: The windows of the text.
+    """
+    offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+    if not offsets:
+        return [text] if text.strip() else []
+
+    windows = []
+    step = max(max_tokens - stride, 1)
+    for start in range(0, len(offsets), step):
+        span = offsets[start : start + max_tokens]
+        windows.append(text[span[0][0] : span[-1][1]])
+        if start + max_tokens >= len(offsets):
+            break
+    return windows
+
+
+def score_toxicity(windows):
+    """
+    Returns the toxic score of each window, classifying all of them with one forward pass.
+    """
+    classifier = model_registry.get("toxicity")
+    results = classifier(windows, top_k=None, batch_size=len(windows), truncation=True)
+    return [next((result["score"] for result in scores if result["label"] == TOXIC_LABEL), 0.0) for scores in results]
+
+
+@lru_cache(maxsize=None)
+def get_toxicity_batcher() -> MicroBatcher:
+    return MicroBatcher(
+        score_toxicity, settings.TOXICITY_MAX_BATCH_SIZE, settings.TOXICITY_BATCH_MAX_LATENCY_MS / 1000
+    )
+
+
+def check_toxicity_many(texts, threshold=0.5):
+    """
+    Checks the toxicity of several texts at once, e.g. the title and body of a question.
+
+    The texts are split into token windows, and the windows of all texts go through the model together,
+    merged with those of concurrent requests into micro-batches. Windows are sent in batches of at most
+    `TOXICITY_MAX_BATCH_SIZE`, and the remaining windows of a text are skipped once one is toxic. The scores
+    of windows are cached by content, so only windows that were not seen before are classified.
+
+    Parameters:
+    - texts (list): The texts to check for toxicity.
     - threshold (float): The threshold score for considering a text as toxic. Default is 0.5.
 
     Returns:
-    - bool: True if any chunk of the text is toxic and its score is above the threshold, False otherwise.
+    - list: True for each text with a window whose toxic score is above the threshold, False otherwise.
     """
+    toxic = [False] * len(texts)
     if not settings.USE_AI_MODELS:
-        return False
+        return toxic
 
-    classifier = pipeline("text-classification", model="unitary/toxic-bert")
+    tokenizer = model_registry.get("toxicity").tokenizer
+    max_tokens = min(tokenizer.model_max_length, MAX_WINDOW_TOKENS) - tokenizer.num_special_tokens_to_add()
+    windows = [
+        (index, window)
+        for index, text in enumerate(texts)
+        for window in split_into_windows(text, tokenizer, max_tokens, settings.TOXICITY_WINDOW_STRIDE)
+    ]
 
-    chunks = chunk_text(text)
-    for chunk in chunks:
-        results = classifier(chunk)
-        for result in results:
-            if result["label"] == "toxic" and result["score"] >= threshold:
-                return True
-    return False
+    model = model_registry.specs["toxicity"].model
+    cached = inference_cache.get_many(model, {window for _, window in windows})
+    for index, window in windows:
+        if window in cached:
+            toxic[index] = toxic[index] or cached[window] >= threshold
+    windows = [(index, window) for index, window in windows if window not in cached]
+
+    batcher = get_toxicity_batcher()
+    for start in range(0, len(windows), settings.TOXICITY_MAX_BATCH_SIZE):
+        batch = windows[start : start + settings.TOXICITY_MAX_BATCH_SIZE]
+        pending = list(dict.fromkeys(window for index, window in batch if not toxic[index]))
+        scores = dict(zip(pending, batcher.submit(pending)))
+        inference_cache.set_many(model, scores)
+        for index, window in batch:
+            if window in scores:
+                toxic[index] = toxic[index] or scores[window] >= threshold
+        if all(toxic):
+            break
+    return toxic
+
+
+def check_toxicity(text, threshold=0.5):
+    """
+    Checks the toxicity of a given text, see `check_toxicity_many`.
+
+    Parameters:
+    - text (str): The text to check for toxicity.
+    - threshold (float): The threshold score for considering a text as toxic. Default is 0.5.
+
+    Returns:
+    - bool: True if any window of the text is toxic and its score is above the threshold, False otherwise.
+    """
+    return check_toxicity_many([text], threshold)[0]
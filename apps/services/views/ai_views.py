@@ -1,60 +1,211 @@
-import torch
+import logging
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import StreamingHttpResponse
 from rest_framework import status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
-from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
+
+from apps.notifications.streams import EventStreamRenderer, format_event
+from apps.services.generation import GenerationUnavailableError, get_generation_engine
+from apps.services.inference_cache import inference_cache
+from apps.services.registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TEMPLATES = {
+    "improve": "Improve this text: {}",
+    "fix": "Fix the grammar of this text: {}",
+    "shorter": "Make this text shorter: {}",
+    "longer": "Make this text longer: {}",
+    "continue": "Continue writing from this text: {}",
+}
+GENERATION_PROMPT = (
+    "You are an AI assistant that helps in writing text. Your responses shouldn't be greater than 500 "
+    "characters. {}"
+)
+UNAVAILABLE_TEXT = "AI response coming soon once we upgrade to better hardware."
+ERROR_MESSAGE = "Something went wrong. Please try again."
+
+
+class EventStream:
+    """
+    The events of a streamed response, served to a WSGI server.
+
+    The server closes it once the response ends or the client is gone, which cancels `stream` too, even when
+    no event was produced yet.
+    """
+
+    def __init__(self, events, stream=None):
+        self.events = events
+        self.stream = stream
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+        if close := getattr(self.events, "close", None):
+            close()
+
+
+class AsyncEventStream(EventStream):
+    """
+    The events of a streamed response, served to an ASGI server, which would buffer a synchronous iterator
+    whole. Each event is produced on a worker thread of its own.
+
+    Django 4.2 only closes a response that ended, so `stream` is cancelled once the events stop being read,
+    e.g. when `DisconnectMiddleware` cancels the request of a client that is gone.
+    """
+
+    __iter__ = None
+
+    async def __aiter__(self):
+        events = iter(self.events)
+        try:
+            while (event := await sync_to_async(next, thread_sensitive=False)(events, None)) is not None:
+                yield event
+        finally:
+            if self.stream is not None:
+                self.stream.close()
 
 
 class GenerateTextView(APIView):
+    """
+    Generates text for an editing option, e.g. `improve` or `shorter`, with the resident generation model.
+
+    Clients that accept `text/event-stream` receive a `token` event as each piece of text is generated, then
+    a `done` event with the whole text and the time to the first token. Other clients receive the whole text
+    at once. `max_tokens` sets the number of new tokens, up to `GENERATION_MAX_TOKENS_LIMIT`. A client that
+    disconnects stops its generation.
+    """
+
+    renderer_classes = (*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer)
+
     def post(self, request):
+        if not settings.USE_AI_MODELS:
+            return self.get_text_response(request, UNAVAILABLE_TEXT)
+
+        option = request.data.get("option")
+        input_text = request.data.get("text")
+        prompt_template = PROMPT_TEMPLATES.get(option)
         try:
-            if not settings.USE_AI_MODELS:
-                return Response(
-                    {"generated_text": "AI response coming soon once we upgrade to better hardware."},
-                    status=status.HTTP_200_OK,
-                )
+            max_tokens = int(request.data.get("max_tokens") or settings.GENERATION_DEFAULT_MAX_TOKENS)
+        except (TypeError, ValueError):
+            max_tokens = 0
 
-            option = request.data.get("option")
-            input_text = request.data.get("text")
+        error = None
+        if not option:
+            error = "No option provided"
+        elif not input_text:
+            error = "No text provided"
+        elif not prompt_template:
+            error = "Invalid option provided"
+        elif not 0 < max_tokens <= settings.GENERATION_MAX_TOKENS_LIMIT:
+            error = f"max_tokens must be between 1 and {settings.GENERATION_MAX_TOKENS_LIMIT}"
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
 
-            if not option:
-                return Response({"error": "No option provided"}, status=status.HTTP_400_BAD_REQUEST)
+        prompt = GENERATION_PROMPT.format(prompt_template.format(input_text))
+        cache_input = f"{max_tokens}\0{prompt}"
+        cached = inference_cache.get_many(settings.GENERATION_MODEL, [cache_input]).get(cache_input)
+        if cached is not None:
+            return self.get_text_response(request, cached)
+        return self.generate(request, prompt, max_tokens, cache_input)
 
-            if not input_text:
-                return Response({"error": "No text provided"}, status=status.HTTP_400_BAD_REQUEST)
+    def generate(self, request, prompt: str, max_tokens: int, cache_input: str):
+        """
+        Generates text after a prompt, streamed as events or returned whole, and caches it under `cache_input`.
+        """
+        try:
+            stream = get_generation_engine().stream(prompt, max_tokens)
+        except GenerationUnavailableError:
+            return Response(
+                {"error": "Too many texts are being generated. Please try again."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        except Exception:
+            logger.exception("Could not start text generation")
+            return Response({"error": ERROR_MESSAGE}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            prompt_templates = {
-                "improve": "Improve this text: {}",
-                "fix": "Fix the grammar of this text: {}",
-                "shorter": "Make this text shorter: {}",
-                "longer": "Make this text longer: {}",
-                "continue": "Continue writing from this text: {}",
-            }
+        if self.is_streaming(request):
+            return self.get_event_stream(request, self.stream_events(stream, prompt, cache_input), stream)
 
-            prompt_template = prompt_templates.get(option)
+        try:
+            for _ in stream:
+                pass
+        except Exception:
+            logger.exception("Text generation failed")
+            return Response({"error": ERROR_MESSAGE}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            if not prompt_template:
-                return Response({"error": "Invalid option provided"}, status=status.HTTP_400_BAD_REQUEST)
+        generated_text = prompt + stream.text
+        inference_cache.set_many(settings.GENERATION_MODEL, {cache_input: generated_text})
+        return Response({"generated_text": generated_text}, status=status.HTTP_200_OK)
 
-            prompt = prompt_template.format(input_text)
+    def is_streaming(self, request) -> bool:
+        return isinstance(request.accepted_renderer, EventStreamRenderer)
 
-            messages = f"You are an AI assistant that helps in writing text. Your responses shouldn't be greater than 500 characters. {prompt}"  # noqa E501
+    def get_event_stream(self, request, events, stream=None) -> StreamingHttpResponse:
+        """
+        Returns a response that sends events as they are produced. Closing it cancels `stream`.
+        """
+        event_stream = EventStream if isinstance(request._request, WSGIRequest) else AsyncEventStream
+        response = StreamingHttpResponse(event_stream(events, stream), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
 
-            model = AutoModelForCausalLM.from_pretrained(
-                "state-spaces/mamba-130m-hf", torch_dtype=torch.bfloat16, device_map="auto", pad_token_id=0
-            )
-            tokenizer = AutoTokenizer.from_pretrained("state-spaces/mamba-130m-hf")
-            chatbot = pipeline("text-generation", model=model, tokenizer=tokenizer)
+    def get_text_response(self, request, generated_text: str):
+        if self.is_streaming(request):
+            return self.get_event_stream(request, [format_event("done", {"generated_text": generated_text})])
+        return Response({"generated_text": generated_text}, status=status.HTTP_200_OK)
 
-            response = chatbot(messages, max_new_tokens=60)
+    def stream_events(self, stream, prompt: str, cache_input: str):
+        """
+        Yields a `token` event per piece of generated text, then a `done` event. The generation is cancelled
+        when the response is closed, as the server does when the client disconnects.
+        """
+        try:
+            for piece in stream:
+                yield format_event("token", {"text": piece})
+        except Exception:
+            logger.exception("Text generation failed")
+            yield format_event("error", {"error": ERROR_MESSAGE})
+            return
+        finally:
+            stream.close()
 
-            generated_text = response[0]["generated_text"]
+        generated_text = prompt + stream.text
+        inference_cache.set_many(settings.GENERATION_MODEL, {cache_input: generated_text})
+        time_to_first_token = stream.time_to_first_token
+        yield format_event(
+            "done",
+            {
+                "generated_text": generated_text,
+                "time_to_first_token_ms": round(time_to_first_token * 1000) if time_to_first_token else None,
+            },
+        )
 
-            return Response({"generated_text": generated_text}, status=status.HTTP_200_OK)
 
-        except Exception as e:
-            print(e)
-            return Response(
-                {"error": "Something went wrong. Please try again."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+class ModelStatusView(APIView):
+    """
+    Reports whether each model is loaded in the process serving the request, with its device and load time,
+    and the hits and misses of the inference cache in that process.
+    """
+
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response(
+            {
+                "enabled": bool(settings.USE_AI_MODELS),
+                "models": model_registry.status(),
+                "inference_cache": inference_cache.stats(),
+            },
+            status=status.HTTP_200_OK,
+        )
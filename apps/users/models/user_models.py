@@ -1,11 +1,29 @@
-from datetime import date
+from collections import defaultdict
 from typing import Optional
 
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Min
+from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
-from apps.badges.models.badge_models import Badge, DailyUserReputation, UserBadge
+from apps.badges.models.badge_models import (
+    DailyUserReputation,
+    LeaderboardEntry,
+    ReputationEvent,
+    UserBadge,
+)
+from apps.badges.utils import get_badge_catalog, update_leaderboards
+from apps.common.utils import (
+    OnCommitBatch,
+    get_counters,
+    get_many_counters,
+    increment_counters,
+    reset_counters,
+    run_in_background,
+)
 
 
 def avatar_directory_path(instance, filename):
@@ -15,6 +33,7 @@ def avatar_directory_path(instance, filename):
 class User(AbstractUser):
     GENDER_CHOICES = (("M", "M"), ("F", "F"))
     REPUTATION_CAP = 200
+    COUNTER_FLOORS = {"reputation": 1}
 
     first_name = models.CharField(max_length=255)
     middle_name = models.CharField(max_length=255)
@@ -39,36 +58,151 @@ class User(AbstractUser):
     def get_fullname(self):
         return f"{self.first_name} {self.middle_name} {self.last_name}"
 
+    @classmethod
+    def change_reputation(
+        cls, user_id, points: int, reason=ReputationEvent.Reason.OTHER, source: Optional[models.Model] = None
+    ):
+        """
+        Records a reputation change in the ledger with a single insert.
+
+        The change is applied once the current transaction commits, in a background batch together with the
+        other changes recorded meanwhile. See `aggregate_reputation`.
+
+        Args:
+            user_id (int): The ID of the user.
+            points (int): The points to add, or subtract if negative.
+            reason (str): Why the reputation changes, one of `ReputationEvent.Reason`.
+            source (Model): The object that caused the change, if any.
+        """
+        if not points:
+            return
+        event = ReputationEvent(user_id=user_id, delta=points, reason=reason)
+        if source is not None:
+            event.content_type, event.object_id = ContentType.objects.get_for_model(source), str(source.pk)
+        event.save()
+        reputation_batch.add(user_id)
+
+    @classmethod
+    @transaction.atomic
+    def aggregate_reputation(cls, user_ids=None, limit: Optional[int] = None) -> int:
+        """
+        Applies a batch of pending ledger events, oldest first, to the reputation and daily rollups.
+
+        Within a day gains are capped at `REPUTATION_CAP` points, and losses never bring the day's gains below
+        zero, exactly as if the events were applied one by one; the day's rows are locked meanwhile. Losses
+        never bring a reputation below one, checked event by event too, and each user's reputation then
+        changes once by the net of their applied events. The
+        leaderboards of the users' faculties are updated in the same transaction. Events locked by a
+        concurrent batch are skipped.
+
+        Args:
+            user_ids (list): Only apply the events of these users. All users by default.
+            limit (int): The most events applied. `REPUTATION_BATCH_SIZE` by default.
+
+        Returns:
+            int: The number of events applied.
+        """
+        events = ReputationEvent.objects.select_for_update(skip_locked=True).filter(applied_delta__isnull=True)
+        if user_ids is not None:
+            events = events.filter(user_id__in=user_ids)
+        events = list(events.order_by("created_at", "pk")[: limit or settings.REPUTATION_BATCH_SIZE])
+        if not events:
+            return 0
+
+        days = {(event.user_id, timezone.localdate(event.created_at)) for event in events}
+        DailyUserReputation.objects.bulk_create(
+            [DailyUserReputation(user_id=user_id, date=day) for user_id, day in days], ignore_conflicts=True
+        )
+        daily_reputations = DailyUserReputation.objects.select_for_update().filter(
+            user_id__in={user_id for user_id, _ in days}, date__in={day for _, day in days}
+        )
+        daily_reputations = {
+            (daily.user_id, daily.date): daily
+            for daily in daily_reputations.order_by("pk")
+            if (daily.user_id, daily.date) in days
+        }
+        previous = {key: daily.reputation for key, daily in daily_reputations.items()}
+        floor = cls.COUNTER_FLOORS["reputation"]
+        balances = {
+            user_id: values["reputation"]
+            for user_id, values in get_many_counters(cls, {user_id for user_id, _ in days}, "reputation").items()
+        }
+
+        totals = defaultdict(int)
+        for event in events:
+            daily = daily_reputations[event.user_id, timezone.localdate(event.created_at)]
+            if event.reason == ReputationEvent.Reason.OPENING_BALANCE:
+                event.applied_delta = event.delta
+            elif event.delta > 0:
+                event.applied_delta = max(min(event.delta, cls.REPUTATION_CAP - daily.reputation), 0)
+                daily.reputation += event.applied_delta
+            else:
+                event.applied_delta = max(event.delta, min(floor - balances[event.user_id], 0))
+                daily.reputation = max(daily.reputation + event.applied_delta, 0)
+            balances[event.user_id] += event.applied_delta
+            totals[event.user_id] += event.applied_delta
+
+        ReputationEvent.objects.bulk_update(events, ["applied_delta"])
+        DailyUserReputation.objects.bulk_update(daily_reputations.values(), ["reputation"])
+        for user_id, total in sorted(totals.items()):
+            increment_counters(cls, user_id, {"reputation": total})
+
+        reputations = get_many_counters(cls, totals.keys(), "reputation")
+        update_leaderboards(
+            {key: (previous[key], daily.reputation) for key, daily in daily_reputations.items()},
+            {user_id: values["reputation"] for user_id, values in reputations.items()},
+        )
+        return len(events)
+
+    @classmethod
+    @transaction.atomic
+    def replay_reputation(cls, user_ids) -> int:
+        """
+        Rebuilds the reputation and daily rollups of users from scratch by applying their whole ledger again.
+
+        The daily rollups dated before a user's first event predate the ledger, so they are kept, and the
+        leaderboards of the current week start from them.
+
+        Args:
+            user_ids (list): The IDs of the users.
+
+        Returns:
+            int: The number of events replayed.
+        """
+        user_ids = list(cls.objects.select_for_update().filter(pk__in=user_ids).values_list("pk", flat=True))
+        reset_counters(cls, user_ids, reputation=cls._meta.get_field("reputation").default)
+        events = ReputationEvent.objects.filter(user_id__in=user_ids).order_by()
+        for user_id, first in events.values_list("user_id").annotate(Min("created_at")):
+            DailyUserReputation.objects.filter(user_id=user_id, date__gte=timezone.localdate(first)).delete()
+        LeaderboardEntry.objects.filter(user_id__in=user_ids).delete()
+        week = LeaderboardEntry.get_period(LeaderboardEntry.Timeframe.WEEKLY, timezone.localdate())
+        kept = DailyUserReputation.objects.filter(user_id__in=user_ids, date__gte=week)
+        update_leaderboards({(daily.user_id, daily.date): (0, daily.reputation) for daily in kept}, {})
+        events.update(applied_delta=None)
+
+        count = 0
+        while applied := cls.aggregate_reputation(user_ids):
+            count += applied
+        return count
+
     def add_reputation(self, points: int) -> int:
-        daily_reputation, _ = DailyUserReputation.objects.get_or_create(user=self, date=date.today())
-        if daily_reputation.reputation + points > self.REPUTATION_CAP:
-            points = 200 - daily_reputation.reputation
-        self.reputation += points
-        self.save(update_fields=["reputation"])
-
-        # Add points to daily reputation
-        daily_reputation.reputation += points
-        daily_reputation.save(update_fields=["reputation"])
+        ReputationEvent.objects.create(user=self, delta=points)
+        self.aggregate_reputation([self.pk])
+        self.reputation = get_counters(User, self.pk, "reputation")["reputation"]
         return self.reputation
 
     def subtract_reputation(self, points: int) -> int:
-        new_reputation = max(1, self.reputation - points)
-        self.reputation = new_reputation
-        self.save(update_fields=["reputation"])
-
-        # Subtract points from daily reputation
-        daily_reputation, _ = DailyUserReputation.objects.get_or_create(user=self, date=date.today())
-        new_daily_reputation = max(0, daily_reputation.reputation - points)
-        daily_reputation.reputation = new_daily_reputation
-        daily_reputation.save(update_fields=["reputation"])
-        return self.reputation
+        return self.add_reputation(-points)
 
     def assign_badge(self, badge_name: str) -> Optional[UserBadge]:
-        badge = Badge.objects.filter(name=badge_name).first()
-        if not badge:
+        if (badge_id := get_badge_catalog().get(badge_name)) is None:
             return None
+        return UserBadge.objects.get_or_create(user=self, badge_id=badge_id)[0]
+
+
+def aggregate_pending_reputation(user_ids):
+    while User.aggregate_reputation(list(user_ids)):
+        pass
 
-        if user_badge := UserBadge.objects.filter(user=self, badge=badge).first():
-            return user_badge
 
-        return UserBadge.objects.create(user=self, badge=badge)
+reputation_batch = OnCommitBatch(lambda user_ids: run_in_background(aggregate_pending_reputation, user_ids))
@@ -7,6 +7,7 @@ from phonenumber_field.serializerfields import PhoneNumberField
 from rest_framework import serializers
 
 from apps.badges.models.badge_models import Badge, UserBadge
+from apps.common.serializers import CounterField
 
 User = get_user_model()
 
@@ -17,6 +18,7 @@ class CustomUserDetailsSerializer(UserDetailsSerializer):
     phone_number = PhoneNumberField(required=False)
     faculty = serializers.SerializerMethodField(read_only=True)
     badges = serializers.SerializerMethodField(read_only=True)
+    reputation = CounterField()
 
     class Meta(UserDetailsSerializer.Meta):
         fields = (
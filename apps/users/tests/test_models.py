@@ -1,8 +1,12 @@
-from datetime import date
+from datetime import date, timedelta
+from importlib import import_module
 
 import pytest
+from django.apps import apps as django_apps
+from django.core.management import call_command
 
-from apps.badges.models.badge_models import Badge, DailyUserReputation
+from apps.badges.models.badge_models import Badge, DailyUserReputation, ReputationEvent
+from apps.users.models import User
 
 pytestmark = pytest.mark.django_db
 
@@ -47,6 +51,58 @@ class TestUserModel:
         daily_reputation = DailyUserReputation.objects.get(user=user, date=date.today())
         assert daily_reputation.reputation == 0
 
+    def test_reputation_ledger_is_aggregated_in_batches(self, user):
+        for points in (150, 100, -30, 50):
+            User.change_reputation(user.pk, points)
+        user.refresh_from_db()
+        assert user.reputation == 1
+
+        assert User.aggregate_reputation() == len(ReputationEvent.objects.all())
+        user.refresh_from_db()
+        events = ReputationEvent.objects.filter(user=user).order_by("created_at")
+
+        assert list(events.values_list("applied_delta", flat=True)) == [150, 50, -30, 30]
+        assert user.reputation == self.REPUTATION_OVER_CAP
+        assert DailyUserReputation.objects.get(user=user).reputation == self.REPUTATION_CAP
+
+        User.objects.filter(pk=user.pk).update(reputation=1)
+        DailyUserReputation.objects.filter(user=user).delete()
+        call_command("aggregate_reputation", "--replay")
+        user.refresh_from_db()
+
+        assert user.reputation == self.REPUTATION_OVER_CAP
+        assert DailyUserReputation.objects.get(user=user).reputation == self.REPUTATION_CAP
+
+    def test_reputation_floor_is_applied_event_by_event(self, user):
+        loss, gain = -2, 10
+        for points in (loss, gain):
+            User.change_reputation(user.pk, points)
+        User.aggregate_reputation()
+        user.refresh_from_db()
+
+        events = ReputationEvent.objects.filter(user=user).order_by("created_at")
+        assert list(events.values_list("applied_delta", flat=True)) == [0, gain]
+        assert user.reputation == 1 + gain
+
+    def test_replay_keeps_reputation_earned_before_the_ledger(self, user):
+        today = date.today()
+        DailyUserReputation.objects.create(user=user, date=today - timedelta(days=1), reputation=30)
+        DailyUserReputation.objects.create(user=user, date=today, reputation=20)
+        User.objects.filter(pk=user.pk).update(reputation=51)
+        import_module("apps.badges.migrations.0004_reputation_opening_balance").record_opening_balances(
+            django_apps, None
+        )
+        user.add_reputation(self.REPUTATION_CAP)
+
+        call_command("aggregate_reputation", "--replay")
+        user.refresh_from_db()
+
+        assert user.reputation == 51 + self.REPUTATION_CAP - 20
+        assert dict(DailyUserReputation.objects.filter(user=user).values_list("date", "reputation")) == {
+            today - timedelta(days=1): 30,
+            today: self.REPUTATION_CAP,
+        }
+
     def test_assign_badge(self, user):
         badge = Badge.objects.create(name="Test Badge", description="Test Badge", level=Badge.BadgeLevel.GOLD)
 
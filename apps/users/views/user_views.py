@@ -46,7 +46,9 @@ class GetUserBookmarkList(ListAPIView):
 
         if bookmark_type == "post":
             queryset = (
-                Question.objects.filter(
+                Question.objects.with_card_relations(user)
+                .visible_to(user)
+                .filter(
                     models.Q(post__pk__in=bookmarked_object_ids)
                     | models.Q(answers__post__pk__in=bookmarked_object_ids)
                 )
@@ -56,7 +58,10 @@ class GetUserBookmarkList(ListAPIView):
 
         elif bookmark_type == "resource":
             queryset = (
-                Resource.objects.filter(pk__in=bookmarked_object_ids).distinct().order_by("-bookmarks__created_at")
+                Resource.objects.visible_to(user)
+                .filter(pk__in=bookmarked_object_ids)
+                .distinct()
+                .order_by("-bookmarks__created_at")
             )
 
         return queryset
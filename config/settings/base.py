@@ -60,6 +60,7 @@ LOCAL_APPS = [
     "apps.content_actions",
     "apps.feedback",
     "apps.notifications",
+    "apps.search",
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -199,10 +200,34 @@ EMAIL_BACKEND = config("DJANGO_EMAIL_BACKEND", default="django.core.mail.backend
 # Admin
 ADMIN_URL = config("DJANGO_ADMIN_URL", default="admin/")
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": config("CACHE_LOCATION", default=""),
+    }
+}
+
 # Page size
 PAGE_SIZE = config("PAGE_SIZE", default=30, cast=int)
 MAX_PAGE_SIZE = config("MAX_PAGE_SIZE", default=100, cast=int)
 
+# Page counts
+# Totals are cached per filter for this many seconds. Creating or deleting a row of one of the
+# `PAGINATION_CACHED_COUNT_MODELS` invalidates every cached total that reads from its table.
+PAGINATION_COUNT_TIMEOUT = config("PAGINATION_COUNT_TIMEOUT", default=60, cast=int)
+PAGINATION_CACHED_COUNT_MODELS = (
+    "forum.Question",
+    "forum.Answer",
+    "content_actions.Comment",
+    "resources.Resource",
+    "notifications.Notification",
+    "notifications.Subscription",
+)
+# Unfiltered tables with at least this many rows report the planner's estimate (PostgreSQL only).
+PAGINATION_ESTIMATE_THRESHOLD = config("PAGINATION_ESTIMATE_THRESHOLD", default=100_000, cast=int)
+
 # django-rest-framework
 # -------------------------------------------------------------------------------
 # django-rest-framework - https://www.django-rest-framework.org/api-guide/settings/
@@ -279,4 +304,101 @@ LOGGING = {
 PHONENUMBER_DEFAULT_REGION = "ET"
 PHONENUMBER_DEFAULT_FORMAT = "NATIONAL"
 
-USE_AI_MODELS = config("USE_AI_MODELS", False)
+USE_AI_MODELS = config("USE_AI_MODELS", default=False, cast=bool)
+# Each model is loaded once per process. Load them in the background at startup instead of on first use.
+AI_MODELS_WARM_UP = config("AI_MODELS_WARM_UP", default=False, cast=bool)
+# Where the models run, e.g. `cpu`, `cuda` or `cuda:1`, and the torch dtype of their weights.
+AI_MODEL_DEVICE = config("AI_MODEL_DEVICE", default="cpu")
+AI_MODEL_DTYPE = config("AI_MODEL_DTYPE", default="float32")
+# Number of CPU threads torch uses for inference, 0 for its default.
+AI_MODEL_THREADS = config("AI_MODEL_THREADS", default=0, cast=int)
+TOXICITY_MODEL = config("TOXICITY_MODEL", default="unitary/toxic-bert")
+GENERATION_MODEL = config("GENERATION_MODEL", default="state-spaces/mamba-130m-hf")
+# Text generation shares one resident model between at most this many concurrent requests. Requests wait
+# up to GENERATION_QUEUE_TIMEOUT seconds for a free slot, and a stream fails if no token arrives within
+# GENERATION_TOKEN_TIMEOUT seconds.
+GENERATION_MAX_CONCURRENCY = config("GENERATION_MAX_CONCURRENCY", default=2, cast=int)
+GENERATION_QUEUE_TIMEOUT = config("GENERATION_QUEUE_TIMEOUT", default=10, cast=int)
+GENERATION_TOKEN_TIMEOUT = config("GENERATION_TOKEN_TIMEOUT", default=30, cast=int)
+# The number of new tokens generated when a request sets no budget, and the largest budget it may set.
+GENERATION_DEFAULT_MAX_TOKENS = config("GENERATION_DEFAULT_MAX_TOKENS", default=60, cast=int)
+GENERATION_MAX_TOKENS_LIMIT = config("GENERATION_MAX_TOKENS_LIMIT", default=256, cast=int)
+# Texts are classified in windows of the model's token limit overlapping by this many tokens.
+TOXICITY_WINDOW_STRIDE = config("TOXICITY_WINDOW_STRIDE", default=64, cast=int)
+# Windows of concurrent requests are classified together, in batches of up to this many windows, waiting
+# at most this many milliseconds for other requests to join a batch.
+TOXICITY_MAX_BATCH_SIZE = config("TOXICITY_MAX_BATCH_SIZE", default=32, cast=int)
+TOXICITY_BATCH_MAX_LATENCY_MS = config("TOXICITY_BATCH_MAX_LATENCY_MS", default=10, cast=int)
+# Model outputs are cached by content for this many seconds, in the cache backend shared by workers and in
+# a per-process LRU of at most AI_INFERENCE_CACHE_SIZE entries (0 to only use the shared cache).
+AI_INFERENCE_CACHE_TIMEOUT = config("AI_INFERENCE_CACHE_TIMEOUT", default=60 * 60 * 24, cast=int)
+AI_INFERENCE_CACHE_SIZE = config("AI_INFERENCE_CACHE_SIZE", default=10000, cast=int)
+# "sync" checks posts, answers, comments and resources for toxic content before saving them. "async" saves
+# them as pending, hidden from everyone but their author, and a background worker publishes or flags them
+# in batches of MODERATION_BATCH_SIZE.
+MODERATION_MODE = config("MODERATION_MODE", default="sync")
+MODERATION_BATCH_SIZE = config("MODERATION_BATCH_SIZE", default=64, cast=int)
+
+# Search
+# ------------------------------------------------------------------------------
+# Dotted path of the search backend class. Empty to pick the backend matching the database vendor.
+SEARCH_BACKEND = config("SEARCH_BACKEND", default="")
+# The most hits a search ranks before they are paginated. Searches never return more, so `count` is capped too.
+SEARCH_MAX_RESULTS = config("SEARCH_MAX_RESULTS", default=500, cast=int)
+
+# Forum
+# ------------------------------------------------------------------------------
+# Seconds the most viewed questions listed next to a question are cached before they are recomputed.
+POPULAR_QUESTIONS_TIMEOUT = config("POPULAR_QUESTIONS_TIMEOUT", default=300, cast=int)
+
+# Background tasks
+# ------------------------------------------------------------------------------
+# Threads that run deferred work (e.g. flushing buffered views) outside the request.
+BACKGROUND_TASK_WORKERS = config("BACKGROUND_TASK_WORKERS", default=2, cast=int)
+# Run deferred work on the calling thread instead.
+BACKGROUND_TASKS_EAGER = config("BACKGROUND_TASKS_EAGER", default=False, cast=bool)
+
+# Views
+# ------------------------------------------------------------------------------
+# Buffered views are written once this many are pending or this many seconds passed since the last write.
+VIEW_BUFFER_SIZE = config("VIEW_BUFFER_SIZE", default=500, cast=int)
+VIEW_BUFFER_FLUSH_INTERVAL = config("VIEW_BUFFER_FLUSH_INTERVAL", default=5, cast=int)
+# Viewer sets holding more viewers than this are converted to approximate counts. 0 keeps them exact.
+VIEWER_SET_APPROXIMATE_AFTER = config("VIEWER_SET_APPROXIMATE_AFTER", default=0, cast=int)
+
+# Counters
+# ------------------------------------------------------------------------------
+# Spread vote count, score and reputation increments over this many rows per counter, so concurrent votes do
+# not wait on one row lock. Run `fold_counter_shards` periodically to move them into the model fields.
+# 0 updates the fields directly.
+COUNTER_SHARDS = config("COUNTER_SHARDS", default=0, cast=int)
+
+# Reputation
+# ------------------------------------------------------------------------------
+# The most reputation ledger events applied in one batch.
+REPUTATION_BATCH_SIZE = config("REPUTATION_BATCH_SIZE", default=1000, cast=int)
+
+# Notifications
+# ------------------------------------------------------------------------------
+# Number of notifications a fan-out to the subscribers of an object inserts at once.
+NOTIFICATION_FAN_OUT_CHUNK_SIZE = config("NOTIFICATION_FAN_OUT_CHUNK_SIZE", default=1000, cast=int)
+# A subscriber notification merges into an unread one with the same title about the same target from
+# the last this many seconds, counting the events instead of adding a row per event. 0 turns it off.
+NOTIFICATION_COALESCE_WINDOW = config("NOTIFICATION_COALESCE_WINDOW", default=3600, cast=int)
+# Unread counts are cached and kept up to date as notifications change. They are recounted from the
+# database after this many seconds, or by `reconcile_unread_counts`, in case they drifted.
+NOTIFICATION_UNREAD_COUNT_TIMEOUT = config("NOTIFICATION_UNREAD_COUNT_TIMEOUT", default=900, cast=int)
+# Read notifications are moved to the archive after this many days by `prune_notifications`.
+NOTIFICATION_RETENTION_DAYS = config("NOTIFICATION_RETENTION_DAYS", default=90, cast=int)
+# Archived notifications are kept this many days. 0 deletes expired notifications instead of archiving them.
+NOTIFICATION_ARCHIVE_RETENTION_DAYS = config("NOTIFICATION_ARCHIVE_RETENTION_DAYS", default=365, cast=int)
+# Streams and long polls are woken up at once by changes published in the same process, and check for
+# changes published by other processes every this many seconds.
+NOTIFICATION_STREAM_CHECK_INTERVAL = config("NOTIFICATION_STREAM_CHECK_INTERVAL", default=15, cast=int)
+# Streams end after this many seconds and the client reconnects, resuming after the last event it got.
+NOTIFICATION_STREAM_TIMEOUT = config("NOTIFICATION_STREAM_TIMEOUT", default=300, cast=int)
+# Long polls return empty after this many seconds without new notifications.
+NOTIFICATION_LONG_POLL_TIMEOUT = config("NOTIFICATION_LONG_POLL_TIMEOUT", default=25, cast=int)
+# Changes are stamped when written but seen once committed, so streams and polls also send again the
+# changes of this many seconds before a client's cursor. It should exceed the longest write transaction.
+NOTIFICATION_CURSOR_OVERLAP = config("NOTIFICATION_CURSOR_OVERLAP", default=5, cast=int)
@@ -24,3 +24,7 @@ EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#media-url
 MEDIA_URL = "http://media.testserver"
+
+# BACKGROUND TASKS
+# ------------------------------------------------------------------------------
+BACKGROUND_TASKS_EAGER = True
@@ -16,6 +16,7 @@ urlpatterns = [
     path("api/", include("apps.services.urls", namespace="services")),
     path("api/", include("apps.content_actions.urls", namespace="content_actions")),
     path("api/", include("apps.notifications.urls", namespace="notifications")),
+    path("api/", include("apps.search.urls", namespace="search")),
 ]
 
 # Media Assets